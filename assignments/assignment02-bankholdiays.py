@@ -21,36 +21,33 @@ Iterate thru NI Data and compare Dates with England/Scotland/Wales dates
 Whenever we find a date that does not match ... then add this data record to an "Unique dates" Array
 
 Note:This call returns 3 years of data (previous/present/future)
-So, prompt the user to enter the specific year
-'''
+So, the specific year is given on the command line (default: this year)
 
+Update: the feed is now cached on disk and indexed by bank_holidays.py, so the
+comparison is a set lookup and repeat runs do not download the data again.
+    python assignment02-bankholdiays.py 2025
+'''
 
-import requests
-url =" https://www.gov.uk/bank-holidays.json"
 
-response = requests.get(url)
-data = response.json()
+import sys
+from datetime import date
+from bank_holidays import BankHolidays
 
-# Extract Events data for Northern Ireland holidays
-ni_bh = data["northern-ireland"]["events"]
+holidays = BankHolidays.load()
+if holidays is None:
+    sys.exit("could not load bank holiday data")
 
-# Extract dates for England and Wales holidays
-ew_dates = [event['date'] for event in data["england-and-wales"]["events"]]
-# Extract dates for Scotland holidays
-s_dates = [event['date'] for event in data["scotland"]["events"]]
-#loop thru NI event data and print bank holiday dates
+#www.gov.uk json returns multiple years of bank holiday data so the year is passed as an argument
+year = sys.argv[1] if len(sys.argv) > 1 else str(date.today().year)
+if not year.isdigit():
+    sys.exit(f"usage: python {sys.argv[0]} <year>  (e.g. 2025)")
 
-#www.gov.uk json returns multiple years of bank holiday data so ask user to specify year
-year = input("enter a year (e.g. 2025) :")
-unique_ni_events = []
-for event in ni_bh:
-    if (event['date'].startswith(year) ):
-        if (event['date'] not in ew_dates) and (event['date'] not in s_dates):
-            unique_ni_events.append({'date' : event['date'], 'title' : event['title']})
+# NI dates that are not in the England/Wales or Scotland date sets
+unique_ni_events = holidays.unique_to("northern-ireland", int(year))
 
 #Print Results
 if(len(unique_ni_events) > 0):
-    for ni_event in unique_ni_events:
-        print(f"{ni_event['date']} - {ni_event['title']}")
+    for ni_date, ni_title in unique_ni_events:
+        print(f"{ni_date} - {ni_title}")
 else:
-    print("no data for that year")
\ No newline at end of file
+    print("no data for that year")
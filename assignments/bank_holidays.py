@@ -0,0 +1,176 @@
+'''
+bank_holidays.py
+Author  Niall Naughton
+Date    18/10/2026
+
+----------------------------------------------------------------------------------
+Description     UK bank holiday lookups (used by assignment02-bankholdiays.py)
+The assignment downloaded https://www.gov.uk/bank-holidays.json on every run and
+checked each Northern Ireland date against lists of the other divisions' dates
+(`date not in ew_dates` scans the whole list each time).
+
+Here:
+*  the feed is saved to disk with its ETag / Last-Modified headers. Within max_age
+   the saved copy is used with no network call; after that the request sends
+   If-None-Match / If-Modified-Since and a 304 reply re-uses the saved copy.
+   If the network is down the saved copy is used as well.
+*  each division is indexed once: a set of dates, date -> title, year -> events
+*  "unique to a division", "is D a holiday" and "holidays in year N" are set / dict lookups
+
+----------------------------------------------------------------------------------
+Usage:
+    from bank_holidays import BankHolidays
+    holidays = BankHolidays.load()
+    holidays.unique_to('northern-ireland', 2025)
+    holidays.is_holiday('2025-03-17', 'northern-ireland')
+    holidays.in_year(2025, 'scotland')
+'''
+import requests
+import json
+import os
+import time
+from datetime import date
+
+URL = "https://www.gov.uk/bank-holidays.json"
+CACHE_FILE = 'bank_holidays_cache.json'
+MAX_AGE = 24 * 60 * 60          # seconds before the saved copy is re-checked with the server
+DIVISIONS = ('england-and-wales', 'scotland', 'northern-ireland')
+
+
+def _to_date(value):
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def fetch_feed(url=URL, cache_file=CACHE_FILE, max_age=MAX_AGE, timeout=10):
+    """
+    The bank holiday JSON, from the disk cache when possible
+
+    Args:
+        url: Feed URL
+        cache_file: Where the feed and its ETag / Last-Modified headers are saved
+        max_age: Seconds the saved copy is used without asking the server
+                 (None = never ask again once saved)
+        timeout: Request timeout in seconds
+
+    Returns:
+        the feed (dict of division -> {'division', 'events'}), or None if there
+        is no saved copy and the download failed
+    """
+    cached = None
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable cache {cache_file}: {e}")
+
+    if cached is not None and (max_age is None or time.time() - cached.get('fetched_at', 0) < max_age):
+        return cached['data']
+
+    headers = {}
+    if cached is not None:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+
+    try:
+        response = requests.get(url, headers=headers, timeout=timeout)
+    except requests.RequestException as e:
+        if cached is not None:
+            print(f"Could not reach {url} ({e}) ... using saved copy")
+            return cached['data']
+        print(f"Could not download {url}: {e}")
+        return None
+
+    if response.status_code == 304 and cached is not None:
+        cached['fetched_at'] = time.time()
+        _save_cache(cache_file, cached)
+        return cached['data']
+    if response.status_code != 200:
+        print(f"Error downloading {url}: HTTP {response.status_code}")
+        return cached['data'] if cached is not None else None
+
+    data = response.json()
+    _save_cache(cache_file, {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'fetched_at': time.time(),
+        'data': data,
+    })
+    return data
+
+
+def _save_cache(cache_file, record):
+    # Write then rename, so a crash never leaves half a cache file
+    tmp = cache_file + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(record, f)
+    os.replace(tmp, cache_file)
+
+
+class BankHolidays:
+    """
+    Bank holidays indexed per division
+
+    Attributes:
+        dates: {division: set of dates}
+        titles: {division: {date: title}}
+        years: {division: {year: [(date, title), ...] in date order}}
+    """
+
+    def __init__(self, data):
+        self.dates = {}
+        self.titles = {}
+        self.years = {}
+        self._unique = {}
+        for division, value in data.items():
+            titles = {}
+            years = {}
+            for event in value['events']:
+                day = _to_date(event['date'])
+                titles[day] = event['title']
+            for day in sorted(titles):
+                years.setdefault(day.year, []).append((day, titles[day]))
+            self.titles[division] = titles
+            self.dates[division] = set(titles)
+            self.years[division] = years
+
+    @classmethod
+    def load(cls, url=URL, cache_file=CACHE_FILE, max_age=MAX_AGE):
+        """Load from the disk cache / feed (None if neither is available)"""
+        data = fetch_feed(url, cache_file, max_age)
+        return cls(data) if data is not None else None
+
+    @property
+    def divisions(self):
+        return list(self.dates)
+
+    def is_holiday(self, day, division):
+        """True if the date (date or 'YYYY-MM-DD') is a bank holiday in the division"""
+        return _to_date(day) in self.dates[division]
+
+    def title(self, day, division):
+        """Name of the holiday on that date, or None"""
+        return self.titles[division].get(_to_date(day))
+
+    def in_year(self, year, division):
+        """[(date, title), ...] for the division's holidays in a year"""
+        return list(self.years[division].get(int(year), []))
+
+    def unique_to(self, division, year=None):
+        """
+        Holidays in the division on dates that are not holidays in any other division
+
+        Returns:
+            [(date, title), ...] in date order (for one year if given)
+        """
+        if division not in self._unique:
+            others = set().union(*(dates for name, dates in self.dates.items() if name != division))
+            self._unique[division] = self.dates[division] - others
+        unique = self._unique[division]
+        events = self.in_year(year, division) if year is not None else [
+            (day, self.titles[division][day]) for day in sorted(self.dates[division])]
+        return [(day, title) for day, title in events if day in unique]
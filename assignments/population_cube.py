@@ -0,0 +1,145 @@
+'''
+population_cube.py
+Author  Niall Naughton
+Date    18/10/2026
+
+----------------------------------------------------------------------------------
+Description     Population cube for the CSO Census 2022 data (assignment05-population.ipynb)
+The notebook answered each age group question by filtering pivot_df with boolean
+masks, and the "biggest difference by region" cell looped over every row of
+pivot_df (re-filtering the whole frame each time).
+
+Here the population is held in one NumPy array indexed by [region, sex, age],
+with running totals (cumulative sums) over age. The total for any age group is
+then the difference of two running totals ... one slice, for every region and
+sex at once:
+
+    population(age lo..hi) = cum[:, :, hi + 1] - cum[:, :, lo]
+
+The same is kept for age * population, so the weighted mean age of any age
+group is one slice too.
+
+----------------------------------------------------------------------------------
+Usage:
+    from population_cube import PopulationCube
+    cube = PopulationCube.from_pivot(pivot_df)
+    cube.weighted_mean_age().loc['Ireland']           # Male / Female
+    cube.gap(25, 35)                                  # |Male - Female| per region
+    cube.largest_gap(25, 35, exclude=['Ireland'])     # (region, difference)
+'''
+import pandas as pd
+import numpy as np
+
+
+class PopulationCube:
+    """
+    Population by region, sex and single year of age
+
+    Args:
+        regions: Region names (axis 0)
+        sexes: Sex names (axis 1), e.g. ['Female', 'Male']
+        counts: int64 array of shape (regions, sexes, max_age + 1)
+    """
+
+    def __init__(self, regions, sexes, counts):
+        self.regions = pd.Index(regions, name='Region')
+        self.sexes = pd.Index(sexes, name='Sex')
+        self.counts = np.asarray(counts, dtype='int64')
+        self.ages = np.arange(self.counts.shape[2])
+        # Running totals with a leading 0, so cum[..., a] = population aged < a
+        zero = np.zeros(self.counts.shape[:2] + (1,), dtype='int64')
+        self.cum = np.concatenate([zero, np.cumsum(self.counts, axis=2)], axis=2)
+        self.cum_age = np.concatenate([zero, np.cumsum(self.counts * self.ages, axis=2)], axis=2)
+
+    @classmethod
+    def from_long(cls, df, region_col='Region', sex_col='Sex', age_col='Age', value_col='VALUE'):
+        """Build from long rows (one row per region, sex, age ... the cleaned CSO data)"""
+        region_codes, regions = pd.factorize(df[region_col])
+        sex_codes, sexes = pd.factorize(df[sex_col], sort=True)
+        ages = df[age_col].to_numpy(dtype='int64')
+        counts = np.zeros((len(regions), len(sexes), ages.max() + 1), dtype='int64')
+        # add.at so a repeated (region, sex, age) row is added, not overwritten
+        np.add.at(counts, (region_codes, sex_codes, ages), df[value_col].to_numpy(dtype='int64'))
+        return cls(regions, sexes, counts)
+
+    @classmethod
+    def from_pivot(cls, pivot_df, sexes=('Female', 'Male'), region_col='Region', age_col='Age'):
+        """Build from the notebook's pivot_df (Age, Region, Female, Male columns)"""
+        long = pivot_df.melt(id_vars=[age_col, region_col], value_vars=list(sexes),
+                             var_name='Sex', value_name='VALUE')
+        return cls.from_long(long.dropna(subset=['VALUE']), region_col, 'Sex', age_col, 'VALUE')
+
+    def _bounds(self, lo, hi):
+        lo = 0 if lo is None else max(int(lo), 0)
+        hi = self.ages[-1] if hi is None else min(int(hi), self.ages[-1])
+        return lo, max(hi + 1, lo)
+
+    def _frame(self, values):
+        return pd.DataFrame(values, index=self.regions, columns=self.sexes)
+
+    def band_total(self, lo=None, hi=None):
+        """Population aged lo..hi (inclusive) for every region and sex"""
+        lo, end = self._bounds(lo, hi)
+        return self._frame(self.cum[:, :, end] - self.cum[:, :, lo])
+
+    def weighted_mean_age(self, lo=None, hi=None):
+        """sum(age * population) / sum(population) over ages lo..hi, every region and sex"""
+        lo, end = self._bounds(lo, hi)
+        total = self.cum[:, :, end] - self.cum[:, :, lo]
+        age_total = self.cum_age[:, :, end] - self.cum_age[:, :, lo]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._frame(np.where(total > 0, age_total / total, np.nan))
+
+    def gap(self, lo=None, hi=None, first='Male', second='Female'):
+        """|first - second| population aged lo..hi for every region"""
+        totals = self.band_total(lo, hi)
+        return (totals[first] - totals[second]).abs().rename('Difference')
+
+    def largest_gap(self, lo=None, hi=None, exclude=(), first='Male', second='Female'):
+        """Region with the biggest difference between the sexes in the age group, and the difference"""
+        gaps = self.gap(lo, hi, first, second).drop(list(exclude), errors='ignore')
+        if gaps.empty:
+            return None, 0
+        return gaps.idxmax(), int(gaps.max())
+
+    def by_age(self, region):
+        """One region's population per single year of age (Age, one column per sex, Difference)"""
+        i = self.regions.get_loc(region)
+        df = pd.DataFrame(self.counts[i].T, columns=self.sexes)
+        df.columns.name = None
+        df.insert(0, 'Age', self.ages)
+        if 'Male' in df.columns and 'Female' in df.columns:
+            df['Difference'] = (df['Male'] - df['Female']).abs()
+        return df
+
+
+if __name__ == "__main__":
+    # Synthetic cube the size of the CSO data (~30 regions) and a much bigger one,
+    # checked against the notebook's loop
+    import time
+    rng = np.random.default_rng(0)
+    for n_regions in (32, 3000):
+        regions = ['Ireland'] + [f"Region {i}" for i in range(n_regions - 1)]
+        pivot_df = pd.DataFrame([(age, region) for age in range(101) for region in regions],
+                                columns=['Age', 'Region'])
+        pivot_df['Female'] = rng.integers(0, 5000, len(pivot_df))
+        pivot_df['Male'] = rng.integers(0, 5000, len(pivot_df))
+
+        start = time.perf_counter()
+        cube = PopulationCube.from_pivot(pivot_df)
+        region, difference = cube.largest_gap(25, 35, exclude=['Ireland'])
+        fast = time.perf_counter() - start
+
+        start = time.perf_counter()
+        max_population_diff, max_population_diff_region = 0, ""
+        for r in pivot_df['Region'].unique():
+            if r != 'Ireland':
+                rows = pivot_df[(pivot_df['Region'] == r) & (pivot_df['Age'] >= 25) & (pivot_df['Age'] <= 35)]
+                diff = abs(rows['Male'].sum() - rows['Female'].sum())
+                if diff > max_population_diff:
+                    max_population_diff, max_population_diff_region = diff, r
+        slow = time.perf_counter() - start
+
+        assert (region, difference) == (max_population_diff_region, max_population_diff)
+        print(f"{n_regions} regions: cube (build + query) {fast * 1000:.1f} ms, "
+              f"loop over regions {slow * 1000:.1f} ms ... {region} ({difference})")
@@ -0,0 +1,235 @@
+'''
+weather_stream.py
+Author  Niall Naughton
+Date    18/10/2026
+
+----------------------------------------------------------------------------------
+Description     Chunked reader for the Met Eireann hourly data (hly4935.csv, Knock airport)
+The hourly file covers decades, and loading it all with pd.read_csv (then plotting
+all years) was taking too long in assignment06-Weather.ipynb.
+
+This reads the file in chunks of rows and only keeps:
+*  the columns asked for (e.g. temp, wdsp)
+*  hourly rows inside the date range asked for (with the 24 hour rolling mean)
+*  one row per day (mean / max / count) and one row per month
+
+Apart from what is kept (the hourly rows of the range, if one is given, and one
+small row per day) memory stays the same however long the file is ... only one
+chunk, the last 23 rows (for the rolling mean) and the unfinished day are held at a time.
+
+----------------------------------------------------------------------------------
+Usage:
+    python weather_stream.py hly4935.csv 2000-03-01 2000-03-30
+
+    from weather_stream import aggregate_weather
+    stats = aggregate_weather("hly4935.csv", columns=['temp', 'wdsp'],
+                              start='2000-03-01', end='2000-03-30')
+    stats['hourly'], stats['daily'], stats['monthly']
+'''
+import pandas as pd
+import numpy as np
+import sys
+
+URL = "https://cli.fusio.net/cli/climate_data/webdata/hly4935.csv"
+SKIP_ROWS = 23                      # Large header of metadata lines
+DATE_FORMAT = '%d-%b-%Y %H:%M'      # 01-jan-1996 00:00
+ROLLING_WINDOW = 24                 # hours
+
+
+def read_weather_csv(source=URL, columns=('temp', 'wdsp'), skiprows=SKIP_ROWS, chunksize=None):
+    """Read date + the columns asked for as text (a chunk reader if chunksize is given)"""
+    return pd.read_csv(source, usecols=['date'] + list(columns), skiprows=skiprows,
+                       chunksize=chunksize, dtype={col: str for col in columns})
+
+
+def parse_weather_columns(df, columns, fill_missing=None):
+    """
+    Parse the date column and turn the readings into numbers, in place
+    (bad dates become NaT, blank readings NaN or the value in fill_missing)
+    """
+    df['date'] = pd.to_datetime(df['date'], format=DATE_FORMAT, errors='coerce')
+    for col in columns:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+        if fill_missing and col in fill_missing:
+            df[col] = df[col].fillna(fill_missing[col])
+    return df
+
+
+def iter_weather_chunks(source=URL, columns=('temp', 'wdsp'), start=None, end=None,
+                        chunksize=100_000, skiprows=SKIP_ROWS, fill_missing=None, window=ROLLING_WINDOW):
+    """
+    Yield the file in chunks: date (datetime) + the numeric columns asked for
+
+    Blank readings (' ') become NaN, or the value in fill_missing (e.g. {'wdsp': 0.0}).
+    Rows are in date order in the file, so reading stops once past `end`.
+    The last window-1 rows before `start` are still yielded (the rolling mean
+    needs them, however small the chunks); use the date range filter after the rolling mean.
+    """
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+    reader = read_weather_csv(source, columns, skiprows, chunksize)
+    previous = None
+    for chunk in reader:
+        chunk = parse_weather_columns(chunk, columns, fill_missing).dropna(subset=['date'])
+        if chunk.empty:
+            continue
+        if start is not None and chunk['date'].iloc[-1] < start:
+            # Only the last window-1 rows before the range are needed (they may span chunks)
+            if window > 1:
+                joined = chunk if previous is None else pd.concat([previous, chunk], ignore_index=True)
+                previous = joined.iloc[-(window - 1):]
+            continue
+        if previous is not None:
+            yield previous
+            previous = None
+        yield chunk
+        if end is not None and chunk['date'].iloc[-1] > end:
+            break
+    if previous is not None:
+        yield previous
+
+
+class WeatherAggregator:
+    """
+    Incremental hourly rolling mean + daily / monthly stats for chunks of hourly rows
+
+    Args:
+        columns: Numeric columns to aggregate (e.g. ['temp', 'wdsp'])
+        start, end: Date range to keep (inclusive, None = no limit)
+        window: Rows in the rolling mean (24 = one day of hourly readings)
+        keep_hourly: Keep the hourly rows in the range (False = daily / monthly only).
+                     Default: only when start or end is given, so reading the whole
+                     file does not hold every hourly row in memory
+    """
+
+    def __init__(self, columns=('temp', 'wdsp'), start=None, end=None, window=ROLLING_WINDOW, keep_hourly=None):
+        self.columns = list(columns)
+        self.start = pd.Timestamp(start) if start is not None else None
+        self.end = pd.Timestamp(end) if end is not None else None
+        self.window = window
+        self.keep_hourly = keep_hourly if keep_hourly is not None else (start is not None or end is not None)
+        self.tail = None                # last window-1 rows, for the rolling mean across chunks
+        self.open_day = None            # running sums for the day still being read
+        self.days = []                  # finished daily rows (small DataFrames)
+        self.hourly = []
+        self.rows_read = 0
+
+    def _in_range(self, dates):
+        keep = np.ones(len(dates), dtype=bool)
+        if self.start is not None:
+            keep &= (dates >= self.start).to_numpy()
+        if self.end is not None:
+            keep &= (dates <= self.end).to_numpy()
+        return keep
+
+    def add(self, chunk):
+        """
+        Add the next chunk (rows in date order)
+
+        Returns:
+            the chunk's rows inside the date range, with rolling_<col>_24h columns
+        """
+        self.rows_read += len(chunk)
+        # Rolling mean over rows, carried over from the end of the last chunk
+        joined = chunk if self.tail is None else pd.concat([self.tail, chunk], ignore_index=True)
+        rolled = joined[self.columns].rolling(window=self.window).mean().iloc[len(joined) - len(chunk):]
+        self.tail = joined.iloc[-(self.window - 1):] if self.window > 1 else None
+
+        chunk = chunk.reset_index(drop=True)
+        for col in self.columns:
+            chunk[f"rolling_{col}_{self.window}h"] = rolled[col].to_numpy()
+        chunk = chunk[self._in_range(chunk['date'])]
+        if chunk.empty:
+            return chunk
+
+        self._add_days(chunk)
+        if self.keep_hourly:
+            self.hourly.append(chunk)
+        return chunk
+
+    def _add_days(self, chunk):
+        day = chunk['date'].dt.floor('D')
+        values = chunk[self.columns]
+        stats = pd.concat({
+            'sum': values.groupby(day).sum(min_count=1),
+            'count': values.notna().groupby(day).sum(),
+            'max': values.groupby(day).max(),
+        }, axis=1)
+        if self.open_day is not None:
+            if stats.index[0] == self.open_day.index[0]:
+                first = stats.iloc[[0]]
+                merged = first.copy()
+                merged['sum'] = first['sum'].add(self.open_day['sum'], fill_value=0)
+                merged['count'] = first['count'] + self.open_day['count']
+                merged['max'] = np.fmax(first['max'], self.open_day['max'])
+                stats = pd.concat([merged, stats.iloc[1:]])
+            else:
+                stats = pd.concat([self.open_day, stats])
+        # The last day may continue in the next chunk
+        self.open_day = stats.iloc[[-1]]
+        if len(stats) > 1:
+            self.days.append(stats.iloc[:-1])
+
+    def daily(self):
+        """One row per day: <col>_mean, <col>_max, <col>_count"""
+        parts = self.days + ([self.open_day] if self.open_day is not None else [])
+        if not parts:
+            return pd.DataFrame()
+        stats = pd.concat(parts)
+        daily = pd.DataFrame(index=stats.index)
+        for col in self.columns:
+            count = stats[('count', col)]
+            daily[f"{col}_mean"] = stats[('sum', col)] / count.where(count > 0)
+            daily[f"{col}_max"] = stats[('max', col)]
+            daily[f"{col}_count"] = count.astype('int64')
+        daily.index.name = 'date'
+        return daily
+
+    def monthly(self):
+        """One row per month: mean of the hourly values, max, and mean of the daily max"""
+        parts = self.days + ([self.open_day] if self.open_day is not None else [])
+        if not parts:
+            return pd.DataFrame()
+        stats = pd.concat(parts)
+        month = stats.index.to_period('M')
+        monthly = {}
+        for col in self.columns:
+            count = stats[('count', col)].groupby(month).sum()
+            monthly[f"{col}_mean"] = stats[('sum', col)].groupby(month).sum() / count.where(count > 0)
+            monthly[f"{col}_max"] = stats[('max', col)].groupby(month).max()
+            monthly[f"{col}_avg_daily_max"] = stats[('max', col)].groupby(month).mean()
+        monthly = pd.DataFrame(monthly)
+        monthly.index.name = 'month'
+        return monthly
+
+    def hourly_rows(self):
+        return pd.concat(self.hourly, ignore_index=True) if self.hourly else pd.DataFrame()
+
+
+def aggregate_weather(source=URL, columns=('temp', 'wdsp'), start=None, end=None,
+                      chunksize=100_000, keep_hourly=None, fill_missing=None, window=ROLLING_WINDOW):
+    """
+    Stream the hourly file once and return the hourly (in range), daily and monthly tables
+
+    keep_hourly defaults to True only when start or end is given (hourly is empty
+    otherwise, and memory stays the same however long the file is)
+
+    Returns:
+        {'hourly': DataFrame, 'daily': DataFrame, 'monthly': DataFrame, 'rows_read': int}
+    """
+    aggregator = WeatherAggregator(columns, start, end, window=window, keep_hourly=keep_hourly)
+    for chunk in iter_weather_chunks(source, columns, start, end, chunksize, fill_missing=fill_missing,
+                                     window=window):
+        aggregator.add(chunk)
+    return {'hourly': aggregator.hourly_rows(), 'daily': aggregator.daily(),
+            'monthly': aggregator.monthly(), 'rows_read': aggregator.rows_read}
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else URL
+    start = sys.argv[2] if len(sys.argv) > 2 else None
+    end = sys.argv[3] if len(sys.argv) > 3 else None
+    stats = aggregate_weather(source, start=start, end=end, fill_missing={'wdsp': 0.0})
+    print(f"Read {stats['rows_read']:,} rows, kept {len(stats['hourly']):,} hourly rows")
+    print(stats['daily'].head(10))
+    print(stats['monthly'].head(12))
@@ -0,0 +1,149 @@
+'''
+wind_cache.py
+Author  Niall Naughton
+Date    18/10/2026
+
+----------------------------------------------------------------------------------
+Description     Binary cache of the Knock airport wind speed data (assignment06-Weather.ipynb)
+The notebook saved the wind data to wind_data.csv, read it back, re-parsed the dates,
+added the stats columns and then saved / re-read wind_data_stats.csv ... every hop
+turned the dates back into text and parsed them again.
+
+Here the data is saved once to a Feather (Arrow) file with the stats columns:
+*  date is stored as a real datetime column (no re-parsing)
+*  rolling_wdsp_24h, daily_max_wdsp, monthly_avgmax_wdsp are worked out in one pass
+   over the rows sorted by date (day / month boundaries, no groupby per column)
+*  the file is uncompressed so it can be memory-mapped ... reloading is near instant
+   and a date range is a slice of the mapped file (rows are sorted by date)
+
+----------------------------------------------------------------------------------
+Usage:
+    python wind_cache.py hly4935.csv 2000-03-01 2000-03-30
+
+    from wind_cache import get_wind_data
+    df = get_wind_data(start='2000-03-01', end='2000-03-30')
+'''
+from weather_stream import URL, SKIP_ROWS, ROLLING_WINDOW, read_weather_csv, parse_weather_columns
+import pandas as pd
+import numpy as np
+import os
+import sys
+
+CACHE_FILE = 'wind_data_stats.feather'
+
+
+def read_wind_csv(source=URL, skiprows=SKIP_ROWS):
+    """Read date + wdsp from the Met Eireann CSV (blank wdsp readings become 0.0)"""
+    df = read_weather_csv(source, ['wdsp'], skiprows)
+    return parse_weather_columns(df, ['wdsp'], fill_missing={'wdsp': 0.0})
+
+
+def _segment_starts(keys):
+    """Index of the first row of each run of equal keys (keys sorted)"""
+    return np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+
+
+def add_wind_stats(df, window=ROLLING_WINDOW):
+    """
+    Sort by date and add the notebook's stats columns in one pass
+
+        rolling_wdsp_24h      mean of the last 24 readings
+        daily_max_wdsp        max wdsp of the row's day
+        monthly_avgmax_wdsp   mean of daily_max_wdsp over the rows of the month
+                              (same as the notebook's groupby(...).transform('mean'))
+
+    Rows without a date are kept at the end with no daily / monthly values.
+
+    Returns:
+        new DataFrame sorted by date with a fresh index
+    """
+    df = df.sort_values('date', kind='stable', na_position='last', ignore_index=True)
+    wdsp = df['wdsp'].to_numpy(dtype='float64')
+    dates = df['date'].to_numpy()
+    n_valid = int((~np.isnat(dates)).sum())
+
+    df['rolling_wdsp_24h'] = df['wdsp'].rolling(window=window).mean()
+
+    daily_max = np.full(len(df), np.nan)
+    monthly_avgmax = np.full(len(df), np.nan)
+    if n_valid:
+        valid = dates[:n_valid]
+        days = valid.astype('datetime64[D]').astype('int64')
+        months = valid.astype('datetime64[M]').astype('int64')
+
+        # Daily max ... fmax skips missing readings like groupby max does
+        day_starts = _segment_starts(days)
+        day_lengths = np.diff(np.r_[day_starts, n_valid])
+        daily_max[:n_valid] = np.repeat(np.fmax.reduceat(wdsp[:n_valid], day_starts), day_lengths)
+
+        # Monthly mean of the (per row) daily max
+        month_starts = _segment_starts(months)
+        month_lengths = np.diff(np.r_[month_starts, n_valid])
+        present = ~np.isnan(daily_max[:n_valid])
+        sums = np.add.reduceat(np.where(present, daily_max[:n_valid], 0.0), month_starts)
+        counts = np.add.reduceat(present.astype('int64'), month_starts)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            monthly_avgmax[:n_valid] = np.repeat(sums / counts, month_lengths)
+
+    df['daily_max_wdsp'] = daily_max
+    df['monthly_avgmax_wdsp'] = monthly_avgmax
+    return df
+
+
+def save_wind_cache(df, path=CACHE_FILE):
+    """Save to Feather, uncompressed so it can be memory-mapped when read"""
+    df.to_feather(path, compression='uncompressed')
+    print(f"Saved {len(df):,} rows to {path}")
+
+
+def load_wind_cache(path=CACHE_FILE, start=None, end=None, columns=None):
+    """
+    Memory-map the cache and return the rows between start and end (inclusive)
+
+    Rows are sorted by date, so the date range is found with a binary search and
+    only that slice of the mapped file is turned into a DataFrame.
+
+    Returns:
+        DataFrame, or None if the cache file does not exist
+    """
+    import pyarrow.feather as feather
+
+    if not os.path.exists(path):
+        print(f"Wind cache not found: {path}")
+        return None
+    table = feather.read_table(path, columns=columns, memory_map=True)
+    if start is not None or end is not None:
+        dates = table.column('date').to_numpy()
+        lo = 0 if start is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(start)), side='left')
+        hi = len(dates) if end is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(end)), side='right')
+        table = table.slice(lo, max(hi - lo, 0))
+    return table.to_pandas()
+
+
+def build_wind_cache(source=URL, path=CACHE_FILE):
+    """Download / read the CSV once, add the stats columns and save the cache"""
+    df = add_wind_stats(read_wind_csv(source))
+    save_wind_cache(df, path)
+    return df
+
+
+def get_wind_data(source=URL, path=CACHE_FILE, start=None, end=None, rebuild=False):
+    """Wind data with stats columns ... from the cache, building it first if needed"""
+    if rebuild or not os.path.exists(path):
+        build_wind_cache(source, path)
+    return load_wind_cache(path, start, end)
+
+
+if __name__ == "__main__":
+    import time
+    source = sys.argv[1] if len(sys.argv) > 1 else URL
+    start = sys.argv[2] if len(sys.argv) > 2 else None
+    end = sys.argv[3] if len(sys.argv) > 3 else None
+
+    t0 = time.perf_counter()
+    build_wind_cache(source)
+    t1 = time.perf_counter()
+    df = load_wind_cache(start=start, end=end)
+    t2 = time.perf_counter()
+    print(f"Built cache in {t1 - t0:.2f}s, loaded {len(df):,} rows in {(t2 - t1) * 1000:.1f} ms")
+    print(df.head(10))
@@ -0,0 +1,32 @@
+'''
+Benchmark suite for the data pipeline (GH Archive ingest -> filter -> save,
+the Project.ipynb pivot / rolling / rank / trend steps, the search API
+collector and the assignment06 weather readers)
+
+Every stage runs on seeded synthetic data (generators.py) so runs are
+repeatable without the network, a token or the real datasets. Each benchmark
+runs in its own process and records wall time and peak RSS; results are added
+to a JSON history and compared with earlier runs on the same machine.
+
+Usage (from the repository root):
+    python -m benchmarks                        # small scale, all benchmarks
+    python -m benchmarks --scale medium --only ingest_stream filter_lines
+    python -m benchmarks --list
+    python -m benchmarks --threshold 0.2 --no-record
+
+Exit status is 1 if any benchmark is slower (or uses more memory) than the
+median of its recent runs by more than the threshold.
+'''
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The pipeline modules use flat imports (from gharchive_filters import ...),
+# so their folders go on the path as the notebooks / scripts run them
+MODULE_DIRS = [os.path.join(REPO_ROOT, 'project', 'testing'),
+               os.path.join(REPO_ROOT, 'project'),
+               os.path.join(REPO_ROOT, 'assignments')]
+for _path in MODULE_DIRS:
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
@@ -0,0 +1,71 @@
+'''
+python -m benchmarks [--scale small|medium|large] [--only name ...] [--threshold 0.25]
+
+Generates (or reuses) the synthetic data, runs the benchmarks, compares them
+with the history and adds this run to it. Exits with status 1 on a regression.
+'''
+import argparse
+import tempfile
+import sys
+import os
+
+from .generators import SCALES, generate_all
+from .suite import BENCHMARKS
+from . import runner
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description="Pipeline benchmarks on synthetic data (wall time + peak RSS)")
+    parser.add_argument('--scale', default='small', choices=list(SCALES))
+    parser.add_argument('--only', nargs='*', help="Benchmark names or stages (default: all)")
+    parser.add_argument('--list', action='store_true', help="List the benchmarks and exit")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per benchmark (best is kept)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', help="Folder for the generated data (kept and reused between runs)")
+    parser.add_argument('--history', default=runner.HISTORY_FILE, help="JSON history file")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Allowed slowdown (0.25 = 25%%)")
+    parser.add_argument('--rss-threshold', type=float, default=0.25, help="Allowed peak RSS growth")
+    parser.add_argument('--baseline-runs', type=int, default=5, help="Recent runs the baseline is the median of")
+    parser.add_argument('--no-record', action='store_true', help="Compare only, do not add to the history")
+    parser.add_argument('--verbose', action='store_true', help="Show the pipeline's own output")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for bench in BENCHMARKS.values():
+            print(f"{bench.stage:<9} {bench.name:<22} {bench.description}")
+        return 0
+
+    names = list(BENCHMARKS)
+    if args.only:
+        unknown = [n for n in args.only if n not in BENCHMARKS and n not in {b.stage for b in BENCHMARKS.values()}]
+        if unknown:
+            parser.error(f"unknown benchmark / stage: {', '.join(unknown)}")
+        names = [name for name, bench in BENCHMARKS.items() if name in args.only or bench.stage in args.only]
+
+    data_dir = args.data_dir or os.path.join(tempfile.gettempdir(), f"pipeline_benchmarks_{args.scale}_{args.seed}")
+    manifest = generate_all(data_dir, args.scale, args.seed)
+
+    print(f"Running {len(names)} benchmarks at scale '{args.scale}' (best of {args.repeat})")
+    with tempfile.TemporaryDirectory(prefix='benchmark_work_') as workdir:
+        results = runner.run_benchmarks(names, manifest, workdir, args.repeat, args.verbose)
+
+    history = runner.load_history(args.history)
+    regressions = runner.compare(results, history, args.scale, args.threshold, args.rss_threshold,
+                                 args.baseline_runs)
+    if not args.no_record:
+        history['runs'].append(runner.new_run(args.scale, results))
+        runner.save_history(history, args.history)
+        print(f"\nRecorded in {args.history}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s):")
+        for message in regressions:
+            print(f"  {message}")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+'''
+Seeded synthetic data in the shape of each real input
+
+* gharchive_hours()   GH Archive hourly files ({hour}.json.gz, one JSON event per line)
+* quarterly_tables()  prs.csv / issues.csv (name, year, quarter, count) + repos.csv
+* kaggle_repos()      DatasetDataKaggle.csv (Popular OSS Projects) repo metadata
+* climate_csv()       Met Eireann hly4935.csv (23 metadata lines, then hourly readings)
+
+The same seed and sizes always give the same files (gzip headers have no
+timestamp), and each archive hour is seeded on its own, so asking for more
+hours does not change the hours already generated.
+
+Example:
+    from benchmarks.generators import generate_all
+    paths = generate_all('/tmp/bench_data', scale='small')
+'''
+from datetime import datetime, timedelta, timezone
+import pandas as pd
+import numpy as np
+import json
+import gzip
+import os
+
+# Sizes per scale ... 'small' runs in well under a minute
+SCALES = {
+    'small':  {'hours': 6, 'events_per_hour': 2_000, 'repos': 5_000, 'actors': 20_000,
+               'languages': 25, 'years': (2011, 2021), 'kaggle_rows': 50_000, 'climate_years': 10,
+               'api_languages': 3, 'api_years': (2020, 2021)},
+    'medium': {'hours': 24, 'events_per_hour': 10_000, 'repos': 50_000, 'actors': 200_000,
+               'languages': 50, 'years': (2008, 2021), 'kaggle_rows': 500_000, 'climate_years': 30,
+               'api_languages': 6, 'api_years': (2016, 2021)},
+    'large':  {'hours': 72, 'events_per_hour': 30_000, 'repos': 200_000, 'actors': 1_000_000,
+               'languages': 100, 'years': (2000, 2021), 'kaggle_rows': 5_000_000, 'climate_years': 60,
+               'api_languages': 10, 'api_years': (2012, 2021)},
+}
+
+LANGUAGES = ['JavaScript', 'Python', 'Java', 'Go', 'TypeScript', 'C++', 'Ruby', 'PHP', 'C#', 'C',
+             'Shell', 'Scala', 'Swift', 'Rust', 'Kotlin', 'Objective-C', 'R', 'Perl', 'Haskell',
+             'Lua', 'Dart', 'Elixir', 'Clojure', 'Groovy', 'PowerShell']
+
+# Well known repos come first, so repo filters have something to match
+KNOWN_REPOS = ['microsoft/vscode', 'torvalds/linux', 'python/cpython', 'facebook/react',
+               'kubernetes/kubernetes', 'rust-lang/rust', 'golang/go', 'nodejs/node']
+
+EVENT_WEIGHTS = {'PushEvent': 0.50, 'CreateEvent': 0.10, 'WatchEvent': 0.09, 'PullRequestEvent': 0.08,
+                 'IssueCommentEvent': 0.08, 'IssuesEvent': 0.04, 'DeleteEvent': 0.03, 'ForkEvent': 0.03,
+                 'PullRequestReviewEvent': 0.02, 'ReleaseEvent': 0.01, 'GollumEvent': 0.01,
+                 'MemberEvent': 0.01}
+
+CLIMATE_COLUMNS = ['date', 'ind', 'rain', 'ind', 'temp', 'ind', 'wetb', 'dewpt', 'vappr', 'rhum', 'msl',
+                   'ind', 'wdsp', 'ind', 'wddir', 'ww', 'w', 'sun', 'vis', 'clht', 'clamt']
+CLIMATE_META_LINES = 23
+
+
+def language_names(n):
+    """n language names: real ones first, then Lang26, Lang27 ..."""
+    return LANGUAGES[:n] + [f"Lang{i + 1}" for i in range(len(LANGUAGES), n)]
+
+
+def repo_name(repo_id):
+    if repo_id < len(KNOWN_REPOS):
+        return KNOWN_REPOS[repo_id]
+    return f"owner{repo_id % 997}/repo{repo_id}"
+
+
+def _write_gzip_lines(path, lines):
+    """Write lines to a .gz file with mtime=0, so the same lines give the same bytes"""
+    with open(path, 'wb') as fp, gzip.GzipFile(filename='', mode='wb', fileobj=fp, mtime=0) as gz:
+        for line in lines:
+            gz.write(line)
+
+
+# ---------------- GH Archive ----------------
+def _payload(event_type, rng, event_id):
+    if event_type == 'PushEvent':
+        size = int(rng.integers(1, 4))
+        commits = [{'sha': f"{rng.integers(0, 2**62):016x}", 'author': {'name': 'dev', 'email': 'dev@example.com'},
+                    'message': 'Update files', 'distinct': True, 'url': ''} for _ in range(size)]
+        return {'push_id': event_id, 'size': size, 'distinct_size': size,
+                'ref': 'refs/heads/main', 'head': commits[-1]['sha'], 'before': commits[0]['sha'],
+                'commits': commits}
+    if event_type == 'PullRequestEvent':
+        number = int(rng.integers(1, 50_000))
+        return {'action': 'opened', 'number': number,
+                'pull_request': {'id': event_id, 'number': number, 'state': 'open', 'title': 'Fix bug',
+                                 'additions': int(rng.integers(0, 500)), 'deletions': int(rng.integers(0, 200))}}
+    if event_type in ('IssuesEvent', 'IssueCommentEvent'):
+        return {'action': 'opened' if event_type == 'IssuesEvent' else 'created',
+                'issue': {'number': int(rng.integers(1, 50_000)), 'title': 'Something is broken'}}
+    if event_type == 'CreateEvent':
+        return {'ref': 'main', 'ref_type': 'branch', 'master_branch': 'main', 'pusher_type': 'user'}
+    if event_type == 'WatchEvent':
+        return {'action': 'started'}
+    return {}
+
+
+def gharchive_hour_events(hour_start, n_events, repos, actors, seed=0):
+    """Events (dicts) for one archive hour, in created_at order"""
+    epoch_seconds = int(hour_start.replace(tzinfo=timezone.utc).timestamp())
+    rng = np.random.default_rng([seed, epoch_seconds])
+    types = rng.choice(list(EVENT_WEIGHTS), n_events, p=np.array(list(EVENT_WEIGHTS.values())) / sum(EVENT_WEIGHTS.values()))
+    # Activity is skewed: a few repos / actors get most of the events
+    repo_ids = (rng.zipf(1.3, n_events) - 1) % repos
+    actor_ids = (rng.zipf(1.5, n_events) - 1) % actors
+    seconds = np.sort(rng.integers(0, 3600, n_events))
+    first_id = epoch_seconds * 100_000
+    events = []
+    for i in range(n_events):
+        event_id = first_id + i
+        actor, repo = int(actor_ids[i]), int(repo_ids[i])
+        login = f"user{actor}"
+        name = repo_name(repo)
+        events.append({
+            'id': str(event_id),
+            'type': str(types[i]),
+            'actor': {'id': actor, 'login': login, 'display_login': login, 'gravatar_id': '',
+                      'url': f"https://api.github.com/users/{login}",
+                      'avatar_url': f"https://avatars.githubusercontent.com/u/{actor}?"},
+            'repo': {'id': repo, 'name': name, 'url': f"https://api.github.com/repos/{name}"},
+            'payload': _payload(types[i], rng, event_id),
+            'public': True,
+            'created_at': (hour_start + timedelta(seconds=int(seconds[i]))).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        })
+    return events
+
+
+def gharchive_hours(folder, start='2024-12-18', hours=24, events_per_hour=10_000,
+                    repos=5_000, actors=20_000, seed=0):
+    """
+    Write GH Archive shaped hourly files to folder ({hour}.json.gz, e.g. 2024-12-18-9.json.gz)
+
+    Returns:
+        list of hour names written
+    """
+    os.makedirs(folder, exist_ok=True)
+    first = datetime.strptime(start, '%Y-%m-%d')
+    names = []
+    for h in range(hours):
+        hour_start = first + timedelta(hours=h)
+        name = f"{hour_start:%Y-%m-%d}-{hour_start.hour}"
+        events = gharchive_hour_events(hour_start, events_per_hour, repos, actors, seed)
+        _write_gzip_lines(os.path.join(folder, f"{name}.json.gz"),
+                          (json.dumps(event, separators=(',', ':')).encode('utf8') + b'\n' for event in events))
+        names.append(name)
+    return names
+
+
+# ---------------- Project.ipynb tables ----------------
+def quarterly_counts(languages=25, years=(2011, 2021), base=1000, seed=0):
+    """
+    name, year, quarter, count rows with a growth trend per language.
+    Some languages start late (no rows before their first quarter), as Swift / Go do
+    """
+    rng = np.random.default_rng(seed)
+    names = language_names(languages)
+    periods = [(year, quarter) for year in range(years[0], years[1] + 1) for quarter in range(1, 5)]
+    size = base * rng.pareto(1.2, languages) + base / 10
+    growth = rng.normal(0.02, 0.04, languages)            # per quarter
+    first = np.where(rng.random(languages) < 0.2, rng.integers(0, len(periods) // 2, languages), 0)
+    rows = []
+    for i, name in enumerate(names):
+        t = np.arange(len(periods) - first[i])
+        counts = size[i] * np.exp(growth[i] * t) * rng.lognormal(0, 0.15, len(t))
+        for (year, quarter), count in zip(periods[first[i]:], counts):
+            rows.append((name, year, quarter, int(count)))
+    df = pd.DataFrame(rows, columns=['name', 'year', 'quarter', 'count'])
+    # The real files are in no particular language order within a quarter
+    return df.sample(frac=1, random_state=seed).sort_values(['year', 'quarter'], kind='stable', ignore_index=True)
+
+
+def quarterly_tables(folder, languages=25, years=(2011, 2021), seed=0):
+    """
+    Write prs.csv and issues.csv (name, year, quarter, count) and repos.csv
+    (language, num_repos) as in github-programming-languages-data
+
+    Returns:
+        {'prs': path, 'issues': path, 'repos': path}
+    """
+    os.makedirs(folder, exist_ok=True)
+    paths = {}
+    for offset, table in enumerate(['prs', 'issues']):
+        paths[table] = os.path.join(folder, f"{table}.csv")
+        quarterly_counts(languages, years, seed=seed + offset).to_csv(paths[table], index=False)
+    rng = np.random.default_rng(seed + 2)
+    repos = pd.DataFrame({'language': language_names(languages),
+                          'num_repos': (1e5 * rng.pareto(1.0, languages) + 100).astype('int64')})
+    paths['repos'] = os.path.join(folder, 'repos.csv')
+    repos.sort_values('num_repos', ascending=False).to_csv(paths['repos'], index=False)
+    return paths
+
+
+def kaggle_repos(path, rows=100_000, languages=11, seed=0):
+    """
+    Write DatasetDataKaggle.csv shaped repo metadata (dates as '29 October 2007')
+
+    Returns:
+        path
+    """
+    rng = np.random.default_rng(seed)
+    names = np.asarray(language_names(languages), dtype=object)
+    # Text for each distinct day once, then indexed (strftime per row is slow)
+    days = pd.date_range('2008-01-01', '2018-12-31', freq='D')
+    day_text = days.strftime('%d %B %Y').to_numpy(dtype=object)
+    created = rng.integers(0, len(days), rows)
+    pushed = np.minimum(created + rng.exponential(700, rows).astype('int64'), len(days) - 1)
+    repo_ids = np.sort(rng.choice(np.arange(1, rows * 50), rows, replace=False))
+    df = pd.DataFrame({
+        'repo_id': repo_ids,
+        'Primary Language': names[(rng.zipf(1.6, rows) - 1) % languages],
+        'Repo_description': 'A synthetic repository',
+        'size': rng.lognormal(7, 2, rows).astype('int64'),
+        'stars': (1000 + 2000 * rng.pareto(1.5, rows)).astype('int64'),
+        'commits_count': rng.lognormal(6, 1.5, rows).astype('int64'),
+        'contributors_count_without_anonymous': rng.lognormal(3, 1, rows).astype('int64'),
+        'created_at': day_text[created],
+        'pushed_at': day_text[pushed],
+        'repo/username': [f"repo{i}" for i in repo_ids],
+        'repo_link': '',
+    })
+    df.insert(7, 'contributors_count_with_anonymous',
+              df['contributors_count_without_anonymous'] + rng.integers(0, 20, rows))
+    df.to_csv(path, index=False)
+    return path
+
+
+# ---------------- assignment06 weather ----------------
+def climate_csv(path, years=10, start='1996-01-01', missing_rate=0.001, seed=0):
+    """
+    Write an hly4935.csv shaped file: 23 metadata lines, the Met Eireann header,
+    then one row per hour ('01-jan-1996 00:00') with some blank (' ') readings
+
+    Returns:
+        path
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, periods=int(years * 365.25 * 24), freq='h')
+    n = len(dates)
+    day_of_year = dates.dayofyear.to_numpy()
+    hour = dates.hour.to_numpy()
+    temp = (9.5 + 5 * np.sin(2 * np.pi * (day_of_year - 110) / 365.25)
+            + 3 * np.sin(2 * np.pi * (hour - 9) / 24) + rng.normal(0, 2, n))
+    wdsp = np.clip(rng.gamma(2.5, 4.0, n), 0, 80)
+    values = {
+        'rain': np.where(rng.random(n) < 0.7, 0.0, rng.exponential(0.6, n)).round(1),
+        'temp': temp.round(1),
+        'wetb': (temp - rng.uniform(0, 2, n)).round(1),
+        'dewpt': (temp - rng.uniform(0, 4, n)).round(1),
+        'vappr': rng.uniform(5, 16, n).round(1),
+        'rhum': rng.integers(55, 100, n),
+        'msl': rng.normal(1012, 12, n).round(1),
+        'wdsp': wdsp.astype('int64'),
+        'wddir': rng.integers(0, 36, n) * 10,
+        'ww': rng.integers(0, 100, n), 'w': rng.integers(0, 10, n), 'sun': rng.uniform(0, 1, n).round(1),
+        'vis': rng.integers(100, 50000, n), 'clht': rng.integers(1, 999, n), 'clamt': rng.integers(0, 9, n),
+    }
+    columns = {'date': dates.strftime('%d-%b-%Y %H:%M').str.lower()}
+    for i, name in enumerate(CLIMATE_COLUMNS[1:]):
+        # ind columns sit next to the value they flag ... duplicate names as in the real file
+        column = pd.Series(values[name] if name != 'ind' else np.zeros(n, dtype='int64')).astype(str)
+        if name in ('temp', 'wdsp', 'rain', 'msl'):
+            column[rng.random(n) < missing_rate] = ' '
+        columns[i] = column.to_numpy()
+    df = pd.DataFrame(columns)
+    df.columns = CLIMATE_COLUMNS
+
+    with open(path, 'w', newline='') as fp:
+        fp.write("Station Name: SYNTHETIC (benchmarks)\n")
+        for line in range(1, CLIMATE_META_LINES):
+            fp.write(f"{'Legend' if line == 1 else ''} meta line {line}\n")
+        df.to_csv(fp, index=False)
+    return path
+
+
+# ---------------- everything for one scale ----------------
+def generate_all(folder, scale='small', seed=0):
+    """
+    Generate every dataset for a scale into folder (skipped if already there
+    for the same scale and seed)
+
+    Returns:
+        dict of paths / settings, also saved as folder/manifest.json
+    """
+    params = SCALES[scale]
+    manifest_path = os.path.join(folder, 'manifest.json')
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as fp:
+            manifest = json.load(fp)
+        if manifest.get('scale') == scale and manifest.get('seed') == seed:
+            return manifest
+
+    os.makedirs(folder, exist_ok=True)
+    print(f"Generating {scale} benchmark data in {folder}")
+    start = '2024-12-18'
+    hours = gharchive_hours(os.path.join(folder, 'gharchive'), start, params['hours'],
+                            params['events_per_hour'], params['repos'], params['actors'], seed)
+    manifest = {
+        'scale': scale,
+        'seed': seed,
+        'params': params,
+        'gharchive': os.path.join(folder, 'gharchive'),
+        'hours': hours,
+        'start': start,
+        'tables': quarterly_tables(os.path.join(folder, 'github-programming-languages-data'),
+                                   params['languages'], params['years'], seed),
+        'kaggle': kaggle_repos(os.path.join(folder, 'DatasetDataKaggle.csv'), params['kaggle_rows'], seed=seed),
+        'climate': climate_csv(os.path.join(folder, 'hly4935.csv'), params['climate_years'], seed=seed),
+    }
+    with open(manifest_path, 'w') as fp:
+        json.dump(manifest, fp, indent=1)
+    return manifest
@@ -0,0 +1,214 @@
+'''
+Run benchmarks in fresh processes and keep a JSON history of the results
+
+Every benchmark runs in its own spawned process, so the peak RSS measured
+(VmHWM / getrusage ru_maxrss, including any worker processes it starts) belongs to
+that benchmark alone and nothing is left in memory or cached from an earlier one.
+
+History file (benchmarks/history.json by default):
+
+    {'runs': [{'timestamp': '2026-10-18T09:00:00', 'commit': 'aa7d777', 'scale': 'small',
+               'machine': {'node': ..., 'cpus': 8, 'python': '3.11.9', 'pandas': ...},
+               'results': {'ingest_stream': {'seconds': 1.92, 'peak_rss_mb': 210.4}, ...}}]}
+
+A result is a regression when it is more than threshold (e.g. 0.25 = 25%)
+slower, or uses more than rss_threshold more memory, than the median of the
+last baseline_runs runs at the same scale on the same machine. Tiny absolute
+changes (min_seconds / min_rss_mb) are ignored as noise.
+'''
+from datetime import datetime
+import multiprocessing
+import contextlib
+import traceback
+import platform
+import resource
+import subprocess
+import statistics
+import queue
+import json
+import time
+import sys
+import gc
+import os
+
+from . import REPO_ROOT
+
+HISTORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'history.json')
+TIMEOUT = 1800          # seconds for one benchmark process
+
+
+def _max_rss_mb(who=resource.RUSAGE_SELF):
+    """
+    Peak resident set size in MB. On Linux ru_maxrss is carried over from the
+    parent through fork / exec, so this process's own peak is read from VmHWM
+    in /proc/self/status (ru_maxrss is KB on Linux, bytes on macOS)
+    """
+    if who == resource.RUSAGE_SELF and os.path.exists('/proc/self/status'):
+        with open('/proc/self/status') as fp:
+            for line in fp:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    rss = resource.getrusage(who).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def _child(name, manifest, workdir, verbose, results):
+    """Benchmark process: setup (not timed), then the timed loops"""
+    try:
+        from .suite import BENCHMARKS
+        bench = BENCHMARKS[name]
+        os.makedirs(workdir, exist_ok=True)
+        with open(os.devnull, 'w') as devnull, \
+                contextlib.nullcontext() if verbose else contextlib.redirect_stdout(devnull):
+            timed = bench.setup(manifest, workdir)
+            setup_rss = _max_rss_mb()
+            gc.collect()
+            start = time.perf_counter()
+            for _ in range(bench.loops):
+                timed()
+            seconds = (time.perf_counter() - start) / bench.loops
+        results.put({
+            'seconds': seconds,
+            'peak_rss_mb': max(_max_rss_mb(), _max_rss_mb(resource.RUSAGE_CHILDREN)),
+            'setup_rss_mb': setup_rss,
+            'loops': bench.loops,
+        })
+    except Exception:
+        results.put({'error': traceback.format_exc()})
+
+
+def run_isolated(name, manifest, workdir, verbose=False, timeout=TIMEOUT):
+    """Run one benchmark in a new process ... returns its result dict (or {'error': ...})"""
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=_child, args=(name, manifest, workdir, verbose, results))
+    process.start()
+    deadline = time.time() + timeout
+    result = None
+    while result is None:
+        try:
+            result = results.get(timeout=1)
+        except queue.Empty:
+            # A crashed (e.g. out of memory) process never sends a result
+            if not process.is_alive():
+                try:
+                    result = results.get(timeout=1)
+                except queue.Empty:
+                    result = {'error': f"benchmark process died (exit code {process.exitcode})"}
+            elif time.time() > deadline:
+                process.kill()
+                result = {'error': f"no result after {timeout}s"}
+    process.join(timeout=10)
+    if process.is_alive():
+        process.kill()
+    return result
+
+
+def run_benchmarks(names, manifest, workdir, repeat=1, verbose=False):
+    """
+    Run each benchmark repeat times (each in a fresh process) and keep the best
+    time and the lowest peak RSS
+
+    Returns:
+        {name: {'seconds', 'peak_rss_mb', 'setup_rss_mb', 'loops'} or {'error'}}
+    """
+    results = {}
+    for name in names:
+        runs = [run_isolated(name, manifest, os.path.join(workdir, f"{name}_{i}"), verbose)
+                for i in range(repeat)]
+        good = [run for run in runs if 'error' not in run]
+        if not good:
+            results[name] = runs[0]
+            print(f"  {name:<22} FAILED\n{runs[0]['error']}")
+            continue
+        results[name] = {
+            'seconds': min(run['seconds'] for run in good),
+            'peak_rss_mb': min(run['peak_rss_mb'] for run in good),
+            'setup_rss_mb': min(run['setup_rss_mb'] for run in good),
+            'loops': good[0]['loops'],
+        }
+        print(f"  {name:<22} {results[name]['seconds']:9.4f}s   {results[name]['peak_rss_mb']:8.1f} MB peak")
+    return results
+
+
+# ---------------- history ----------------
+def machine_info():
+    import numpy as np
+    import pandas as pd
+    return {'node': platform.node(), 'cpus': os.cpu_count(), 'platform': platform.platform(),
+            'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                              text=True, timeout=30).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def load_history(path=HISTORY_FILE):
+    if not os.path.exists(path):
+        return {'runs': []}
+    with open(path) as fp:
+        return json.load(fp)
+
+
+def save_history(history, path=HISTORY_FILE):
+    # Write then rename, so an interrupted run never leaves half a history file
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as fp:
+        json.dump(history, fp, indent=1)
+    os.replace(tmp_path, path)
+
+
+def new_run(scale, results):
+    return {'timestamp': datetime.now().isoformat(timespec='seconds'), 'commit': git_commit(),
+            'scale': scale, 'machine': machine_info(), 'results': results}
+
+
+def baseline(history, name, scale, node, baseline_runs=5):
+    """Median seconds / peak RSS of the last baseline_runs good results (None if no history)"""
+    previous = [run['results'][name] for run in history['runs']
+                if run['scale'] == scale and run['machine'].get('node') == node
+                and name in run['results'] and 'error' not in run['results'][name]]
+    previous = previous[-baseline_runs:]
+    if not previous:
+        return None
+    return {'seconds': statistics.median(r['seconds'] for r in previous),
+            'peak_rss_mb': statistics.median(r['peak_rss_mb'] for r in previous),
+            'runs': len(previous)}
+
+
+def compare(results, history, scale, threshold=0.25, rss_threshold=0.25, baseline_runs=5,
+            min_seconds=0.01, min_rss_mb=10.0):
+    """
+    Check results against the history
+
+    Returns:
+        list of regression messages (empty = no regressions)
+    """
+    node = platform.node()
+    regressions = []
+    print(f"\n{'benchmark':<22} {'seconds':>9} {'baseline':>9} {'change':>8}   {'peak MB':>8} {'baseline':>9} {'change':>8}")
+    for name, result in results.items():
+        if 'error' in result:
+            regressions.append(f"{name}: failed")
+            continue
+        base = baseline(history, name, scale, node, baseline_runs)
+        if base is None:
+            print(f"{name:<22} {result['seconds']:9.4f} {'-':>9} {'new':>8}   {result['peak_rss_mb']:8.1f} {'-':>9} {'new':>8}")
+            continue
+        time_change = result['seconds'] / base['seconds'] - 1 if base['seconds'] else 0.0
+        rss_change = result['peak_rss_mb'] / base['peak_rss_mb'] - 1 if base['peak_rss_mb'] else 0.0
+        flags = ''
+        if time_change > threshold and result['seconds'] - base['seconds'] > min_seconds:
+            regressions.append(f"{name}: {result['seconds']:.4f}s vs {base['seconds']:.4f}s ({time_change:+.0%})")
+            flags += ' TIME'
+        if rss_change > rss_threshold and result['peak_rss_mb'] - base['peak_rss_mb'] > min_rss_mb:
+            regressions.append(f"{name}: {result['peak_rss_mb']:.1f} MB vs {base['peak_rss_mb']:.1f} MB peak RSS "
+                               f"({rss_change:+.0%})")
+            flags += ' RSS'
+        print(f"{name:<22} {result['seconds']:9.4f} {base['seconds']:9.4f} {time_change:+8.1%}   "
+              f"{result['peak_rss_mb']:8.1f} {base['peak_rss_mb']:9.1f} {rss_change:+8.1%}{flags}")
+    return regressions
@@ -0,0 +1,292 @@
+'''
+The benchmarks, one per pipeline stage
+
+Each benchmark function does its setup (reading the generated data, starting
+the mock server ...) and returns the callable that is timed, so only the
+stage itself counts towards the wall time. Peak RSS is for the whole
+benchmark process (setup included), as it would be in the notebook.
+
+Stages:
+    ingest     GH Archive hours -> DataFrame (streamed, compact, parallel)
+    filter     raw line pre-filter and filtered download
+    save       save_to_file as csv / parquet / partitioned dataset
+    notebook   Project.ipynb pivot, rolling, rank and trend steps
+    api        concurrent search collector against mock_github_api.py
+    weather    assignment06 hly4935.csv readers
+
+Example:
+    from benchmarks.suite import BENCHMARKS
+    timed = BENCHMARKS['trend_table'].setup(manifest, workdir)
+    timed()
+'''
+from datetime import datetime, timedelta
+from .generators import language_names
+import pandas as pd
+import os
+
+BENCHMARKS = {}
+
+
+class Benchmark:
+    def __init__(self, name, stage, setup, loops=1):
+        self.name = name
+        self.stage = stage
+        self.setup = setup
+        self.loops = loops
+        self.description = (setup.__doc__ or '').strip().splitlines()[0] if setup.__doc__ else ''
+
+
+def benchmark(stage, loops=1):
+    """
+    Register a benchmark. loops > 1 for stages that only take milliseconds
+    (the time recorded is per loop)
+    """
+    def register(setup):
+        BENCHMARKS[setup.__name__] = Benchmark(setup.__name__, stage, setup, loops)
+        return setup
+    return register
+
+
+# ---------------- shared setup ----------------
+def _hour_range(manifest):
+    start = datetime.strptime(manifest['start'], '%Y-%m-%d')
+    return start, start + timedelta(hours=len(manifest['hours']) - 1)
+
+
+def _offline_cache(manifest, workdir):
+    from gharchive_cache import HourlyArchiveCache
+    cache = HourlyArchiveCache(os.path.join(workdir, 'cache'), offline=True)
+    cache.import_directory(manifest['gharchive'])
+    return cache
+
+
+def _events(manifest, workdir, event_types=None):
+    from gharchive_test2 import download_filtered_events
+    start, end = _hour_range(manifest)
+    return download_filtered_events(start, end, event_types=event_types, max_rows=None,
+                                    cache=_offline_cache(manifest, workdir))
+
+
+def _prs_pivot(manifest, table='prs', top_n=None):
+    """The notebook's PR pivot (cell 'Line Plot ... prs.csv'), optionally top_n languages"""
+    prs = pd.read_csv(manifest['tables'][table])
+    if top_n:
+        top_languages = prs.groupby("name")["count"].sum().sort_values(ascending=False).head(top_n).index
+        prs = prs[prs["name"].isin(top_languages)]
+    prs = prs.assign(date=pd.to_datetime(dict(year=prs["year"], month=(prs["quarter"] - 1) * 3 + 1, day=1)))
+    return prs.pivot_table(index="date", columns="name", values="count", aggfunc="sum").sort_index()
+
+
+# ---------------- ingest ----------------
+@benchmark('ingest')
+def ingest_stream(manifest, workdir):
+    """download_filtered_events over every hour (no filter), read from the hourly cache"""
+    from gharchive_test2 import download_filtered_events
+    start, end = _hour_range(manifest)
+    cache = _offline_cache(manifest, workdir)
+    return lambda: download_filtered_events(start, end, max_rows=None, cache=cache)
+
+
+@benchmark('ingest')
+def ingest_compact(manifest, workdir):
+    """download_filtered_events with compact=True (categoricals, UTC datetimes)"""
+    from gharchive_test2 import download_filtered_events
+    start, end = _hour_range(manifest)
+    cache = _offline_cache(manifest, workdir)
+    return lambda: download_filtered_events(start, end, max_rows=None, cache=cache, compact=True)
+
+
+@benchmark('ingest')
+def ingest_parallel(manifest, workdir):
+    """download_events_parallel from the folder of hours with 2 worker processes"""
+    from gharchive_parallel import download_events_parallel
+    start, end = _hour_range(manifest)
+    return lambda: download_events_parallel(start, end, workers=2, source=manifest['gharchive'])
+
+
+# ---------------- filter ----------------
+@benchmark('filter')
+def filter_lines(manifest, workdir):
+    """EventFilter.filter_lines (raw pre-filter, then JSON decode) over every line"""
+    from gharchive_filters import compile_filters
+    import gzip
+    event_filter = compile_filters(['PushEvent', 'PullRequestEvent'], repos=['microsoft/*', '*/linux', 'owner1*'])
+    paths = [os.path.join(manifest['gharchive'], f"{hour}.json.gz") for hour in manifest['hours']]
+
+    def run():
+        matched = 0
+        for path in paths:
+            with gzip.open(path, 'rb') as gz:
+                matched += sum(1 for _ in event_filter.filter_lines(gz))
+        return matched
+    return run
+
+
+@benchmark('filter')
+def filter_download(manifest, workdir):
+    """download_filtered_events for PushEvent / PullRequestEvent only"""
+    from gharchive_test2 import download_filtered_events
+    start, end = _hour_range(manifest)
+    cache = _offline_cache(manifest, workdir)
+    return lambda: download_filtered_events(start, end, event_types=['PushEvent', 'PullRequestEvent'],
+                                            max_rows=None, cache=cache)
+
+
+# ---------------- save ----------------
+def _save(manifest, workdir, format, filename):
+    from gharchive_test2 import save_to_file
+    events = _events(manifest, workdir)
+    path = os.path.join(workdir, filename)
+
+    def run():
+        if format == 'dataset' and os.path.exists(path):
+            import shutil
+            shutil.rmtree(path)
+        save_to_file(events, path, format=format)
+    return run
+
+
+@benchmark('save')
+def save_csv(manifest, workdir):
+    """save_to_file(format='csv') of all the ingested events"""
+    return _save(manifest, workdir, 'csv', 'events.csv')
+
+
+@benchmark('save')
+def save_parquet(manifest, workdir):
+    """save_to_file(format='parquet') of all the ingested events"""
+    return _save(manifest, workdir, 'parquet', 'events.parquet')
+
+
+@benchmark('save')
+def save_dataset(manifest, workdir):
+    """save_to_file(format='dataset') ... partitioned EventStore append"""
+    return _save(manifest, workdir, 'dataset', 'events_store')
+
+
+# ---------------- Project.ipynb ----------------
+@benchmark('notebook', loops=20)
+def notebook_pivot(manifest, workdir):
+    """prs.csv top 10 languages -> date -> pivot_table, as in the notebook"""
+    return lambda: _prs_pivot(manifest, 'prs', top_n=10)
+
+
+@benchmark('notebook')
+def repo_quarter_counts(manifest, workdir):
+    """repo_counts() on the Kaggle metadata + the quarterly pivot"""
+    from repo_quarters import repo_counts
+    df = pd.read_csv(manifest['kaggle'])
+
+    def run():
+        repos_by_quarter, repos_by_year = repo_counts(df)
+        return repos_by_quarter.pivot_table(index="year_quarter", columns="Primary Language",
+                                            values="repo_count", aggfunc="sum").sort_index()
+    return run
+
+
+@benchmark('notebook', loops=20)
+def language_trends(manifest, workdir):
+    """LanguageTrends.from_frames (prs + issues + repos) and a pivot"""
+    from language_trends import LanguageTrends
+    quarterly = {table: pd.read_csv(manifest['tables'][table]) for table in ('prs', 'issues')}
+    repo_totals = pd.read_csv(manifest['tables']['repos'])
+
+    def run():
+        trends = LanguageTrends.from_frames(quarterly, repo_totals)
+        return trends.pivot('prs', trends.top_n('prs', 10))
+    return run
+
+
+@benchmark('notebook', loops=20)
+def rolling_rank(manifest, workdir):
+    """The notebook's rolling mean / share / rank / smoothed rank on the full prs pivot"""
+    pivot = _prs_pivot(manifest)
+
+    def run():
+        rolling = pivot.rolling(window=4).mean()
+        share = pivot.div(pivot.sum(axis=1), axis='index').rolling(window=4).mean()
+        ranks = pivot.rank(axis=1, method="min", ascending=False)
+        return rolling, share, ranks.mean().sort_values(), ranks.rolling(window=4, min_periods=2).mean()
+    return run
+
+
+@benchmark('notebook', loops=20)
+def rolling_trends(manifest, workdir):
+    """RollingTrends.from_pivot (incremental rolling / share / rank) on the full prs pivot"""
+    from rolling_trends import RollingTrends
+    pivot = _prs_pivot(manifest)
+
+    def run():
+        trends = RollingTrends.from_pivot(pivot)
+        return trends.rolling_share(), trends.rank_smoothed()
+    return run
+
+
+@benchmark('notebook', loops=20)
+def trend_table(manifest, workdir):
+    """trend_table_many (OLS slope, r2, CAGR, average rank) for prs and issues"""
+    from trend_metrics import trend_table_many
+    pivots = {table: _prs_pivot(manifest, table) for table in ('prs', 'issues')}
+    return lambda: trend_table_many(pivots)
+
+
+@benchmark('notebook')
+def lifespan(manifest, workdir):
+    """lifespan_metrics + Kaplan-Meier per language on the Kaggle metadata"""
+    from repo_lifespan import lifespan_metrics, kaplan_meier
+    df = pd.read_csv(manifest['kaggle'])
+
+    def run():
+        metrics = lifespan_metrics(df, now='2019-01-01', date_format='%d %B %Y')
+        return kaplan_meier(metrics['lifespan_months'], metrics['inactive'], groups=metrics['Primary Language'])
+    return run
+
+
+# ---------------- API ----------------
+@benchmark('api')
+def api_collector(manifest, workdir):
+    """collect_language_data_concurrent (monthly cells) against the local mock API"""
+    from github_search_scheduler import collect_language_data_concurrent, SearchScheduler, SearchClient, RateLimitBucket
+    from mock_github_api import start_mock_server
+    params = manifest['params']
+    # A limit high enough that the run measures the client, not the rate limit wait
+    server, state, base_url = start_mock_server(limit=100_000, window=60)
+    languages = language_names(params['api_languages'])
+    start_year, end_year = params['api_years']
+
+    def run():
+        scheduler = SearchScheduler(SearchClient(None, base_url), workers=8,
+                                    bucket=RateLimitBucket(limit=state.limit), progress_every=0)
+        df = collect_language_data_concurrent(languages, start_year, end_year, workers=8,
+                                              token=None, base_url=base_url, scheduler=scheduler)
+        if df['repo_count'].isna().any() or df.empty:
+            raise RuntimeError("Collector returned missing cells")
+        return df
+    return run
+
+
+# ---------------- assignment06 ----------------
+@benchmark('weather')
+def weather_stream(manifest, workdir):
+    """aggregate_weather (chunked daily / monthly stats) over the whole file"""
+    from weather_stream import aggregate_weather
+    return lambda: aggregate_weather(manifest['climate'], columns=['temp', 'wdsp'])
+
+
+@benchmark('weather')
+def wind_cache_build(manifest, workdir):
+    """build_wind_cache: read the CSV, add the notebook's wind stats and save to Feather"""
+    from wind_cache import build_wind_cache
+    path = os.path.join(workdir, 'wind_data_stats.feather')
+    return lambda: build_wind_cache(manifest['climate'], path)
+
+
+@benchmark('weather', loops=20)
+def wind_cache_load(manifest, workdir):
+    """load_wind_cache of one month (memory-mapped, binary search on date)"""
+    from wind_cache import build_wind_cache, load_wind_cache
+    path = os.path.join(workdir, 'wind_data_stats.feather')
+    df = build_wind_cache(manifest['climate'], path)
+    middle = df['date'].iloc[len(df) // 2]
+    del df
+    return lambda: load_wind_cache(path, middle, middle + pd.Timedelta(days=30))
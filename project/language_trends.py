@@ -0,0 +1,255 @@
+'''
+One loader for all the language trend data used in Project.ipynb
+
+    prs.csv, issues.csv    name, year, quarter, count        (quarterly)
+    repos.csv              language, num_repos                (totals)
+    DatasetDataKaggle.csv  Primary Language, created_at ...   (one row per repo)
+
+Each file is read once into one long table. Languages are stored as integer
+codes into a single shared list of canonical names (so 'VimL' / 'Vim script'
+or 'c#' / 'C#' are the same language in every source). Counts are indexed by
+(source, language, year, quarter), and language totals per source are worked
+out once at load time. Top-N lists, pivots and cross-source ratios such as
+PRs per repo or issues per PR then come from index lookups.
+
+Example:
+    trends = LanguageTrends.load('./data')
+    top10 = trends.top_n('prs', 10)
+    prs_pivot = trends.pivot('prs', top10, start='2012-01-01', end='2021-10-01')
+    issues_per_pr = trends.ratio('issues', 'prs', top10)
+'''
+import pandas as pd
+import numpy as np
+import os
+
+GH_DATA_DIR = 'github-programming-languages-data'
+KAGGLE_FILE = os.path.join('A Large-Scale Dataset of Popular OSS Projects', 'DatasetDataKaggle.csv')
+
+# Spellings that differ between sources / GitHub linguist versions -> one name
+LANGUAGE_ALIASES = {
+    'viml': 'Vim script',
+    'vim script': 'Vim script',
+    'vimscript': 'Vim script',
+    'golang': 'Go',
+    'csharp': 'C#',
+    'c sharp': 'C#',
+    'cpp': 'C++',
+    'js': 'JavaScript',
+    'node.js': 'JavaScript',
+    'objective c': 'Objective-C',
+    'objectivec': 'Objective-C',
+    'shell script': 'Shell',
+    'ipython notebook': 'Jupyter Notebook',
+}
+
+
+class LanguageDimension:
+    """Canonical language names and their integer codes (code = position in names)"""
+
+    def __init__(self):
+        self.names = []
+        self.codes = {}     # lower case key -> code
+
+    @staticmethod
+    def key(name):
+        return ' '.join(str(name).split()).lower()
+
+    def canonical(self, name):
+        key = self.key(name)
+        return LANGUAGE_ALIASES.get(key, ' '.join(str(name).split()))
+
+    def encode(self, values):
+        """Codes for an array of names, adding new languages (one dict lookup per distinct name)"""
+        uniques, inverse = np.unique(np.asarray(values, dtype=object).astype(str), return_inverse=True)
+        mapped = np.empty(len(uniques), dtype='int32')
+        for i, name in enumerate(uniques):
+            canonical = self.canonical(name)
+            key = self.key(canonical)
+            if key not in self.codes:
+                self.codes[key] = len(self.names)
+                self.names.append(canonical)
+            mapped[i] = self.codes[key]
+        return mapped[inverse]
+
+    def code(self, name):
+        return self.codes.get(self.key(self.canonical(name)))
+
+    def __len__(self):
+        return len(self.names)
+
+
+class LanguageTrends:
+    """
+    All sources in one long table: source, lang (code), year, quarter, count
+
+    Attributes:
+        languages: LanguageDimension shared by every source
+        counts: Series of counts indexed by (source, lang, year, quarter), sorted
+        totals: Series of all-time totals indexed by (source, lang)
+        repo_totals: Series of repos.csv num_repos indexed by lang
+    """
+
+    QUARTERLY_SOURCES = ('prs', 'issues', 'kaggle_repos')
+
+    def __init__(self):
+        self.languages = LanguageDimension()
+        self.counts = None
+        self.totals = None
+        self.repo_totals = None
+
+    # ---------------- loading ----------------
+    @classmethod
+    def load(cls, data_dir='./data'):
+        """Read prs.csv, issues.csv, repos.csv and the Kaggle dataset once each"""
+        trends = cls()
+        gh_dir = os.path.join(data_dir, GH_DATA_DIR)
+        frames = []
+        for source in ('prs', 'issues'):
+            df = pd.read_csv(os.path.join(gh_dir, f"{source}.csv"))
+            frames.append(trends._long(source, df['name'], df['year'], df['quarter'], df['count']))
+
+        kaggle_path = os.path.join(data_dir, KAGGLE_FILE)
+        if os.path.exists(kaggle_path):
+            from repo_quarters import repo_counts
+            kaggle = pd.read_csv(kaggle_path, usecols=['Primary Language', 'created_at'])
+            by_quarter, _ = repo_counts(kaggle)
+            frames.append(trends._long('kaggle_repos', by_quarter['Primary Language'],
+                                       by_quarter['year_quarter'].dt.year,
+                                       by_quarter['year_quarter'].dt.quarter,
+                                       by_quarter['repo_count']))
+        else:
+            print(f"Kaggle dataset not found: {kaggle_path}")
+
+        trends._set_repo_totals(pd.read_csv(os.path.join(gh_dir, 'repos.csv')))
+        trends._build(frames)
+        return trends
+
+    @classmethod
+    def from_frames(cls, quarterly, repo_totals=None):
+        """
+        Build from DataFrames already in memory
+
+        Args:
+            quarterly: {source: DataFrame with name, year, quarter, count}
+            repo_totals: Optional DataFrame with language, num_repos
+        """
+        trends = cls()
+        frames = [trends._long(source, df['name'], df['year'], df['quarter'], df['count'])
+                  for source, df in quarterly.items()]
+        if repo_totals is not None:
+            trends._set_repo_totals(repo_totals)
+        trends._build(frames)
+        return trends
+
+    def _long(self, source, names, years, quarters, counts):
+        return pd.DataFrame({
+            'source': source,
+            'lang': self.languages.encode(names),
+            'year': np.asarray(years, dtype='int16'),
+            'quarter': np.asarray(quarters, dtype='int8'),
+            'count': np.asarray(counts, dtype='int64'),
+        })
+
+    def _set_repo_totals(self, repos):
+        self.repo_totals = (
+            pd.Series(repos['num_repos'].to_numpy(), index=self.languages.encode(repos['language']), name='num_repos')
+            .groupby(level=0).sum()
+            .rename_axis('lang')
+        )
+
+    def _build(self, frames):
+        long = pd.concat(frames, ignore_index=True)
+        long['source'] = long['source'].astype('category')
+        # Aliases can map two rows onto one language ... add them up
+        self.counts = long.groupby(['source', 'lang', 'year', 'quarter'], observed=True)['count'].sum().sort_index()
+        self.totals = self.counts.groupby(level=['source', 'lang'], observed=True).sum()
+
+    # ---------------- lookups ----------------
+    def name(self, code):
+        return self.languages.names[code]
+
+    def codes(self, languages):
+        """Codes for a list of names (unknown names are skipped)"""
+        codes = [self.languages.code(language) for language in languages]
+        return [code for code in codes if code is not None]
+
+    def table(self, source=None):
+        """Long table with language names (all sources, or one)"""
+        counts = self.counts if source is None else self.counts.xs(source, level='source', drop_level=False)
+        df = counts.reset_index()
+        df['language'] = pd.Categorical.from_codes(df['lang'], categories=self.languages.names)
+        return df
+
+    def top_n(self, source, n=10):
+        """The n languages with the largest all-time total for a source ('repos' = repos.csv)"""
+        totals = self.repo_totals if source == 'repos' else self.totals.xs(source, level='source')
+        return [self.name(code) for code in totals.nlargest(n).index]
+
+    def series(self, source, languages=None):
+        """Counts for one source indexed by (lang, year, quarter), optionally for some languages"""
+        counts = self.counts.xs(source, level='source')
+        if languages is not None:
+            counts = counts[counts.index.get_level_values('lang').isin(self.codes(languages))]
+        return counts
+
+    def pivot(self, source, languages=None, start=None, end=None):
+        """
+        Quarter start date x language pivot like the notebook's prs_pivot / repos_pivot
+
+        Args:
+            source: 'prs', 'issues' or 'kaggle_repos'
+            languages: Columns to include (default all languages in the source)
+            start, end: Optional date limits (inclusive)
+        """
+        wide = self._to_pivot(self.series(source, languages), languages)
+        if start is not None:
+            wide = wide[wide.index >= pd.Timestamp(start)]
+        if end is not None:
+            wide = wide[wide.index <= pd.Timestamp(end)]
+        return wide
+
+    def ratio(self, numerator, denominator, languages=None):
+        """
+        Cross-source ratio
+
+        * two quarterly sources (e.g. 'issues', 'prs') -> per (language, quarter) pivot
+        * a quarterly source over 'repos' (repos.csv) -> all-time total per language
+          (e.g. PRs per repo)
+        """
+        if denominator == 'repos':
+            totals = self.totals.xs(numerator, level='source')
+            result = (totals / self.repo_totals).dropna()
+            result.index = [self.name(code) for code in result.index]
+            if languages is not None:
+                result = result.reindex([l for l in languages if l in result.index])
+            return result.rename(f"{numerator}_per_repo")
+        num = self.series(numerator, languages)
+        den = self.series(denominator, languages)
+        joined = (num / den).dropna()
+        return self._to_pivot(joined, languages)
+
+    def _to_pivot(self, series, languages=None):
+        wide = series.unstack('lang')
+        years = wide.index.get_level_values('year').astype(int)
+        quarters = wide.index.get_level_values('quarter').astype(int)
+        wide.index = pd.to_datetime(dict(year=years, month=(quarters - 1) * 3 + 1, day=1))
+        wide.index.name = 'date'
+        wide.columns = [self.name(code) for code in wide.columns]
+        if languages is not None:
+            wide = wide[[language for language in languages if language in wide.columns]]
+        return wide.sort_index()
+
+    def summary(self):
+        sources = {source: int(n) for source, n in self.counts.groupby(level='source', observed=True).size().items()}
+        return (f"{len(self.languages)} languages, quarterly rows per source {sources}, "
+                f"{0 if self.repo_totals is None else len(self.repo_totals)} repos.csv totals")
+
+
+if __name__ == "__main__":
+    trends = LanguageTrends.load('./data')
+    print(trends.summary())
+    top10 = trends.top_n('prs', 10)
+    print("Top 10 by PRs:", top10)
+    print(trends.pivot('prs', top10, start='2012-01-01', end='2021-10-01').tail())
+    print(trends.ratio('prs', 'repos', top10).round(3))
+    print(trends.ratio('issues', 'prs', top10).tail().round(2))
@@ -0,0 +1,187 @@
+'''
+Quarter / year bucketing of repository creation dates (Project.ipynb, Kaggle OSS dataset)
+
+The notebook parsed "29 October 2007" style dates without a format (pandas has to
+guess per row) and built year_quarter with a Python function + strptime per row.
+Here the dates are parsed with an explicit format, the quarter start is worked
+out with integer arithmetic on whole columns, and one bincount gives the counts
+for both repos_by_quarter and repos_by_year.
+
+Example:
+    df_muna = pd.read_csv("./data/A Large-Scale Dataset of Popular OSS Projects/DatasetDataKaggle.csv")
+    repos_by_quarter, repos_by_year = repo_counts(df_muna)
+'''
+import pandas as pd
+import numpy as np
+import time
+
+CREATED_FORMAT = '%d %B %Y'   # 29 October 2007
+
+
+def parse_dates(values, date_format=CREATED_FORMAT):
+    """
+    Parse text dates with an explicit format, parsing each distinct string only once
+    (a dataset has far fewer distinct days than rows). Unparseable values become NaT
+    """
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    parsed = pd.to_datetime(pd.Series(uniques, dtype=object), format=date_format, errors='coerce').to_numpy()
+    result = np.full(len(codes), np.datetime64('NaT'), dtype=parsed.dtype if len(parsed) else 'datetime64[ns]')
+    known = codes >= 0
+    result[known] = parsed[codes[known]]
+    return result
+
+
+def add_quarters(df, date_col='created_at', date_format=CREATED_FORMAT):
+    """
+    Parse a date column once and add year, quarter and year_quarter (first day of the quarter)
+
+    Rows with a missing / unparseable date are dropped (as in the notebook).
+
+    Args:
+        df: DataFrame with the date column as text
+        date_col: Column to parse
+        date_format: strftime format of the text dates
+
+    Returns:
+        new DataFrame with date_col as datetime64 and the three new columns
+    """
+    df = df.copy()
+    df[date_col] = parse_dates(df[date_col], date_format)
+    df = df.dropna(subset=[date_col])
+    year = df[date_col].dt.year.to_numpy()
+    quarter = (df[date_col].dt.month.to_numpy() - 1) // 3 + 1
+    df['year'] = year
+    df['quarter'] = quarter
+    df['year_quarter'] = _quarter_starts(year, quarter)
+    return df
+
+
+def _quarter_starts(year, quarter):
+    """Quarter start dates as datetime64 from integer arrays (month = 3 * (q - 1) + 1)"""
+    months = (np.asarray(year, dtype='int64') - 1970) * 12 + (np.asarray(quarter, dtype='int64') - 1) * 3
+    return months.astype('datetime64[M]').astype('datetime64[ns]')
+
+
+def repo_counts(df, lang_col='Primary Language', date_col='created_at', date_format=CREATED_FORMAT):
+    """
+    Count repositories per (quarter, language) and per (year, language) in one pass
+
+    Args:
+        df: Raw Kaggle dataset (or any frame with a language and a text date column)
+        lang_col: Language column
+        date_col: Creation date column
+        date_format: strftime format of date_col
+
+    Returns:
+        (repos_by_quarter, repos_by_year) with the same columns as the notebook:
+            year_quarter, <lang_col>, repo_count
+            year, <lang_col>, repo_count
+    """
+    df = df[[lang_col, date_col]].dropna()
+    created = parse_dates(df[date_col], date_format)
+    valid = ~np.isnat(created)
+    months = created[valid].astype('datetime64[M]').astype('int64')   # months since 1970-01
+
+    lang_codes, languages = pd.factorize(df[lang_col].to_numpy()[valid], sort=True)
+    year = months // 12 + 1970
+    quarter_index = (year - year.min() if len(year) else year) * 4 + (months % 12) // 3
+    n_lang = len(languages)
+    n_quarters = int(quarter_index.max()) + 1 if len(quarter_index) else 0
+
+    # One bincount over (quarter, language) ... years are sums of 4 quarters
+    counts = np.bincount(quarter_index * n_lang + lang_codes,
+                         minlength=n_quarters * n_lang).reshape(n_quarters, n_lang)
+
+    first_year = int(year.min()) if len(year) else 0
+    q_rows, l_cols = np.nonzero(counts)
+    repos_by_quarter = pd.DataFrame({
+        'year_quarter': _quarter_starts(first_year + q_rows // 4, q_rows % 4 + 1),
+        lang_col: languages[l_cols],
+        'repo_count': counts[q_rows, l_cols],
+    })
+
+    n_years = (n_quarters + 3) // 4
+    padded = np.zeros((n_years * 4, n_lang), dtype=counts.dtype)
+    padded[:n_quarters] = counts
+    yearly = padded.reshape(n_years, 4, n_lang).sum(axis=1)
+    y_rows, l_cols = np.nonzero(yearly)
+    repos_by_year = pd.DataFrame({
+        'year': first_year + y_rows,
+        lang_col: languages[l_cols],
+        'repo_count': yearly[y_rows, l_cols],
+    })
+    return repos_by_quarter, repos_by_year
+
+
+def legacy_repo_counts(df, lang_col='Primary Language', date_col='created_at'):
+    """The notebook's original code (format guessing + a Python function per row), for comparison"""
+    from datetime import datetime
+
+    def year_quarter_to_date(year, quarter):
+        month = (quarter - 1) * 3 + 1
+        str_date = f"{year}-{str(month).zfill(2)}-01"
+        return datetime.strptime(str_date, '%Y-%m-%d').date()
+
+    df = df[[lang_col, date_col]].dropna()
+    df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
+    df = df.dropna(subset=[date_col])
+    df["year"] = df[date_col].dt.year
+    df["quarter"] = df[date_col].dt.quarter
+    df["year_quarter"] = df.apply(lambda row: year_quarter_to_date(row["year"], row["quarter"]), axis=1)
+    repos_by_quarter = df.groupby(["year_quarter", lang_col]).size().reset_index(name="repo_count")
+    repos_by_year = df.groupby(["year", lang_col]).size().reset_index(name="repo_count")
+    return repos_by_quarter, repos_by_year
+
+
+def synthetic_repos(rows, seed=0, languages=None):
+    """Random Kaggle-like rows: language + created_at text in the '29 October 2007' format"""
+    rng = np.random.default_rng(seed)
+    languages = languages or ['JavaScript', 'Python', 'Java', 'C++', 'Go', 'TypeScript', 'C',
+                              'Ruby', 'PHP', 'C#', 'Swift', 'Kotlin', 'Rust', 'Scala']
+    # Build the text once per distinct day and index into it (much faster than strftime per row)
+    days = pd.date_range('2008-01-01', '2017-12-31', freq='D')
+    day_text = days.strftime(CREATED_FORMAT).to_numpy(dtype=object)
+    return pd.DataFrame({
+        'Primary Language': np.asarray(languages, dtype=object)[rng.integers(0, len(languages), rows)],
+        'created_at': day_text[rng.integers(0, len(days), rows)],
+    })
+
+
+def benchmark(sizes=(100_000, 1_000_000, 5_000_000), legacy_max=200_000):
+    """
+    Time repo_counts() on synthetic data (and the notebook code up to legacy_max rows,
+    checking both give the same counts)
+
+    Returns:
+        list of (rows, seconds, legacy seconds or None)
+    """
+    results = []
+    for rows in sizes:
+        df = synthetic_repos(rows)
+        start = time.perf_counter()
+        by_quarter, by_year = repo_counts(df)
+        elapsed = time.perf_counter() - start
+
+        legacy = None
+        if rows <= legacy_max:
+            start = time.perf_counter()
+            old_quarter, old_year = legacy_repo_counts(df)
+            legacy = time.perf_counter() - start
+            old_quarter['year_quarter'] = pd.to_datetime(old_quarter['year_quarter'])
+            assert by_quarter['repo_count'].sum() == old_quarter['repo_count'].sum() == rows
+            pd.testing.assert_frame_equal(
+                by_quarter.sort_values(['year_quarter', 'Primary Language']).reset_index(drop=True),
+                old_quarter.sort_values(['year_quarter', 'Primary Language']).reset_index(drop=True),
+                check_dtype=False)
+            pd.testing.assert_frame_equal(by_year.reset_index(drop=True),
+                                          old_year.reset_index(drop=True), check_dtype=False)
+        results.append((rows, elapsed, legacy))
+        line = f"{rows:>10,} rows: {elapsed:6.2f}s ({rows / elapsed / 1e6:.1f}M rows/s)"
+        if legacy is not None:
+            line += f" ... notebook code {legacy:6.2f}s ({legacy / elapsed:.0f}x slower)"
+        print(line)
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,255 @@
+from language_switching import RepoLanguageMap, utc_nanoseconds, UNKNOWN
+import pandas as pd
+import numpy as np
+
+EVENT_TYPES = ['PushEvent', 'PullRequestEvent', 'PullRequestReviewEvent', 'PullRequestReviewCommentEvent',
+               'IssuesEvent', 'IssueCommentEvent', 'WatchEvent', 'ForkEvent', 'CreateEvent', 'DeleteEvent',
+               'ReleaseEvent', 'CommitCommentEvent', 'GollumEvent', 'MemberEvent', 'PublicEvent']
+OTHER = 'Other'
+DAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+HOURS_PER_WEEK = 168
+SLOTS_PER_WEEK = 2 * HOURS_PER_WEEK      # half hours, so +5:30 / +9:30 zones shift exactly
+NS_PER_HOUR = 3600 * 10**9
+NS_PER_SLOT = NS_PER_HOUR // 2
+
+
+def hour_of_week(nanoseconds):
+    """0 = Monday 00:00 UTC ... 167 = Sunday 23:00 UTC (1970-01-01 was a Thursday)"""
+    hours = np.asarray(nanoseconds, dtype='int64') // NS_PER_HOUR
+    return (hours + 3 * 24) % HOURS_PER_WEEK
+
+
+def slot_of_week(nanoseconds):
+    """Half hour of the week: 0 = Monday 00:00-00:30 UTC ... 335 = Sunday 23:30-24:00 UTC"""
+    slots = np.asarray(nanoseconds, dtype='int64') // NS_PER_SLOT
+    return (slots + 3 * 48) % SLOTS_PER_WEEK
+
+
+def local_hours(slots, utc_offset=0):
+    """
+    Half hour of week counts (last axis, UTC) -> hour of week counts in local time.
+    Offsets are applied to the half hour (e.g. 5.5 for India moves every count by
+    11 half hours); quarter hour zones (Nepal +5:45) are rounded to the nearest half hour
+    """
+    shifted = np.roll(slots, int(round(utc_offset * 2)), axis=-1)
+    return shifted.reshape(*shifted.shape[:-1], HOURS_PER_WEEK, 2).sum(axis=-1)
+
+
+class ActivityHistogram:
+    """
+    Event counts by event type x language x half hour of the week (UTC), in one
+    preallocated int64 array. Events are folded in as they are read and never kept.
+    Half hours (not hours) so that zones such as India (UTC+5:30) can be shown in
+    exact local hours.
+
+    The axes are fixed when the histogram is made (types not listed go to 'Other',
+    repos with no known language to 'Unknown'), so histograms built in different
+    processes or for different days add up cell by cell:
+
+        total = hist_day1 + hist_day2           (or hist.merge(other))
+
+    Args:
+        event_types: Event type axis (default EVENT_TYPES)
+        repo_langs: Optional RepoLanguageMap (see language_switching.py) for the language axis
+
+    Example:
+        hist = ActivityHistogram(repo_langs=RepoLanguageMap.from_kaggle())
+        for chunk in stream_filtered_events('2017-08-19', '2017-08-26', chunk_size=5000):
+            hist.add(chunk)
+        sns.heatmap(hist.to_frame(event_type='PushEvent'))
+    """
+
+    def __init__(self, event_types=None, repo_langs=None, languages=None):
+        self.event_types = list(event_types or EVENT_TYPES) + [OTHER]
+        self.type_codes = {t: i for i, t in enumerate(self.event_types)}
+        self.repo_langs = repo_langs
+        if languages is None:
+            languages = repo_langs.languages if repo_langs is not None else []
+        self.languages = list(languages) + ['Unknown']
+        self.counts = np.zeros((len(self.event_types), len(self.languages), SLOTS_PER_WEEK), dtype='int64')
+        self.first_ns = None
+        self.last_ns = None
+
+    # ---------------- folding events in ----------------
+    def _type_codes(self, types):
+        codes, uniques = pd.factorize(pd.Series(types).astype(object))
+        other = self.type_codes[OTHER]
+        mapped = np.array([self.type_codes.get(t, other) for t in uniques] + [other], dtype='int64')
+        return mapped[codes]
+
+    def _language_codes(self, repo_names, n):
+        unknown = len(self.languages) - 1
+        if self.repo_langs is None:
+            return np.full(n, unknown, dtype='int64')
+        codes = self.repo_langs.lookup(repo_names).astype('int64')
+        # Languages added to the map after the histogram was made are 'Unknown' too
+        return np.where((codes == UNKNOWN) | (codes >= unknown), unknown, codes)
+
+    def add_arrays(self, nanoseconds, type_codes, lang_codes):
+        """Fold in already coded events (UTC nanoseconds, type codes, language codes)"""
+        if len(nanoseconds) == 0:
+            return
+        flat = (type_codes * len(self.languages) + lang_codes) * SLOTS_PER_WEEK + slot_of_week(nanoseconds)
+        self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape)
+        lo, hi = int(nanoseconds.min()), int(nanoseconds.max())
+        self.first_ns = lo if self.first_ns is None else min(self.first_ns, lo)
+        self.last_ns = hi if self.last_ns is None else max(self.last_ns, hi)
+
+    def add(self, events):
+        """Fold in a DataFrame chunk (type, created_at and, for languages, repo_name)"""
+        if events.empty:
+            return
+        events = events.dropna(subset=['created_at'])
+        ns = utc_nanoseconds(events['created_at'])
+        types = self._type_codes(events['type'])
+        repo_names = events['repo_name'] if 'repo_name' in events.columns else None
+        langs = self._language_codes(repo_names, len(events)) if repo_names is not None \
+            else np.full(len(events), len(self.languages) - 1, dtype='int64')
+        self.add_arrays(ns, types, langs)
+
+    def add_events(self, events, batch_size=50_000):
+        """Fold in raw GH Archive event dicts (e.g. iter_hour_events), batch_size at a time"""
+        batch = {'type': [], 'created_at': [], 'repo_name': []}
+        for event in events:
+            batch['type'].append(event.get('type'))
+            batch['created_at'].append(event.get('created_at'))
+            batch['repo_name'].append((event.get('repo') or {}).get('name'))
+            if len(batch['type']) >= batch_size:
+                self.add(pd.DataFrame(batch))
+                batch = {key: [] for key in batch}
+        if batch['type']:
+            self.add(pd.DataFrame(batch))
+
+    def add_stream(self, chunks):
+        for chunk in chunks:
+            self.add(chunk)
+        return self
+
+    # ---------------- merging ----------------
+    def _check_axes(self, other):
+        if other.event_types != self.event_types or other.languages != self.languages:
+            raise ValueError("Histograms have different event type / language axes")
+
+    def merge(self, other):
+        """Add another histogram's counts into this one (same axes)"""
+        self._check_axes(other)
+        self.counts += other.counts
+        for ns in (other.first_ns, other.last_ns):
+            if ns is not None:
+                self.first_ns = ns if self.first_ns is None else min(self.first_ns, ns)
+                self.last_ns = ns if self.last_ns is None else max(self.last_ns, ns)
+        return self
+
+    def __add__(self, other):
+        total = ActivityHistogram(self.event_types[:-1], self.repo_langs, self.languages[:-1])
+        return total.merge(self).merge(other)
+
+    def save(self, path):
+        np.savez_compressed(path, counts=self.counts, event_types=np.array(self.event_types),
+                            languages=np.array(self.languages),
+                            span=np.array([self.first_ns or 0, self.last_ns or 0], dtype='int64'))
+
+    @classmethod
+    def load(cls, path, repo_langs=None):
+        data = np.load(path, allow_pickle=False)
+        if data['counts'].shape[-1] != SLOTS_PER_WEEK:
+            raise ValueError(f"{path} was saved with hourly bins ... rebuild it (half hour bins are needed)")
+        hist = cls(list(data['event_types'][:-1]), repo_langs, list(data['languages'][:-1]))
+        hist.counts = data['counts'].astype('int64')
+        first, last = (int(v) for v in data['span'])
+        hist.first_ns, hist.last_ns = (first, last) if last else (None, None)
+        return hist
+
+    # ---------------- results ----------------
+    def _slots(self, event_type=None, language=None):
+        """Half hour of week counts (336, UTC) for one / all event types and languages"""
+        counts = self.counts
+        counts = counts[self.type_codes[event_type]] if event_type is not None else counts.sum(axis=0)
+        counts = counts[self.languages.index(language)] if language is not None else counts.sum(axis=0)
+        return counts
+
+    def select(self, event_type=None, language=None):
+        """Hour of week counts (168, UTC) for one / all event types and languages"""
+        return local_hours(self._slots(event_type, language))
+
+    def to_frame(self, event_type=None, language=None, utc_offset=0, normalise=False):
+        """
+        Day x hour DataFrame (Mon..Sun x 0..23), ready for sns.heatmap
+
+        Args:
+            utc_offset: Hours to shift to local time (e.g. 5.5 for India, 8 for China,
+                        -5 for US Eastern) ... exact to the half hour
+            normalise: Divide by the total (share of the week's events)
+        """
+        week = local_hours(self._slots(event_type, language), utc_offset)
+        week = week / week.sum() if normalise and week.sum() else week
+        return pd.DataFrame(week.reshape(7, 24), index=pd.Index(DAYS, name='day'),
+                            columns=pd.Index(range(24), name='hour'))
+
+    def hour_profile(self, by='language', utc_offset=0):
+        """
+        Share of events in each hour of the day, one row per language (or event type)
+        ... for comparing when different groups are active
+        """
+        axis_names = self.languages if by == 'language' else self.event_types
+        per_hour = local_hours(self.counts.sum(axis=0 if by == 'language' else 1), utc_offset)
+        per_hour = per_hour.reshape(len(axis_names), 7, 24).sum(axis=1)
+        totals = per_hour.sum(axis=1, keepdims=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            share = np.where(totals > 0, per_hour / totals, np.nan)
+        return pd.DataFrame(share, index=pd.Index(axis_names, name=by), columns=pd.Index(range(24), name='hour'))
+
+    def plot_heatmap(self, event_type=None, language=None, utc_offset=0, ax=None):
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        ax = ax or plt.gca()
+        sns.heatmap(self.to_frame(event_type, language, utc_offset), cmap='viridis', ax=ax)
+        zone = f"UTC{utc_offset:+g}" if utc_offset else "UTC"
+        ax.set_title(f"{event_type or 'All events'} / {language or 'all languages'} by hour of week ({zone})")
+        return ax
+
+    def summary(self):
+        span = ''
+        if self.first_ns is not None:
+            span = f" from {pd.Timestamp(self.first_ns, tz='UTC')} to {pd.Timestamp(self.last_ns, tz='UTC')}"
+        return (f"{int(self.counts.sum()):,} events{span}, "
+                f"{len(self.event_types)} event types x {len(self.languages)} languages x {SLOTS_PER_WEEK} half hours")
+
+
+def hour_histogram(hour, repo_langs=None, event_types=None, cache=None):
+    """
+    Histogram of one archive hour (e.g. '2017-08-19-9') ... suitable for a process
+    pool: each worker returns a small array and the results are added together
+    """
+    from gharchive_test2 import iter_hour_events
+    hist = ActivityHistogram(event_types, repo_langs)
+    hist.add_events(iter_hour_events(hour, cache=cache))
+    return hist
+
+
+if __name__ == "__main__":
+    # Fold the sample events in, then 2M synthetic events split into 4 partial histograms
+    import time
+    hist = ActivityHistogram()
+    hist.add(pd.read_csv('github_events.csv'))
+    print(hist.summary())
+
+    rng = np.random.default_rng(0)
+    repo_langs = RepoLanguageMap.from_frame(pd.DataFrame({
+        'full_name': [f"o{i}/r{i}" for i in range(1000)],
+        'language': rng.choice(['Python', 'Go', 'Java', 'C++'], 1000)}))
+    start = time.perf_counter()
+    parts = []
+    for day in range(4):
+        part = ActivityHistogram(repo_langs=repo_langs)
+        n = 500_000
+        part.add(pd.DataFrame({
+            'type': rng.choice(EVENT_TYPES[:6], n),
+            'repo_name': [f"o{i}/r{i}" for i in rng.integers(0, 1000, n)],
+            'created_at': pd.Timestamp('2017-08-14', tz='UTC') + pd.to_timedelta(rng.integers(0, 7 * 86400, n), unit='s'),
+        }))
+        parts.append(part)
+    total = parts[0] + parts[1] + parts[2] + parts[3]
+    elapsed = time.perf_counter() - start
+    print(f"{elapsed:.2f}s ... {total.summary()}, array {total.counts.nbytes / 1e3:.0f} kB")
+    print(total.to_frame('PushEvent', 'Python', utc_offset=5.5).iloc[:, :8])
@@ -0,0 +1,189 @@
+import pandas as pd
+import time
+
+# URL columns that can be rebuilt from other columns (see expand_urls)
+DERIVED_COLUMNS = {
+    'actor_url': lambda df: 'https://api.github.com/users/' + df['actor_login'].astype(str),
+    'actor_avatar_url': lambda df: 'https://avatars.githubusercontent.com/u/' + df['actor_id'].astype(str) + '?',
+    'repo_url': lambda df: 'https://api.github.com/repos/' + df['repo_name'].astype(str),
+    'actor_display_login': lambda df: df['actor_login'].astype(str),
+}
+
+# Column name -> compact dtype
+ID_COLUMNS = ['id', 'actor_id', 'repo_id', 'payload_push_id']
+SMALL_INT_COLUMNS = ['payload_size', 'payload_distinct_size']
+CATEGORY_COLUMNS = ['type', 'actor_login', 'repo_name', 'actor_gravatar_id',
+                    'payload_ref', 'payload_ref_type', 'payload_pusher_type']
+# Unique per row (commit SHAs) ... a category would not help
+TEXT_COLUMNS = ['payload_head', 'payload_before']
+
+
+def _text_dtype():
+    """Arrow backed strings are much smaller than Python str objects (needs pyarrow)"""
+    try:
+        import pyarrow  # noqa: F401
+        return 'string[pyarrow]'
+    except ImportError:
+        return 'string'
+
+
+def _to_boolean(series):
+    if series.dtype == bool or str(series.dtype) == 'boolean':
+        return series.astype('boolean')
+    mapping = {'True': True, 'False': False, 'true': True, 'false': False, True: True, False: False}
+    return series.map(mapping).astype('boolean')
+
+
+def compact_events(df, drop_derived=True):
+    """
+    Convert an events DataFrame (from Archive.to_df() or a saved CSV) to compact dtypes
+
+    * ids                      -> nullable Int64 (no float64 when there are gaps),
+                                  int64 columns with no gaps are kept as they are
+    * counts                   -> nullable Int32
+    * public                   -> boolean (from True/False or the strings "True"/"False")
+    * created_at               -> tz-aware datetime (UTC)
+    * type, logins, repo names, refs -> category when values repeat (arrow strings if not)
+    * commit SHAs              -> arrow backed strings
+    * actor_url, actor_avatar_url, repo_url, actor_display_login are dropped when
+      they can be rebuilt exactly from actor_login / actor_id / repo_name
+      (expand_urls() puts them back)
+
+    Args:
+        df: events DataFrame
+        drop_derived: Drop the derivable URL columns (default True)
+
+    Returns:
+        new DataFrame with compact dtypes
+    """
+    out = pd.DataFrame(index=df.index)
+    for col in df.columns:
+        series = df[col]
+        if col in ID_COLUMNS:
+            # Already int64 with no gaps (to_df() actor / repo ids) ... a nullable mask would only add a byte a row
+            out[col] = series if series.dtype == 'int64' else pd.to_numeric(series, errors='coerce').astype('Int64')
+        elif col in SMALL_INT_COLUMNS:
+            out[col] = pd.to_numeric(series, errors='coerce').astype('Int32')
+        elif col == 'public':
+            out[col] = _to_boolean(series)
+        elif col == 'created_at':
+            out[col] = pd.to_datetime(series, utc=True)
+        elif col in TEXT_COLUMNS:
+            out[col] = series.astype(_text_dtype())
+        elif col in CATEGORY_COLUMNS or series.dtype == object or pd.api.types.is_string_dtype(series.dtype):
+            # Category only if values repeat (e.g. logins in a small frame are mostly
+            # unique and a category would be bigger), otherwise compact strings
+            if series.nunique(dropna=True) < 0.5 * max(len(series), 1):
+                out[col] = series.astype('category')
+            else:
+                out[col] = series.astype(_text_dtype())
+        else:
+            out[col] = series
+
+    if drop_derived:
+        for col, rebuild in DERIVED_COLUMNS.items():
+            if col in df.columns and _is_derivable(df, col, rebuild):
+                out = out.drop(columns=[col])
+    return out
+
+
+def _is_derivable(df, col, rebuild):
+    """True if the column can be rebuilt exactly for every row (any missing value = keep it)"""
+    try:
+        rebuilt = rebuild(df)
+    except KeyError:
+        return False
+    original = df[col]
+    if original.isna().any():
+        return False
+    return bool((original.astype(str) == rebuilt.astype(str)).all())
+
+
+def expand_urls(df, columns=None):
+    """
+    Rebuild the URL columns dropped by compact_events()
+
+    Args:
+        df: compact events DataFrame
+        columns: Which derived columns to add (default: all that are missing)
+
+    Returns:
+        new DataFrame with the columns added
+    """
+    df = df.copy()
+    for col, rebuild in DERIVED_COLUMNS.items():
+        if columns is not None and col not in columns:
+            continue
+        if col not in df.columns:
+            df[col] = rebuild(df)
+    return df
+
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+
+def load_raw_events_csv(filename):
+    """Load a saved events CSV as generic object columns (no type inference)"""
+    return pd.read_csv(filename, dtype=object, keep_default_na=False, na_values=['']).astype(object)
+
+
+def events_from_csv(filename):
+    """
+    Rebuild GH Archive event dicts from a saved events CSV (actor_login -> actor.login ...),
+    so Archive.from_dict_list(events).to_df() gives the frame download_filtered_events returns
+    """
+    raw = load_raw_events_csv(filename)
+    events = []
+    for row in raw.to_dict('records'):
+        event = {'actor': {}, 'repo': {}, 'payload': {}}
+        for col, value in row.items():
+            if pd.isna(value):
+                continue
+            if col in ID_COLUMNS or col in SMALL_INT_COLUMNS:
+                value = int(value)
+            elif col == 'public':
+                value = value == 'True'
+            elif col == 'created_at':
+                value = pd.Timestamp(value).strftime('%Y-%m-%dT%H:%M:%SZ')
+            group, _, key = col.partition('_')
+            if group in event and key:
+                event[group][key] = value
+            else:
+                event[col] = value
+        event['id'] = str(event['id'])
+        events.append(event)
+    return events
+
+
+def benchmark(filename='github_events.csv', scale=(1, 1000)):
+    """
+    Compare memory before/after compact_events() on the sample events as
+    Archive.to_df() returns them, and on the same events repeated (with new ids)
+    to show the reduction at a realistic size
+
+    Returns:
+        list of (rows, raw MB, compact MB, ratio)
+    """
+    from gharchive.models import Archive
+    events = events_from_csv(filename)
+    results = []
+    for factor in scale:
+        batch = [dict(event, id=str(i + 1)) for i, event in enumerate(events * factor)] if factor > 1 else events
+        df = Archive.from_dict_list(batch).to_df()
+        start = time.perf_counter()
+        compact = compact_events(df)
+        elapsed = time.perf_counter() - start
+        before, after = memory_mb(df), memory_mb(compact)
+        results.append((len(df), before, after, before / after))
+        print(f"{len(df):>9,} rows: {before:8.3f} MB -> {after:7.3f} MB "
+              f"({before / after:.1f}x smaller, converted in {elapsed:.2f}s)")
+    return results
+
+
+if __name__ == "__main__":
+    results = benchmark('github_events.csv')
+    worst = min(ratio for _, _, _, ratio in results)
+    if worst < 5:
+        raise SystemExit(f"Memory reduction only {worst:.1f}x (target 5x)")
+    print(f"OK: at least {worst:.1f}x memory reduction")
@@ -0,0 +1,319 @@
+from gharchive.main import BASE_URL
+import requests
+import hashlib
+import shutil
+import gzip
+import json
+import time
+import os
+import re
+
+# Seconds to connect / to wait for the next block of a download (a stalled mirror raises instead of hanging)
+DOWNLOAD_TIMEOUT = (10, 60)
+
+# GH Archive file names e.g. 2024-12-19-9.json.gz (hour may also be zero padded)
+HOUR_FILE_PATTERN = re.compile(r'^(\d{4})-(\d{2})-(\d{2})-(\d{1,2})\.json\.gz$')
+
+def normalise_hour(name):
+    """Convert '2024-12-19-09' / '2024-12-19-09.json.gz' to the GH Archive hour name '2024-12-19-9'"""
+    if not name.endswith('.json.gz'):
+        name = name + '.json.gz'
+    match = HOUR_FILE_PATTERN.match(os.path.basename(name))
+    if match is None:
+        return None
+    year, month, day, hour = match.groups()
+    return f"{year}-{month}-{day}-{int(hour)}"
+
+def _check_gzip(path):
+    """Read the whole gzip stream ... a truncated or corrupt file raises an error (CRC/EOF check)"""
+    with gzip.open(path, 'rb') as gz:
+        while gz.read(1024 * 1024):
+            pass
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fp:
+        for block in iter(lambda: fp.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def store_object(objects_dir, source_path, move=False):
+    """
+    Check a .json.gz file and place it in the objects folder under its sha256.
+    Safe to call from several processes at once (each object is written to a
+    temp file and renamed into place)
+
+    Returns:
+        (sha256, size) or None if the file is not a complete gzip stream
+    """
+    try:
+        _check_gzip(source_path)
+    except (OSError, EOFError) as e:
+        print(f"Rejected {source_path}: not a complete gzip file ({e})")
+        if move:
+            os.remove(source_path)
+        return None
+
+    sha = _sha256(source_path)
+    size = os.path.getsize(source_path)
+    path = os.path.join(objects_dir, f"{sha}.json.gz")
+    if os.path.exists(path):
+        # Same content already cached (content addressed)
+        if move:
+            os.remove(source_path)
+    elif move:
+        os.replace(source_path, path)
+    else:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        shutil.copyfile(source_path, tmp_path)
+        os.replace(tmp_path, path)
+    return sha, size
+
+
+class HourlyArchiveCache:
+    """
+    Local on-disk cache of GH Archive hourly .json.gz files
+
+    Files are stored content-addressed (objects/<sha256>.json.gz) and an
+    index maps each archive hour to its object, size and last access time.
+    When the cache grows past max_bytes the least recently used hours are evicted.
+    Every object is checked on the way in (complete gzip stream, sha256 taken) and
+    its size is checked on the way out, so a truncated download is never reused.
+    Re-hashing a whole hour on every read is opt-in (verify=True).
+
+    Args:
+        cache_dir: Folder holding the cache (created if missing)
+        max_bytes: Size cap for the cached files (default 5 GB)
+        base_url: Archive location used on a cache miss
+        offline: If True never download ... a miss returns None
+        verify: Also re-check the sha256 of a file each time it is read from the cache
+                (reads the whole file ... slow for real 100+ MB hours)
+
+    Example:
+        cache = HourlyArchiveCache('gharchive_cache', max_bytes=2 * 1024**3)
+        path = cache.get('2017-08-19-9')   # downloads once, then served from disk
+
+        # Offline use with fixture files
+        cache = HourlyArchiveCache('/tmp/cache', offline=True)
+        cache.import_directory('fixtures/')
+    """
+
+    INDEX_FILE = 'index.json'
+
+    def __init__(self, cache_dir='gharchive_cache', max_bytes=5 * 1024**3,
+                 base_url=BASE_URL, offline=False, verify=False):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, 'objects')
+        self.max_bytes = max_bytes
+        self.base_url = base_url
+        self.offline = offline
+        self.verify = verify
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.index = self._load_index()
+
+    # ---------------- index ----------------
+    def _index_path(self):
+        return os.path.join(self.cache_dir, self.INDEX_FILE)
+
+    def _load_index(self):
+        try:
+            with open(self._index_path(), 'r') as fp:
+                return json.load(fp)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_index(self):
+        # Write to a temp file and rename ... the index is never left half written
+        tmp_path = self._index_path() + '.tmp'
+        with open(tmp_path, 'w') as fp:
+            json.dump(self.index, fp)
+        os.replace(tmp_path, self._index_path())
+
+    def _object_path(self, sha):
+        return os.path.join(self.objects_dir, f"{sha}.json.gz")
+
+    # ---------------- lookups ----------------
+    def __contains__(self, hour):
+        return normalise_hour(hour) in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def size_bytes(self):
+        """Total size of cached files (shared objects counted once)"""
+        objects = {entry['sha256']: entry['size'] for entry in self.index.values()}
+        return sum(objects.values())
+
+    def lookup(self, hour):
+        """
+        Return the path of a cached hour (or None) without downloading.
+        The access time is only updated in memory (call save() once per batch to persist)
+        """
+        hour = normalise_hour(hour)
+        entry = self.index.get(hour)
+        if entry is None:
+            return None
+        path = self._object_path(entry['sha256'])
+        if not self._is_valid(path, entry):
+            print(f"Cache entry for {hour} failed integrity check ... removing")
+            self._remove(hour)
+            return None
+        entry['last_used'] = time.time()
+        return path
+
+    def _is_valid(self, path, entry):
+        if not os.path.exists(path) or os.path.getsize(path) != entry['size']:
+            return False
+        if self.verify and _sha256(path) != entry['sha256']:
+            return False
+        return True
+
+    def get(self, hour):
+        """
+        Return the local path for an archive hour, downloading it on a cache miss
+
+        Returns:
+            path to the .json.gz file, or None if the hour is not available
+            (offline miss, or no archive published for that hour)
+        """
+        hour = normalise_hour(hour)
+        path = self.lookup(hour)
+        if path is not None:
+            self.hits += 1
+            return path
+        self.misses += 1
+        if self.offline:
+            return None
+        return self._download(hour)
+
+    # ---------------- adding files ----------------
+    def _download(self, hour):
+        url = f"{self.base_url}{hour}.json.gz"
+        tmp_path = os.path.join(self.cache_dir, f"{hour}.{os.getpid()}.download")
+        try:
+            with requests.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT) as resp:
+                if resp.status_code != 200:
+                    print(f"No archive for {hour} (status code {resp.status_code})")
+                    return None
+                with open(tmp_path, 'wb') as fp:
+                    for block in resp.iter_content(chunk_size=1024 * 1024):
+                        fp.write(block)
+            return self._add_file(hour, tmp_path, move=True)
+        except requests.RequestException as e:
+            print(f"Download of {hour} failed: {e}")
+            return None
+        finally:
+            # Stored files are moved away ... anything left is a partial download
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def put(self, hour, source_path):
+        """Copy an existing .json.gz file into the cache under the given hour"""
+        return self._add_file(normalise_hour(hour), source_path, move=False)
+
+    def _add_file(self, hour, source_path, move):
+        stored = store_object(self.objects_dir, source_path, move=move)
+        if stored is None:
+            return None
+        sha, size = stored
+        return self.register(hour, sha, size)
+
+    def register(self, hour, sha, size, save=True):
+        """
+        Add an index entry for an object already in the objects folder
+        (used by the parallel engine, where worker processes store the files)
+        """
+        hour = normalise_hour(hour)
+        self.index[hour] = {'sha256': sha, 'size': size, 'last_used': time.time()}
+        self._evict(keep=hour)
+        if save:
+            self._save_index()
+        return self._object_path(sha)
+
+    def entry(self, hour):
+        """
+        Return (path, sha256, size) for a cached hour without reading the file,
+        or None on a miss. The caller is responsible for the integrity check
+        """
+        entry = self.index.get(normalise_hour(hour))
+        if entry is None:
+            return None
+        return self._object_path(entry['sha256']), entry['sha256'], entry['size']
+
+    def touch(self, hour):
+        """Mark an hour as recently used (call save() to persist)"""
+        entry = self.index.get(normalise_hour(hour))
+        if entry is not None:
+            entry['last_used'] = time.time()
+
+    def save(self):
+        self._save_index()
+
+    def import_directory(self, directory):
+        """
+        Pre-populate the cache from a folder of GH Archive files (e.g. test fixtures)
+        Files must be named like the archive: YYYY-MM-DD-H.json.gz
+
+        Returns:
+            Number of hours imported
+        """
+        count = 0
+        for name in sorted(os.listdir(directory)):
+            hour = normalise_hour(name)
+            if hour is None:
+                continue
+            if self.put(hour, os.path.join(directory, name)) is not None:
+                count += 1
+        print(f"Imported {count} archive hours from {directory}")
+        return count
+
+    # ---------------- eviction ----------------
+    def _remove(self, hour, save=True):
+        """Drop an hour from the index. Returns the number of bytes freed on disk"""
+        entry = self.index.pop(hour, None)
+        if entry is None:
+            return 0
+        freed = 0
+        # Only delete the object if no other hour shares it
+        if not any(e['sha256'] == entry['sha256'] for e in self.index.values()):
+            path = self._object_path(entry['sha256'])
+            if os.path.exists(path):
+                os.remove(path)
+            freed = entry['size']
+        if save:
+            self._save_index()
+        return freed
+
+    def _evict(self, keep=None):
+        """Remove least recently used hours until the cache is within max_bytes"""
+        total = self.size_bytes()
+        if total <= self.max_bytes:
+            return
+        by_age = sorted(self.index.items(), key=lambda item: item[1]['last_used'])
+        for hour, entry in by_age:
+            if total <= self.max_bytes:
+                break
+            if hour == keep:
+                continue
+            total -= self._remove(hour, save=False)
+            print(f"Evicted {hour} from cache")
+
+    def clear(self):
+        for hour in list(self.index):
+            self._remove(hour, save=False)
+        self._save_index()
+
+    def summary(self):
+        return (f"{len(self)} hours cached, {self.size_bytes() / (1024*1024):.1f} MB "
+                f"of {self.max_bytes / (1024*1024):.0f} MB, {self.hits} hits / {self.misses} misses")
+
+
+if __name__ == "__main__":
+    # Fetch the torvalds/linux hours used in Project.ipynb ... a second run is served from disk
+    cache = HourlyArchiveCache('gharchive_cache')
+    for hour in ['2017-08-19-9', '2017-08-19-10']:
+        print(hour, cache.get(hour))
+    cache.save()
+    print(cache.summary())
@@ -0,0 +1,164 @@
+import fnmatch
+import json
+import re
+
+# Top level fields of a GH Archive event, in file order:
+#   {"id":"...","type":"...","actor":{"id":..,"login":"..",..},"repo":{"id":..,"name":"..",..},"payload":{..},..}
+# The first actor/repo object in a line is always the top level one (payload comes after them)
+RAW_PATTERNS = {
+    'type': re.compile(rb'^\{"id":"\d+","type":"([^"\\]+)"'),
+    'actor.login': re.compile(rb'"actor":\{"id":\d+,"login":"([^"\\]+)"'),
+    'repo.name': re.compile(rb'"repo":\{"id":\d+,"name":"([^"\\]+)"'),
+}
+
+WILDCARD_CHARS = set('*?[')
+
+
+def _get_field(event, field):
+    """Look up a '.' separated field (e.g. 'repo.name') in a decoded event"""
+    value = event
+    for key in field.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+class FieldMatcher:
+    """
+    Matches one field against a list of values using hash lookups.
+
+    * exact values        -> one set lookup
+    * 'prefix*' patterns  -> one set lookup per distinct prefix length
+    * other wildcards     -> a single compiled regex (fnmatch syntax, e.g. '*/linux')
+    """
+
+    def __init__(self, field, values):
+        self.field = field
+        self.exact = set()
+        prefixes = {}
+        patterns = []
+        for value in values:
+            value = str(value)
+            if not WILDCARD_CHARS & set(value):
+                self.exact.add(value)
+            elif value.endswith('*') and not WILDCARD_CHARS & set(value[:-1]):
+                prefix = value[:-1]
+                prefixes.setdefault(len(prefix), set()).add(prefix)
+            else:
+                patterns.append(fnmatch.translate(value))
+        self.prefixes = sorted(prefixes.items())
+        self.regex = re.compile('|'.join(patterns)) if patterns else None
+
+    def matches(self, value):
+        if value is None:
+            return False
+        if value in self.exact:
+            return True
+        for length, prefix_set in self.prefixes:
+            if value[:length] in prefix_set:
+                return True
+        if self.regex is not None and self.regex.match(value):
+            return True
+        return False
+
+    def __repr__(self):
+        return (f"FieldMatcher({self.field!r}: {len(self.exact)} exact, "
+                f"{sum(len(p) for _, p in self.prefixes)} prefix, "
+                f"{'1 regex' if self.regex is not None else 'no regex'})")
+
+
+class EventFilter:
+    """
+    Compiled event filter (see compile_filters)
+
+    Within a field the values are alternatives (type is PushEvent OR WatchEvent).
+    Across fields mode='all' needs every field to match (type AND repo),
+    mode='any' needs at least one field to match (type OR repo).
+    """
+
+    def __init__(self, fields, mode='all'):
+        if mode not in ('all', 'any'):
+            raise ValueError(f"mode must be 'all' or 'any', not {mode!r}")
+        self.matchers = [FieldMatcher(field, values) for field, values in fields.items() if values]
+        self.mode = mode
+
+    def __bool__(self):
+        return bool(self.matchers)
+
+    def __repr__(self):
+        return f"EventFilter(mode={self.mode!r}, {self.matchers})"
+
+    def match(self, event):
+        """Check a decoded event"""
+        if not self.matchers:
+            return True
+        results = (m.matches(_get_field(event, m.field)) for m in self.matchers)
+        return all(results) if self.mode == 'all' else any(results)
+
+    def match_raw(self, line):
+        """
+        Cheap check on the raw JSON line, before decoding it.
+        Returns False only when the line certainly cannot match; a field that
+        cannot be found in the raw text is treated as unknown (decode and check)
+        """
+        unknown = False
+        for m in self.matchers:
+            pattern = RAW_PATTERNS.get(m.field)
+            found = pattern.search(line) if pattern is not None else None
+            if found is None:
+                unknown = True
+                continue
+            ok = m.matches(found.group(1).decode('utf8'))
+            if self.mode == 'all' and not ok:
+                return False
+            if self.mode == 'any' and ok:
+                return True
+        return True if self.mode == 'all' else unknown
+
+    def filter_lines(self, lines):
+        """
+        Decode and yield the events that match from an iterable of raw JSON lines.
+        Lines rejected by match_raw() are never passed to json.loads()
+        """
+        for line in lines:
+            if not line.strip():
+                continue
+            if self.matchers and not self.match_raw(line):
+                continue
+            event = json.loads(line)
+            if self.match(event):
+                yield event
+
+
+def compile_filters(event_types=None, repos=None, actors=None, mode='all'):
+    """
+    Build an EventFilter from the download_filtered_events arguments
+
+    Args:
+        event_types: Event types, e.g. ['PushEvent', 'PullRequestEvent']
+        repos: Repository names, also prefix / wildcard patterns
+               e.g. ['torvalds/linux', 'microsoft/*', '*/tensorflow']
+        actors: GitHub usernames (wildcards allowed)
+        mode: 'all' = every given field must match (AND), 'any' = one field is enough (OR)
+
+    Example:
+        f = compile_filters(event_types=['PushEvent'], repos=['python/*'])
+        f.match({'type': 'PushEvent', 'repo': {'name': 'python/cpython'}})   # True
+    """
+    return EventFilter({
+        'type': event_types,
+        'repo.name': repos,
+        'actor.login': actors,
+    }, mode=mode)
+
+
+def from_tuples(filters, mode='all'):
+    """
+    Convert gharchive style filter tuples [('type', 'PushEvent'), ('repo.name', 'x/y'), ...]
+    Several tuples for the same field become alternatives of that field
+    """
+    fields = {}
+    for field, value in filters or []:
+        fields.setdefault(field, []).append(value)
+    return EventFilter(fields, mode=mode)
@@ -0,0 +1,290 @@
+from concurrent.futures import ProcessPoolExecutor
+from gharchive.main import BASE_URL
+from gharchive.models import Archive
+from gharchive_cache import store_object, _sha256
+from gharchive_filters import compile_filters
+from gharchive_test2 import archive_hours
+import pandas as pd
+import requests
+import gzip
+import time
+import zlib
+import os
+
+
+class ThroughputStats:
+    """Running totals for a parallel download (events/s and MB/s)"""
+
+    def __init__(self):
+        self.start_time = time.time()
+        self.hours = 0
+        self.missing_hours = 0
+        self.failed_hours = 0
+        self.events_read = 0
+        self.events_matched = 0
+        self.compressed_bytes = 0
+
+    def add(self, result):
+        self.hours += 1
+        if result['missing']:
+            self.missing_hours += 1
+        if result.get('error'):
+            self.failed_hours += 1
+        self.events_read += result['events_read']
+        self.events_matched += len(result['events'])
+        self.compressed_bytes += result['bytes']
+
+    def elapsed(self):
+        return max(time.time() - self.start_time, 1e-9)
+
+    def events_per_sec(self):
+        return self.events_read / self.elapsed()
+
+    def mb_per_sec(self):
+        return self.compressed_bytes / (1024 * 1024) / self.elapsed()
+
+    def summary(self):
+        return (f"{self.hours} hours ({self.missing_hours} missing, {self.failed_hours} failed), "
+                f"{self.events_read:,} events read, {self.events_matched:,} matched, "
+                f"{self.compressed_bytes / (1024*1024):.1f} MB in {self.elapsed():.1f}s "
+                f"-> {self.events_per_sec():,.0f} events/s, {self.mb_per_sec():.2f} MB/s")
+
+
+def _open_source(hour, source):
+    """
+    Open one hour from a base URL or a local folder of .json.gz files.
+    Returns (binary file object, response or None), or (None, None) if missing
+    """
+    if os.path.isdir(source):
+        day, hh = hour.rsplit('-', 1)
+        for name in (f"{hour}.json.gz", f"{day}-{int(hh):02d}.json.gz"):
+            path = os.path.join(source, name)
+            if os.path.exists(path):
+                return open(path, 'rb'), None
+        return None, None
+    resp = requests.get(f"{source}{hour}.json.gz", stream=True)
+    if resp.status_code != 200:
+        resp.close()
+        return None, None
+    return resp.raw, resp
+
+
+def _fetch_to_cache(hour, source, objects_dir):
+    """Worker side cache fill ... download the hour into the cache objects folder"""
+    fp, resp = _open_source(hour, source)
+    if fp is None:
+        return None
+    tmp_path = os.path.join(objects_dir, f"{hour}.{os.getpid()}.download")
+    try:
+        with open(tmp_path, 'wb') as out:
+            for block in iter(lambda: fp.read(1024 * 1024), b''):
+                out.write(block)
+    finally:
+        fp.close()
+        if resp is not None:
+            resp.close()
+    return store_object(objects_dir, tmp_path, move=True)
+
+
+def process_hour(task):
+    """
+    Worker: fetch, decompress and filter one archive hour.
+    Runs in a separate process, so everything it needs is passed in the task dict
+
+    Returns:
+        dict with the hour, a DataFrame of matching events (sorted by created_at),
+        counts for the throughput report, (sha256, size) if a file was cached and
+        error (None, or the message if the file was truncated / corrupt)
+    """
+    result = {'hour': task['hour'], 'events': pd.DataFrame(), 'events_read': 0,
+              'bytes': 0, 'stored': None, 'missing': False, 'error': None}
+    try:
+        _process_hour(task, result)
+    except (EOFError, OSError, zlib.error) as e:
+        # A truncated / corrupt file (or a dropped download) fails this hour only.
+        # Nothing is kept from it, and a file just stored is not registered in the cache
+        result.update(events=pd.DataFrame(), stored=None, error=f"{type(e).__name__}: {e}")
+    return result
+
+
+def _process_hour(task, result):
+    """process_hour without the error handling ... fills in result"""
+    hour = task['hour']
+    path = task.get('cached_path')
+    if path is not None and (not os.path.exists(path) or os.path.getsize(path) != task['cached_size'] or
+                             (task.get('verify') and _sha256(path) != task['cached_sha'])):
+        print(f"Cached file for {hour} failed integrity check ... fetching again")
+        path = None
+    if path is None and task.get('objects_dir'):
+        stored = _fetch_to_cache(hour, task['source'], task['objects_dir'])
+        if stored is not None:
+            result['stored'] = stored
+            path = os.path.join(task['objects_dir'], f"{stored[0]}.json.gz")
+
+    if path is not None:
+        fp, resp = open(path, 'rb'), None
+    else:
+        fp, resp = _open_source(hour, task['source'])
+    if fp is None:
+        result['missing'] = True
+        return
+
+    def counted(lines):
+        for line in lines:
+            result['events_read'] += 1
+            yield line
+
+    try:
+        with gzip.GzipFile(fileobj=fp) as gz:
+            matched = list(task['event_filter'].filter_lines(counted(gz)))
+        result['bytes'] = fp.tell()
+    finally:
+        fp.close()
+        if resp is not None:
+            resp.close()
+
+    if matched:
+        # Events in an hourly file are nearly (not strictly) in time order
+        matched.sort(key=lambda event: event.get('created_at') or '')
+        result['events'] = Archive.from_dict_list(matched).to_df()
+
+
+def parallel_filtered_events(
+    start_date,
+    end_date=None,
+    event_types=None,
+    repos=None,
+    actors=None,
+    max_rows=None,
+    workers=None,
+    max_in_flight=None,
+    source=BASE_URL,
+    cache=None,
+    stats=None,
+    report_every=24,
+    match='all'
+):
+    """
+    Fetch and filter a range of GH Archive hours on a pool of worker processes.
+
+    Each hour is downloaded, decompressed and filtered in a worker (same filter
+    rules as stream_filtered_events). Results are yielded in hour order, and each
+    hour is sorted by created_at, so the output is in timestamp order.
+    At most max_in_flight hours are submitted or waiting to be yielded at any
+    time, which bounds memory no matter how long the date range is.
+
+    Args:
+        start_date, end_date, event_types, repos, actors: as download_filtered_events
+        max_rows: Stop once this many matching events have been yielded (None = no limit)
+        workers: Number of worker processes (default: CPU count)
+        max_in_flight: Hours submitted ahead of the one being yielded (default 2 x workers)
+        source: Base URL (e.g. a local http.server 'http://localhost:8000/')
+                or a local folder of .json.gz files
+        cache: Optional HourlyArchiveCache ... hits are read from disk, misses are
+               downloaded into the cache by the workers
+        stats: Optional ThroughputStats, updated as hours complete
+        report_every: Print throughput every N hours (0 = never)
+        match: 'all' = every given field must match (AND), 'any' = one is enough (OR)
+
+    Yields:
+        pandas DataFrame per hour with matching events
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers
+    stats = stats if stats is not None else ThroughputStats()
+    # Compiled once here and sent to every worker with the task
+    event_filter = compile_filters(event_types, repos, actors, mode=match)
+
+    hours = archive_hours(start_date, end_date)
+
+    def make_task(hour):
+        task = {'hour': hour, 'source': source, 'event_filter': event_filter}
+        if cache is not None:
+            task['objects_dir'] = cache.objects_dir
+            task['verify'] = cache.verify
+            entry = cache.entry(hour)
+            if entry is not None:
+                task['cached_path'], task['cached_sha'], task['cached_size'] = entry
+                cache.touch(hour)
+                cache.hits += 1
+            else:
+                cache.misses += 1
+        return task
+
+    total_rows = 0
+    pending = {}
+    next_submit = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        try:
+            for next_yield in range(len(hours)):
+                # Keep a bounded window of hours in flight
+                while next_submit < len(hours) and next_submit < next_yield + max_in_flight:
+                    pending[next_submit] = pool.submit(process_hour, make_task(hours[next_submit]))
+                    next_submit += 1
+
+                result = pending.pop(next_yield).result()
+                stats.add(result)
+                if result['error']:
+                    print(f"  {result['hour']}: {result['error']} ... skipped")
+                if result['stored'] is not None and cache is not None:
+                    cache.register(result['hour'], *result['stored'], save=False)
+                if report_every and stats.hours % report_every == 0:
+                    print(f"  {stats.summary()}")
+
+                df = result['events']
+                if df.empty:
+                    continue
+                if max_rows is not None and total_rows + len(df) >= max_rows:
+                    yield df.head(max_rows - total_rows)
+                    return
+                total_rows += len(df)
+                yield df
+        finally:
+            # Hours still running (early max_rows stop) finish anyway and may have stored
+            # a file in the cache ... register those too, so no object is left unindexed
+            # (outside size_bytes() and eviction)
+            for future in pending.values():
+                if future.cancel() or cache is None:
+                    continue
+                try:
+                    result = future.result()
+                except Exception:
+                    continue
+                if result['stored'] is not None:
+                    cache.register(result['hour'], *result['stored'], save=False)
+            if cache is not None:
+                cache.save()
+
+
+def download_events_parallel(start_date, end_date=None, event_types=None, repos=None,
+                             actors=None, max_rows=None, workers=None, source=BASE_URL,
+                             cache=None, match='all'):
+    """
+    Parallel version of download_filtered_events ... returns one DataFrame
+    and prints the throughput (events/s and MB/s)
+    """
+    stats = ThroughputStats()
+    chunks = list(parallel_filtered_events(
+        start_date, end_date,
+        event_types=event_types, repos=repos, actors=actors,
+        max_rows=max_rows, workers=workers, source=source,
+        cache=cache, stats=stats, match=match
+    ))
+    print(f"\nThroughput: {stats.summary()}")
+    if not chunks:
+        return pd.DataFrame()
+    return pd.concat(chunks, ignore_index=True)
+
+
+if __name__ == "__main__":
+    # Test against a local folder of fixtures (or python -m http.server in that folder)
+    # e.g. source='http://localhost:8000/'
+    import sys
+    source = sys.argv[1] if len(sys.argv) > 1 else BASE_URL
+    df = download_events_parallel(
+        '2024-12-18', '2024-12-19',
+        event_types=['PushEvent', 'PullRequestEvent'],
+        workers=4,
+        source=source
+    )
+    print(f"{len(df)} events, {df['created_at'].min()} to {df['created_at'].max()}")
@@ -0,0 +1,302 @@
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import pyarrow as pa
+import pandas as pd
+import json
+import uuid
+import os
+
+# Columns produced by Archive.to_df() and their stored types.
+# 'type' is not stored in the files ... it is the last partition folder (type=PushEvent)
+DICT_STRING = pa.dictionary(pa.int32(), pa.string())
+EVENT_COLUMNS = {
+    'id': pa.int64(),
+    'public': pa.bool_(),
+    'created_at': pa.timestamp('us', tz='UTC'),
+    'actor_id': pa.int64(),
+    'actor_login': DICT_STRING,
+    'actor_display_login': pa.string(),
+    'actor_gravatar_id': pa.string(),
+    'actor_url': pa.string(),
+    'actor_avatar_url': pa.string(),
+    'repo_id': pa.int64(),
+    'repo_name': DICT_STRING,
+    'repo_url': pa.string(),
+    'payload_ref': pa.string(),
+    'payload_ref_type': pa.string(),
+    'payload_pusher_type': pa.string(),
+    'payload_push_id': pa.int64(),
+    'payload_size': pa.int64(),
+    'payload_distinct_size': pa.int64(),
+    'payload_head': pa.string(),
+    'payload_before': pa.string(),
+}
+PARTITION_SCHEMA = pa.schema([
+    ('year', pa.int16()),
+    ('month', pa.int8()),
+    ('day', pa.int8()),
+    ('type', pa.string()),
+])
+
+
+def _column_array(series, arrow_type):
+    """Convert a pandas column (object/str/float with NaN) to an arrow array of the stored type"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(object)
+    if arrow_type == DICT_STRING:
+        return pa.array(series.astype(object).where(series.notna(), None), type=pa.string()).dictionary_encode()
+    if pa.types.is_string(arrow_type):
+        values = series.astype(object).where(series.notna(), None)
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+    if pa.types.is_boolean(arrow_type) and series.dtype == object:
+        return pa.array(series.astype(str).where(series.notna(), None), type=pa.string()).cast(pa.bool_())
+    return pa.array(series, from_pandas=True).cast(arrow_type)
+
+
+class EventStore:
+    """
+    Append-only Parquet dataset of GH Archive events, partitioned as
+
+        root/year=2017/month=8/day=19/type=PushEvent/part-2017081909-<id>.parquet
+
+    repo_name, actor_login (and the type partition) are dictionary encoded, so
+    they come back as pandas categoricals. Reads only open the partitions that
+    match the date range / event types, and only the columns asked for.
+
+    Example:
+        store = EventStore('events_store')
+        store.append(df)                                    # df from download_filtered_events
+        store.compact()                                     # merge hourly files into day files
+        pushes = store.read('2017-08-19', '2017-08-20', types=['PushEvent'],
+                            columns=['created_at', 'repo_name'])
+    """
+
+    SCHEMA_FILE = '_columns.json'
+
+    def __init__(self, root='events_store'):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.extra_columns = self._load_extra_columns()
+
+    # ---------------- schema ----------------
+    def _load_extra_columns(self):
+        try:
+            with open(os.path.join(self.root, self.SCHEMA_FILE)) as fp:
+                return json.load(fp)
+        except FileNotFoundError:
+            return []
+
+    def _save_extra_columns(self):
+        tmp_path = os.path.join(self.root, self.SCHEMA_FILE + '.tmp')
+        with open(tmp_path, 'w') as fp:
+            json.dump(self.extra_columns, fp)
+        os.replace(tmp_path, os.path.join(self.root, self.SCHEMA_FILE))
+
+    def file_schema(self):
+        """Schema of the data files (known event columns + any extra columns seen, stored as strings)"""
+        fields = [(name, arrow_type) for name, arrow_type in EVENT_COLUMNS.items()]
+        fields += [(name, pa.string()) for name in self.extra_columns]
+        return pa.schema(fields)
+
+    def schema(self):
+        """Full dataset schema (file columns + partition columns)"""
+        return pa.schema(list(self.file_schema()) + list(PARTITION_SCHEMA))
+
+    def _to_table(self, df):
+        new_extra = [c for c in df.columns
+                     if c not in EVENT_COLUMNS and c != 'type' and c not in self.extra_columns]
+        if new_extra:
+            self.extra_columns += new_extra
+            self._save_extra_columns()
+        schema = self.file_schema()
+        arrays = []
+        for field in schema:
+            if field.name in df.columns:
+                arrays.append(_column_array(df[field.name], field.type))
+            else:
+                arrays.append(pa.nulls(len(df), type=field.type))
+        return pa.Table.from_arrays(arrays, schema=schema)
+
+    # ---------------- writing ----------------
+    def _partition_dir(self, day, event_type):
+        return os.path.join(self.root, f"year={day.year}", f"month={day.month}",
+                            f"day={day.day}", f"type={event_type}")
+
+    def append(self, df, dedupe=False):
+        """
+        Add events to the store. Each (hour, type) group becomes a new file,
+        existing files are never modified
+
+        Args:
+            df: Events (Archive.to_df() columns)
+            dedupe: Skip events whose id is already in the store (only the days
+                    covered by df are read) or repeated in df ... makes re-running
+                    the same hours safe
+
+        Returns:
+            Number of files written
+        """
+        if df.empty:
+            print("No data to save")
+            return 0
+        df = df.copy()
+        df['created_at'] = pd.to_datetime(df['created_at'], utc=True)
+        if dedupe:
+            df = self.new_events(df)
+            if df.empty:
+                print("All events already in the store")
+                return 0
+        hours = df['created_at'].dt.floor('h')
+        files = 0
+        for (hour, event_type), group in df.groupby([hours, df['type'].astype(str)], sort=True):
+            folder = self._partition_dir(hour, event_type)
+            os.makedirs(folder, exist_ok=True)
+            name = f"part-{hour:%Y%m%d%H}-{uuid.uuid4().hex[:8]}.parquet"
+            table = self._to_table(group.drop(columns=['type']).sort_values('created_at'))
+            # Write under a temp name so readers never see a half written file
+            tmp_path = os.path.join(folder, '.' + name + '.tmp')
+            pq.write_table(table, tmp_path, compression='zstd')
+            os.replace(tmp_path, os.path.join(folder, name))
+            files += 1
+        print(f"Appended {len(df)} events to {self.root} in {files} files")
+        return files
+
+    # ---------------- reading ----------------
+    def dataset(self):
+        return ds.dataset(
+            self.root,
+            schema=self.schema(),
+            format='parquet',
+            partitioning=ds.partitioning(PARTITION_SCHEMA, flavor='hive'),
+            exclude_invalid_files=False,
+            ignore_prefixes=['.', '_'],
+        )
+
+    @staticmethod
+    def _date_filter(start, end):
+        """
+        Filter expression on the partition fields (used to prune folders)
+        plus the exact created_at range. start is inclusive, end is exclusive
+        """
+        expr = None
+        if start is not None:
+            start = pd.Timestamp(start, tz='UTC') if pd.Timestamp(start).tzinfo is None else pd.Timestamp(start)
+            y, m, d = ds.field('year'), ds.field('month'), ds.field('day')
+            expr = ((y > start.year) |
+                    ((y == start.year) & (m > start.month)) |
+                    ((y == start.year) & (m == start.month) & (d >= start.day)))
+            expr = expr & (ds.field('created_at') >= pa.scalar(start.to_pydatetime(), type=pa.timestamp('us', tz='UTC')))
+        if end is not None:
+            end = pd.Timestamp(end, tz='UTC') if pd.Timestamp(end).tzinfo is None else pd.Timestamp(end)
+            last = end - pd.Timedelta(microseconds=1)
+            y, m, d = ds.field('year'), ds.field('month'), ds.field('day')
+            end_expr = ((y < last.year) |
+                        ((y == last.year) & (m < last.month)) |
+                        ((y == last.year) & (m == last.month) & (d <= last.day)))
+            end_expr = end_expr & (ds.field('created_at') < pa.scalar(end.to_pydatetime(), type=pa.timestamp('us', tz='UTC')))
+            expr = end_expr if expr is None else expr & end_expr
+        return expr
+
+    def read(self, start=None, end=None, types=None, columns=None, repos=None):
+        """
+        Read events back as a DataFrame, touching only the partitions and columns needed
+
+        Args:
+            start: First date/time to include (e.g. '2017-08-19'), None = from the beginning
+            end: Date/time to stop before (exclusive), None = to the end
+            types: List of event types (selects type= folders)
+            columns: Columns to return (default: all event columns + type)
+            repos: Optional list of repo names
+
+        Returns:
+            pandas DataFrame sorted by created_at
+        """
+        expr = self._date_filter(start, end)
+        if types:
+            type_expr = ds.field('type').isin(list(types))
+            expr = type_expr if expr is None else expr & type_expr
+        if repos:
+            repo_expr = ds.field('repo_name').isin(list(repos))
+            expr = repo_expr if expr is None else expr & repo_expr
+
+        if columns is None:
+            columns = ['type'] + [f.name for f in self.file_schema()]
+        read_columns = list(columns)
+        if 'created_at' not in read_columns:
+            read_columns.append('created_at')
+
+        table = self.dataset().to_table(columns=read_columns, filter=expr)
+        df = table.to_pandas()
+        if 'type' in df.columns:
+            # Partition values come back as plain strings
+            df['type'] = df['type'].astype('category')
+        if not df.empty:
+            df = df.sort_values('created_at', kind='stable').reset_index(drop=True)
+        return df[list(columns)]
+
+    def existing_ids(self, start=None, end=None):
+        """Event ids already stored from start (inclusive) to end (exclusive), as a numpy array"""
+        table = self.dataset().to_table(columns=['id'], filter=self._date_filter(start, end))
+        return table.column('id').to_numpy()
+
+    def new_events(self, df):
+        """Events of df whose id is not in the store yet (and not repeated in df)"""
+        if df.empty:
+            return df
+        created = pd.to_datetime(df['created_at'], utc=True)
+        stored = self.existing_ids(created.min().floor('h'), created.max().floor('h') + pd.Timedelta(hours=1))
+        # The archive JSON has string ids, the store keeps int64
+        ids = pd.to_numeric(df['id'], errors='coerce')
+        return df[~ids.isin(stored) & ~ids.duplicated()]
+
+    def files(self):
+        return sorted(self.dataset().files)
+
+    # ---------------- maintenance ----------------
+    def compact(self, day=None, min_files=2):
+        """
+        Merge the small hourly files of each day/type folder into one day file
+
+        Args:
+            day: Only compact this date (e.g. '2017-08-19'), default all days
+            min_files: Only rewrite folders with at least this many files
+
+        Returns:
+            Number of folders compacted
+        """
+        if day is not None:
+            day = pd.Timestamp(day)
+            base = os.path.join(self.root, f"year={day.year}", f"month={day.month}", f"day={day.day}")
+        else:
+            base = self.root
+
+        compacted = 0
+        for folder, _, names in os.walk(base):
+            parts = sorted(n for n in names if n.endswith('.parquet') and not n.startswith('.'))
+            if len(parts) < min_files:
+                continue
+            paths = [os.path.join(folder, n) for n in parts]
+            table = pa.concat_tables(
+                [pq.read_table(p, schema=self.file_schema()) for p in paths]
+            )
+            table = table.sort_by('created_at')
+            stamp = os.path.basename(paths[0]).split('-')[1][:8]
+            name = f"day-{stamp}-{uuid.uuid4().hex[:8]}.parquet"
+            tmp_path = os.path.join(folder, '.' + name + '.tmp')
+            pq.write_table(table, tmp_path, compression='zstd')
+            os.replace(tmp_path, os.path.join(folder, name))
+            for p in paths:
+                os.remove(p)
+            compacted += 1
+        print(f"Compacted {compacted} folders")
+        return compacted
+
+
+if __name__ == "__main__":
+    # Load the sample CSV into a store and read part of it back
+    df = pd.read_csv('github_events.csv')
+    store = EventStore('events_store')
+    store.append(df)
+    store.compact()
+    print(store.read('2017-08-19 09:00', '2017-08-19 12:00', types=['WatchEvent'],
+                     columns=['created_at', 'actor_login', 'repo_name']))
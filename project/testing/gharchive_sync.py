@@ -0,0 +1,226 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from gharchive.main import BASE_URL
+from gharchive_filters import compile_filters
+from gharchive_parallel import process_hour
+from gharchive_test2 import archive_hours
+from gharchive_store import EventStore
+import pandas as pd
+import hashlib
+import json
+import os
+
+STATE_FILE = 'sync_state.json'
+PUBLISH_LAG = timedelta(hours=2)       # GH Archive files appear some time after the hour ends
+GIVE_UP_AFTER = timedelta(days=7)      # an hour still missing this long after it ended ...
+MISSING_ATTEMPTS = 3                    # ... and after this many tries is skipped
+
+
+def hour_start(hour):
+    """'2017-08-19-9' -> datetime(2017, 8, 19, 9, tzinfo=UTC)"""
+    day, hh = hour.rsplit('-', 1)
+    return datetime.strptime(day, '%Y-%m-%d').replace(hour=int(hh), tzinfo=timezone.utc)
+
+
+def hour_name(dt):
+    return f"{dt:%Y-%m-%d}-{dt.hour}"
+
+
+def filter_key(event_types=None, repos=None, actors=None, match='all'):
+    """Stable id for a filter set (same filters in any order -> same key)"""
+    filters = {'event_types': sorted(event_types or []), 'repos': sorted(repos or []),
+               'actors': sorted(actors or []), 'match': match}
+    text = json.dumps(filters, sort_keys=True)
+    return hashlib.sha1(text.encode()).hexdigest()[:12], filters
+
+
+class SyncState:
+    """
+    High-water marks per filter set, saved as JSON
+
+        {key: {'filters': {...},
+               'watermark': '2017-08-19-16',     last hour with every hour before it done
+               'done': ['2017-08-19-18'],         done hours after a gap (not re-fetched)
+               'failed': {'2017-08-19-17': {'attempts': 2, 'error': 'truncated gzip'}}}}
+
+    Only hours after the watermark are kept in 'done' / 'failed', so the file stays
+    small however long the sync has been running.
+    """
+
+    def __init__(self, path=STATE_FILE):
+        self.path = path
+        self.data = {}
+        if os.path.exists(path):
+            with open(path) as fp:
+                self.data = json.load(fp)
+
+    def entry(self, key, filters):
+        return self.data.setdefault(key, {'filters': filters, 'watermark': None, 'done': [], 'failed': {}})
+
+    def save(self):
+        # Write then rename, so a crash never leaves half a state file
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as fp:
+            json.dump(self.data, fp, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def mark_done(entry, hour):
+        entry['failed'].pop(hour, None)
+        done = set(entry['done'])
+        done.add(hour)
+        # Move the watermark over every hour that is now contiguous
+        next_hour = hour_name(hour_start(entry['watermark']) + timedelta(hours=1))
+        while next_hour in done:
+            done.discard(next_hour)
+            entry['watermark'] = next_hour
+            next_hour = hour_name(hour_start(next_hour) + timedelta(hours=1))
+        entry['done'] = sorted(done, key=hour_start)
+
+    @staticmethod
+    def mark_failed(entry, hour, error):
+        failed = entry['failed'].setdefault(hour, {'attempts': 0})
+        failed['attempts'] += 1
+        failed['error'] = error
+
+
+def hours_to_sync(entry, start=None, until=None, max_hours=None):
+    """
+    Hours still to fetch: failed hours (gaps) first, then every hour after the
+    watermark (or start, on the first run) up to until, skipping done hours.
+    On the first run the entry's watermark is set to the hour before start
+    """
+    until = until or datetime.now(timezone.utc) - PUBLISH_LAG
+    until = pd.Timestamp(until).tz_localize('UTC') if pd.Timestamp(until).tzinfo is None else pd.Timestamp(until)
+    if entry['watermark'] is not None:
+        first = hour_start(entry['watermark']) + timedelta(hours=1)
+    elif start is not None:
+        first = pd.Timestamp(start).tz_localize('UTC') if pd.Timestamp(start).tzinfo is None else pd.Timestamp(start)
+        first = first.floor('h').to_pydatetime()
+        # First run: the watermark starts just before the first hour
+        entry['watermark'] = hour_name(first - timedelta(hours=1))
+    else:
+        raise ValueError("First sync for this filter set needs a start date")
+
+    last = until.floor('h').to_pydatetime() - timedelta(hours=1)     # last hour that has ended
+    done = set(entry['done'])
+    hours = sorted(entry['failed'], key=hour_start)
+    if first <= last:
+        hours += [h for h in archive_hours(first.replace(tzinfo=None), last.replace(tzinfo=None))
+                  if h not in done and h not in entry['failed']]
+    return hours[:max_hours] if max_hours else hours
+
+
+def sync(store, start=None, until=None, event_types=None, repos=None, actors=None, match='all',
+         state_file=STATE_FILE, source=BASE_URL, cache=None, workers=1, max_hours=None):
+    """
+    Fetch only the archive hours not yet synced for this filter set and append
+    their events to the store (ids already stored are skipped)
+
+    Safe to run again and again (e.g. hourly from cron): the watermark only moves
+    over hours that were read completely. Missing (not yet published) or truncated
+    hours are retried on the next run; an hour still missing after MISSING_ATTEMPTS
+    tries and GIVE_UP_AFTER after it ended is recorded as done with no events.
+
+    Args:
+        store: EventStore (or its folder)
+        start: First hour to sync on the first run (ignored once there is a watermark)
+        until: Sync hours that ended before this time (default: now - PUBLISH_LAG)
+        event_types, repos, actors, match: Filters, as download_filtered_events
+        state_file: JSON file with the watermarks
+        source: Base URL or local folder of .json.gz files
+        cache: Optional HourlyArchiveCache
+        workers: Worker processes (1 = in this process)
+        max_hours: Limit the hours fetched in one run
+
+    Returns:
+        dict with hours fetched / failed, events appended and the new watermark
+    """
+    store = EventStore(store) if isinstance(store, str) else store
+    key, filters = filter_key(event_types, repos, actors, match)
+    state = SyncState(state_file)
+    entry = state.entry(key, filters)
+    hours = hours_to_sync(entry, start, until, max_hours)
+    report = {'filter_key': key, 'hours': len(hours), 'fetched': 0, 'failed': 0, 'events': 0, 'watermark': None}
+    if not hours:
+        report['watermark'] = entry['watermark']
+        print(f"Sync {key}: up to date (watermark {entry['watermark']})")
+        return report
+
+    event_filter = compile_filters(event_types, repos, actors, mode=match)
+    now = datetime.now(timezone.utc)
+
+    def make_task(hour):
+        task = {'hour': hour, 'source': source, 'event_filter': event_filter}
+        if cache is not None:
+            task['objects_dir'] = cache.objects_dir
+            task['verify'] = cache.verify
+            cached = cache.entry(hour)
+            if cached is not None:
+                task['cached_path'], task['cached_sha'], task['cached_size'] = cached
+        return task
+
+    def results():
+        tasks = [make_task(hour) for hour in hours]
+        if workers <= 1:
+            yield from map(process_hour, tasks)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                yield from pool.map(process_hour, tasks)
+
+    try:
+        for result in results():
+            hour = result['hour']
+            if result.get('stored') is not None and cache is not None:
+                cache.register(hour, *result['stored'], save=False)
+            if result.get('error'):
+                SyncState.mark_failed(entry, hour, result['error'])
+                report['failed'] += 1
+                print(f"  {hour}: {result['error']} ... will retry")
+            elif result['missing']:
+                SyncState.mark_failed(entry, hour, 'missing')
+                if (entry['failed'][hour]['attempts'] >= MISSING_ATTEMPTS and
+                        now - (hour_start(hour) + timedelta(hours=1)) > GIVE_UP_AFTER):
+                    print(f"  {hour}: not in the archive after {MISSING_ATTEMPTS} tries, skipped")
+                    SyncState.mark_done(entry, hour)
+                else:
+                    report['failed'] += 1
+            else:
+                # Append before moving the watermark ... a crash here re-fetches the hour,
+                # and the id check drops anything already stored
+                new = store.new_events(result['events'])
+                if not new.empty:
+                    store.append(new)
+                    report['events'] += len(new)
+                SyncState.mark_done(entry, hour)
+                report['fetched'] += 1
+            state.save()
+    finally:
+        state.save()
+        if cache is not None:
+            cache.save()
+
+    report['watermark'] = entry['watermark']
+    print(f"Sync {key}: {report['fetched']} hours fetched, {report['failed']} to retry, "
+          f"{report['events']} new events, watermark {entry['watermark']}")
+    return report
+
+
+if __name__ == "__main__":
+    # e.g. from cron every hour:
+    #   python gharchive_sync.py events_store 2017-08-19T09 --repos torvalds/linux
+    import argparse
+    parser = argparse.ArgumentParser(description="Incremental GH Archive sync into an EventStore")
+    parser.add_argument('store', help="EventStore folder")
+    parser.add_argument('start', nargs='?', help="First hour on the first run, e.g. 2017-08-19T09")
+    parser.add_argument('--until', help="Only sync hours that ended before this time")
+    parser.add_argument('--types', nargs='*', help="Event types")
+    parser.add_argument('--repos', nargs='*', help="Repo names / patterns")
+    parser.add_argument('--actors', nargs='*', help="Actor logins / patterns")
+    parser.add_argument('--source', default=BASE_URL, help="Base URL or folder of .json.gz files")
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--max-hours', type=int)
+    parser.add_argument('--state', default=STATE_FILE)
+    args = parser.parse_args()
+    sync(args.store, args.start, args.until, args.types, args.repos, args.actors,
+         state_file=args.state, source=args.source, workers=args.workers, max_hours=args.max_hours)
@@ -1,8 +1,10 @@
 from datetime import datetime, timedelta
-from gharchive import GHArchive
+from gharchive_cache import HourlyArchiveCache
+from gharchive_test2 import download_filtered_events
 import pandas as pd
 
-gh = GHArchive()
+# Hourly archive files are kept on disk ... re-running the script does no network I/O
+cache = HourlyArchiveCache('gharchive_cache', max_bytes=2 * 1024**3)
 
 def save_to_file(df, filename, format='csv'):
     """Save DataFrame to file"""
@@ -23,8 +25,7 @@ start = datetime(2017, 8, 19, 9, 0)  # 09 AM
 end = datetime(2017, 8, 19, 17, 0)    # 5 PM
 
 
-data = gh.get(start, end, filters=[('repo.name', 'torvalds/linux')] )
+df = download_filtered_events(start, end, repos=['torvalds/linux'], max_rows=None, cache=cache)
+print(cache.summary())
 
-df = data.to_df()
-
-save_to_file(df, 'github_events.csv', format='csv')
\ No newline at end of file
+save_to_file(df, 'github_events.csv', format='csv')
@@ -1,6 +1,126 @@
-from gharchive import GHArchive
+from gharchive.main import BASE_URL
+from gharchive.models import Archive
+from gharchive.search import SearchDates
 from datetime import datetime, timedelta
 import pandas as pd
+from gharchive_filters import compile_filters
+from event_schema import compact_events
+import requests
+import gzip
+import json
+
+def _to_datetime(value):
+    """Convert 'YYYY-MM-DD' strings to datetime (time defaults to 00:00:00)"""
+    if isinstance(value, str):
+        return datetime.strptime(value, '%Y-%m-%d')
+    return value
+
+def archive_hours(start_date, end_date=None):
+    """
+    List the GH Archive hour names (e.g. '2024-12-19-9') covered by a date range.
+    Uses the same hourly expansion as GHArchive.get()
+    """
+    start_date = _to_datetime(start_date)
+    end_date = _to_datetime(end_date) if end_date else start_date
+    return SearchDates(start_date, end_date).strings
+
+def iter_hour_lines(hour, base_url=BASE_URL, cache=None):
+    """
+    Stream the raw JSON lines (bytes) of one hourly archive file.
+    The .json.gz file is decompressed as it downloads, so only the current
+    line is held in memory (not the whole hour)
+    
+    Args:
+        hour: GH Archive hour name, e.g. '2024-12-19-9'
+        base_url: Archive location (default https://data.gharchive.org/)
+        cache: Optional HourlyArchiveCache ... the hour is read from local disk
+               (and only downloaded on a cache miss)
+    
+    Yields:
+        bytes for each line (one event per line)
+    """
+    if cache is not None:
+        path = cache.get(hour)
+        if path is None:
+            print(f"No archive for {hour} in cache")
+            return
+        with gzip.open(path, 'rb') as gz:
+            yield from gz
+        return
+    
+    url = f"{base_url}{hour}.json.gz"
+    with requests.get(url, stream=True) as resp:
+        if resp.status_code != 200:
+            print(f"No archive for {hour} (status code {resp.status_code})")
+            return
+        with gzip.GzipFile(fileobj=resp.raw) as gz:
+            yield from gz
+
+def iter_hour_events(hour, base_url=BASE_URL, cache=None):
+    """Stream the decoded events (dicts) of one hourly archive file"""
+    for line in iter_hour_lines(hour, base_url, cache):
+        if line.strip():
+            yield json.loads(line)
+
+def stream_filtered_events(
+    start_date,
+    end_date=None,
+    event_types=None,
+    repos=None,
+    actors=None,
+    max_rows=5000,
+    chunk_size=1000,
+    base_url=BASE_URL,
+    cache=None,
+    match='all'
+):
+    """
+    Generator version of download_filtered_events.
+    Hourly archives are read one at a time and filtered as they are decoded.
+    Matching events are yielded as DataFrame chunks of chunk_size rows, and
+    reading stops as soon as max_rows events have been found.
+    Peak memory depends on chunk_size, not on the length of the date range.
+    
+    Args:
+        start_date, end_date, event_types, repos, actors: as download_filtered_events
+        max_rows: Stop after this many matching events (None = no limit)
+        chunk_size: Number of events per yielded DataFrame
+        base_url: Archive location (default https://data.gharchive.org/)
+        cache: Optional HourlyArchiveCache so repeat runs read hours from local disk
+        match: 'all' = every given field must match (AND), 'any' = one is enough (OR)
+    
+    Yields:
+        pandas DataFrame chunks (same columns as Archive.to_df())
+    
+    Example:
+        for chunk in stream_filtered_events('2024-12-18', '2024-12-19',
+                                            event_types=['PushEvent'], chunk_size=500):
+            print(len(chunk))
+    """
+    # Hash-set lookups per field ... lines that cannot match are never JSON decoded
+    event_filter = compile_filters(event_types, repos, actors, mode=match)
+    
+    batch = []
+    total_rows = 0
+    try:
+        for hour in archive_hours(start_date, end_date):
+            for event in event_filter.filter_lines(iter_hour_lines(hour, base_url, cache)):
+                batch.append(event)
+                total_rows += 1
+                if len(batch) >= chunk_size:
+                    yield Archive.from_dict_list(batch).to_df()
+                    batch = []
+                if max_rows is not None and total_rows >= max_rows:
+                    # Early exit ... remaining hours are never downloaded
+                    if batch:
+                        yield Archive.from_dict_list(batch).to_df()
+                    return
+        if batch:
+            yield Archive.from_dict_list(batch).to_df()
+    finally:
+        # Cache hits only update the LRU order in memory ... written once for the whole range
+        if cache is not None:
+            cache.save()
 
 def download_filtered_events(
     start_date,
@@ -8,10 +128,14 @@ def download_filtered_events(
     event_types=None,
     repos=None,
     actors=None,
-    max_rows=5000
+    max_rows=5000,
+    chunk_size=1000,
+    cache=None,
+    match='all',
+    compact=False
 ):
     """
-    Download and filter GitHub events using gharchive library
+    Download and filter GitHub events from the GH Archive
     
     Args:
         start_date: Start date string 'YYYY-MM-DD' or datetime object (with time)
@@ -19,8 +143,15 @@ def download_filtered_events(
                   Default: same as start_date
         event_types: List of event types to filter (e.g., ['PushEvent', 'PullRequestEvent'])
         repos: List of repository names to filter (e.g., ['microsoft/vscode'])
+               Prefix / wildcard patterns are allowed (e.g., ['microsoft/*', '*/linux'])
         actors: List of GitHub usernames to filter
         max_rows: Maximum number of rows to download
+        chunk_size: Number of events decoded into each DataFrame chunk
+        cache: Optional HourlyArchiveCache (see gharchive_cache.py) ... hours already
+               on disk are not downloaded again
+        match: 'all' = every given field must match (AND), 'any' = one is enough (OR)
+        compact: Convert to compact dtypes (categoricals, nullable ints, UTC datetime)
+                 and drop the derivable URL columns (see event_schema.py)
     
     Returns:
         pandas DataFrame with filtered events
@@ -33,57 +164,54 @@ def download_filtered_events(
         
         # Using date strings (defaults to full day)
         events = download_filtered_events('2024-12-19', '2024-12-20')
-    """
-    gh = GHArchive()
+        
+        # Re-runs read from a local cache instead of the network
+        events = download_filtered_events('2024-12-19', cache=HourlyArchiveCache())
     
+    Note:
+        Several values for one field match any of them (e.g. PushEvent OR PullRequestEvent),
+        different fields must all match (e.g. type AND repo) unless match='any'
+        (see gharchive_filters.py)
+    """
     # Convert string dates to datetime if needed (time defaults to 00:00:00)
-    if isinstance(start_date, str):
-        start_date = datetime.strptime(start_date, '%Y-%m-%d')
-    if end_date and isinstance(end_date, str):
-        end_date = datetime.strptime(end_date, '%Y-%m-%d')
-    elif end_date is None:
-        end_date = start_date
+    start_date = _to_datetime(start_date)
+    end_date = _to_datetime(end_date) if end_date else start_date
     
     print(f"Downloading events from {start_date.date()} to {end_date.date()}")
     
-    # Build filters - gharchive uses tuple format
-    filters = []
     if event_types:
-        # For multiple values, add multiple filter tuples
-        for event_type in event_types:
-            filters.append(('type', event_type))
         print(f"Filtering for event types: {event_types}")
     if repos:
-        for repo in repos:
-            filters.append(('repo.name', repo))
         print(f"Filtering for repos: {repos}")
     if actors:
-        for actor in actors:
-            filters.append(('actor.login', actor))
         print(f"Filtering for actors: {actors}")
     
-    # Convert to None if empty
-    filter_list = filters if filters else None
-    
     try:
-        # Download data - returns Archive object
-        archive = gh.get(
-            start_date=start_date,
-            end_date=end_date,
-            filters=filter_list
-        )
-        
-        # Convert Archive to DataFrame
-        df = archive.to_df()
+        # Read hour by hour and stop once max_rows events are found
+        chunks = list(stream_filtered_events(
+            start_date,
+            end_date,
+            event_types=event_types,
+            repos=repos,
+            actors=actors,
+            max_rows=max_rows,
+            chunk_size=chunk_size,
+            cache=cache,
+            match=match
+        ))
         
-        # Limit rows if needed
-        if len(df) > max_rows:
-            print(f"Limiting from {len(df)} to {max_rows} events")
-            df = df.head(max_rows)
+        if not chunks:
+            print("\nDownloaded 0 events")
+            return pd.DataFrame()
+        df = pd.concat(chunks, ignore_index=True)
         
         print(f"\nDownloaded {len(df)} events")
         print(f"Memory usage: {df.memory_usage(deep=True).sum() / (1024*1024):.2f} MB")
         
+        if compact:
+            df = compact_events(df)
+            print(f"Memory usage (compact): {df.memory_usage(deep=True).sum() / (1024*1024):.2f} MB")
+        
         return df
         
     except Exception as e:
@@ -119,12 +247,36 @@ def analyze_events(df):
     if 'created_at' in df.columns:
         print(f"\nDate range: {df['created_at'].min()} to {df['created_at'].max()}")
 
+def analyze_events_stream(chunks, top_n=10, **sketch_options):
+    """
+    Sketch version of analyze_events for ranges too big to hold in memory.
+    Chunks (e.g. from stream_filtered_events) are folded into fixed size
+    top-K / Count-Min / HyperLogLog sketches and then discarded
+    (see event_sketches.py for the error settings)
+
+    Returns:
+        the EventSketches (merge() it with other workers' sketches)
+    """
+    from event_sketches import EventSketches
+    sketches = EventSketches(**sketch_options).add_stream(chunks)
+    sketches.report(top_n)
+    return sketches
+
 def save_to_file(df, filename, format='csv'):
-    """Save DataFrame to file"""
+    """
+    Save DataFrame to file
+    format='dataset' appends to a partitioned Parquet store (filename is the
+    store folder, see gharchive_store.py) instead of writing one flat file
+    """
     if df.empty:
         print("No data to save")
         return
     
+    if format == 'dataset':
+        from gharchive_store import EventStore   # needs pyarrow
+        EventStore(filename).append(df)
+        return
+    
     if format == 'csv':
         df.to_csv(filename, index=False)
     elif format == 'json':
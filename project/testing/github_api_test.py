@@ -1,6 +1,8 @@
 from github import Github, RateLimitExceededException, Auth
 import pandas as pd
 from datetime import datetime, timedelta
+from job_log import JobLog
+from search_cache import is_closed_period
 import time
 import os
 
@@ -8,52 +10,87 @@ import os
 
 # Get the token from environment variables
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
-output_results = []
+# Status lines go to this JobLog (job_log.py) as they happen ... printed when no journal is set
+active_journal = None
+
+def log(message):
+    if active_journal is not None:
+        active_journal.log(message)
+    else:
+        print(message)
+
+#Build the search query for one language and date range (also the key used by SearchResultCache)
+def build_query(language, start_date, end_date):
+    return f"language:{language} created:{start_date}..{end_date}"
+
 #Search for repositories by language within a date range using PyGithub.Returns the total count of repositories.
-def search_repos_by_language_and_date(g, language, start_date, end_date):
-    try:
-        # Build the search query
-        query = f"language:{language} created:{start_date}..{end_date}"
-        
-        # Search repositories
-        result = g.search_repositories(query=query)
-        
-        # Get total count
-        total_count = result.totalCount
-        
-        return total_count
-        
-    except RateLimitExceededException:
-        output_results.append(f"    Rate limit exceeded. Waiting...")
-        # Get rate limit reset time
-        rate_limit = g.get_rate_limit()
-        reset_time = rate_limit.search.reset
-        sleep_time = (reset_time - datetime.utcnow()).total_seconds() + 10
-        
-        if sleep_time > 0:
-            output_results.append(f"    Sleeping for {sleep_time:.0f} seconds...")
-            time.sleep(sleep_time)
-        
-        # Retry after waiting
-        return search_repos_by_language_and_date(g, language, start_date, end_date)
-        
-    except Exception as e:
-        output_results.append(f"    Exception occurred: {e}")
-        return None
+#Waits for the rate limit reset and tries again (up to max_retries times) ... returns None if the search fails
+def search_repos_by_language_and_date(g, language, start_date, end_date, max_retries=5):
+    count, _ = search_repo_count(g, build_query(language, start_date, end_date), max_retries)
+    return count
+
+#Run one search query. Returns (total count, incomplete_results) or (None, False) if the search fails
+#incomplete_results = the search timed out, so the count may be short
+def search_repo_count(g, query, max_retries=5):
+    for attempt in range(max_retries):
+        try:
+            # Search repositories and get the total count (the same response has incomplete_results)
+            result = g.search_repositories(query=query)
+            return result.totalCount, bool(result.incomplete_results)
+            
+        except RateLimitExceededException:
+            log(f"    Rate limit exceeded. Waiting...")
+            # Get rate limit reset time
+            rate_limit = g.get_rate_limit()
+            reset_time = rate_limit.resources.search.reset
+            sleep_time = (reset_time - datetime.now(reset_time.tzinfo)).total_seconds() + 10
+            
+            if sleep_time > 0:
+                log(f"    Sleeping for {sleep_time:.0f} seconds...")
+                time.sleep(sleep_time)
+            
+        except Exception as e:
+            log(f"    Exception occurred: {e}")
+            return None, False
+    
+    log(f"    Giving up after {max_retries} attempts")
+    return None, False
     
 
 # A github rate limit is a restriction on how many requests you can make to GitHub's API within a certain time period
 def check_rate_limit(g):
     rate_limit = g.get_rate_limit()
-    output_results.append(f"Rate Limit Status:")
-    output_results.append(f"   Core API - Remaining: {rate_limit.resources.core.remaining}/{rate_limit.resources.core.limit}")
-    output_results.append(f"   Search API - Remaining: {rate_limit.resources.search.remaining}/{rate_limit.resources.search.limit}")
+    log(f"Rate Limit Status:")
+    log(f"   Core API - Remaining: {rate_limit.resources.core.remaining}/{rate_limit.resources.core.limit}")
+    log(f"   Search API - Remaining: {rate_limit.resources.search.remaining}/{rate_limit.resources.search.limit}")
     
     return rate_limit.resources.search.remaining
 
 
 #Collect repository creation data for multiple languages over time.
-def collect_language_data(languages, start_year, end_year, frequency='quarterly'):
+#cache: optional SearchResultCache (search_cache.py) ... cached cells are not searched again
+#frequency='adaptive' starts with yearly windows and only splits a window when its result was incomplete,
+#or its count is over split_above (finer detail where there is activity), see period_planner.py
+#journal: optional JobLog ... finished cells are written to it straight away and skipped on a rerun (resume)
+#workers: searches run on a SearchScheduler thread pool, paced by the rate limit headers instead of
+#sleeping (github_search_scheduler.py) ... None / 0 = the serial PyGithub loop below
+def collect_language_data(languages, start_year, end_year, frequency='quarterly', cache=None, journal=None,
+                          split_above=None, workers=4):
+    global active_journal
+    previous_journal = active_journal
+    if journal is not None:
+        active_journal = journal
+    try:
+        if workers:
+            from github_search_scheduler import collect_language_data_concurrent
+            return collect_language_data_concurrent(languages, start_year, end_year, frequency, workers=workers,
+                                                    cache=cache, journal=journal, split_above=split_above)
+        return _collect_language_data(languages, start_year, end_year, frequency, cache, journal, split_above)
+    finally:
+        # Log lines go back to wherever they went before this collection
+        active_journal = previous_journal
+
+def _collect_language_data(languages, start_year, end_year, frequency, cache, journal, split_above=None):
     # Initialize PyGithub
     auth = Auth.Token(GITHUB_TOKEN)
     g = Github(auth=auth)
@@ -61,14 +98,17 @@ def collect_language_data(languages, start_year, end_year, frequency='quarterly'
     # Verify authentication
     try:
         user = g.get_user()
-        output_results.append(f"Authenticated as: {user.login}")
+        log(f"Authenticated as: {user.login}")
     except Exception as e:
-        output_results.append(f"Authentication failed: {e}")
+        log(f"Authentication failed: {e}")
         return None
     
     # Check initial rate limit
     check_rate_limit(g)
     
+    if frequency == 'adaptive':
+        return collect_language_data_adaptive(g, languages, start_year, end_year, cache, journal, split_above)
+    
     results = []
     
     # Generate date ranges based on frequency
@@ -79,18 +119,19 @@ def collect_language_data(languages, start_year, end_year, frequency='quarterly'
     
     total_requests = len(languages) * len(periods)
     current_request = 0
+    api_calls = 0
     
-    output_results.append(f"\nCollecting data for {len(languages)} languages across {len(periods)} time periods...")
-    output_results.append(f"   Total API calls needed: {total_requests}\n")
+    log(f"\nCollecting data for {len(languages)} languages across {len(periods)} time periods...")
+    log(f"   Total API calls needed: {total_requests}\n")
     
     for language in languages:
-        output_results.append(f"\nProcessing {language}...")
+        log(f"\nProcessing {language}...")
         
         for period_name, start_date, end_date in periods:
             current_request += 1
-            output_results.append(f"  [{current_request}/{total_requests}] {period_name}...")
+            log(f"  [{current_request}/{total_requests}] {period_name}...")
             
-            count = search_repos_by_language_and_date(g, language, start_date, end_date)
+            count, incomplete, source = count_cell(g, language, period_name, start_date, end_date, cache, journal)
             
             if count is not None:
                 results.append({
@@ -100,26 +141,90 @@ def collect_language_data(languages, start_year, end_year, frequency='quarterly'
                     'end_date': end_date,
                     'repo_count': count
                 })
-                output_results.append(f"{count:,} repos")
+                log(f"{count:,} repos" + ('' if source == 'api' else f" ({source})") +
+                    (" (incomplete results, may be short)" if incomplete else ''))
             else:
-                output_results.append("Failed")
+                log("Failed")
+            
+            if source != 'api':
+                continue
+            api_calls += 1
             
             # Small delay to be nice to the API
             time.sleep(2)
             
             # Check rate limit every 10 requests
-            if current_request % 10 == 0:
+            if api_calls % 10 == 0:
                 remaining = check_rate_limit(g)
                 if remaining < 5:
-                    output_results.append("Rate limit getting low, slowing down...")
+                    log("Rate limit getting low, slowing down...")
                     time.sleep(5)
     
+    log(f"API calls made: {api_calls} (the rest came from the journal / cache)")
+    if cache is not None:
+        log(f"Search cache: {cache.summary()}")
+    
     # Final rate limit check
-    output_results.append("\n" + "="*50)
+    log("\n" + "="*50)
     check_rate_limit(g)
     
     return pd.DataFrame(results)
 
+#Count one (language, period) cell: from the journal (earlier run), the cache, or the API
+#A good count is written to the journal straight away.
+#Returns (count or None, incomplete_results, 'journal' / 'cache' / 'api')
+#Journal entries never expire, so they are only reused for closed periods ... an open period's count
+#can still grow, and goes through the cache (with its TTL) instead.
+#An incomplete count may be short, so it is not written to the journal or the cache
+#search: optional function(query) -> (count, incomplete_results) used instead of PyGithub (e.g. the scheduler)
+def count_cell(g, language, period_name, start_date, end_date, cache=None, journal=None, search=None):
+    if journal is not None and is_closed_period(end_date):
+        done = journal.get(language, start_date, end_date)
+        if done is not None:
+            return done['repo_count'], False, 'journal'
+    
+    query = build_query(language, start_date, end_date)
+    source = 'api'
+    incomplete = False
+    count = cache.get(query) if cache is not None else None
+    if count is not None:
+        source = 'cache'
+    else:
+        count, incomplete = search(query) if search is not None else search_repo_count(g, query)
+        if cache is not None:
+            if count is None:
+                cache.put_failure(query, language, start_date, end_date, "Search failed")
+            elif not incomplete:
+                cache.put(query, language, start_date, end_date, count)
+    
+    if count is not None and not incomplete and journal is not None:
+        journal.record_cell(language, period_name, start_date, end_date, count)
+    return count, incomplete, source
+
+#Adaptive version of the collection loop ... one call per year (total_count is exact), split only
+#where the search came back incomplete or the count is over split_above, see period_planner.py
+def collect_language_data_adaptive(g, languages, start_year, end_year, cache=None, journal=None, split_above=None):
+    from period_planner import plan_language_periods
+    
+    def count_fn(language, start_date, end_date):
+        count, incomplete, source = count_cell(g, language, f"{start_date}..{end_date}", start_date, end_date,
+                                               cache, journal)
+        log(f"  {language} {start_date}..{end_date}: " + (f"{count:,} repos" if count is not None else "Failed") +
+            ('' if source == 'api' else f" ({source})") + (" (incomplete, splitting)" if incomplete else ''))
+        if source == 'api':
+            # Small delay to be nice to the API
+            time.sleep(2)
+        return count, incomplete
+    
+    log(f"\nCollecting data for {len(languages)} languages with adaptive periods...")
+    plan = plan_language_periods(languages, start_year, end_year, count_fn, split_above=split_above)
+    log(plan.report())
+    
+    log("\n" + "="*50)
+    check_rate_limit(g)
+    
+    return plan.to_df()
+
 #Generate a List of monthly date ranges between start_year and end_year.
 def generate_monthly_periods(start_year, end_year):
     periods = []
@@ -159,10 +264,14 @@ def generate_yearly_periods(start_year, end_year):
 
 # Main execution
 if __name__ == "__main__":
-    output_results.append("="*50)
-    output_results.append("GitHub Language Trends Data Collector")
-    output_results.append("Using PyGithub")
-    output_results.append("="*50)
+    # Everything is journalled as it happens ... rerun after a crash to resume
+    journal = JobLog('github_collection_journal.jsonl')
+    active_journal = journal
+    
+    log("="*50)
+    log("GitHub Language Trends Data Collector")
+    log("Using PyGithub")
+    log("="*50)
     
     # Define the languages tracked
     languages = [
@@ -175,47 +284,54 @@ if __name__ == "__main__":
     START_YEAR = 2020
     END_YEAR = 2024
     
-    # Choose frequency: 'monthly' or 'yearly'
+    # Choose frequency: 'monthly', 'yearly' or 'adaptive'
     FREQUENCY = 'monthly'
+    # 'adaptive' only: months (or finer) for a language's years with more repos than this (None = yearly counts)
+    SPLIT_ABOVE = None
+    # Concurrent searches paced by the rate limit (0 = one at a time with PyGithub)
+    WORKERS = 4
     
-    output_results.append(f"\nConfiguration:")
-    output_results.append(f"   Languages: {len(languages)}")
-    output_results.append(f"   Date Range: {START_YEAR} - {END_YEAR}")
-    output_results.append(f"   Frequency: {FREQUENCY}")
+    log(f"\nConfiguration:")
+    log(f"   Languages: {len(languages)}")
+    log(f"   Date Range: {START_YEAR} - {END_YEAR}")
+    log(f"   Frequency: {FREQUENCY}")
     
     # Collect the data
-    df = collect_language_data(languages, START_YEAR, END_YEAR, FREQUENCY)
+    # Results are kept in search_cache.sqlite, so a rerun only searches missing/expired/failed cells
+    from search_cache import SearchResultCache
+    cache = SearchResultCache('search_cache.sqlite')
+    df = collect_language_data(languages, START_YEAR, END_YEAR, FREQUENCY, cache=cache, journal=journal,
+                               split_above=SPLIT_ABOVE, workers=WORKERS)
     
     if df is not None and not df.empty:
         # Save to CSV
         output_file = f"github_language_trends_{START_YEAR}_{END_YEAR}_{FREQUENCY}.csv"
         df.to_csv(output_file, index=False)
         
-        output_results.append("\n" + "="*50)
-        output_results.append("Data collection complete!")
-        output_results.append(f"Saved to: {output_file}")
-        output_results.append(f"Total records: {len(df)}")
+        log("\n" + "="*50)
+        log("Data collection complete!")
+        log(f"Saved to: {output_file}")
+        log(f"Total records: {len(df)}")
         
         # Display preview
-        output_results.append("\nPreview of data:")
-        output_results.append(df.head(10))
+        log("\nPreview of data:")
+        log(df.head(10))
         
         # Show summary statistics
-        output_results.append("\nSummary by language (total repos across all periods):")
+        log("\nSummary by language (total repos across all periods):")
         summary = df.groupby('language')['repo_count'].sum().sort_values(ascending=False)
-        output_results.append(summary)
+        log(summary)
         
-        output_results.append("\nNext steps:")
-        output_results.append("   1. Open the CSV file in Excel or Python")
-        output_results.append("   2. Create visualizations (line charts, bar charts)")
-        output_results.append("   3. Analyze trends and patterns")
-        output_results.append("="*50)
+        log("\nNext steps:")
+        log("   1. Open the CSV file in Excel or Python")
+        log("   2. Create visualizations (line charts, bar charts)")
+        log("   3. Analyze trends and patterns")
+        log("="*50)
     else:
-        output_results.append("\nData collection failed. Please check your token and try again.")
+        log("\nData collection failed. Please check your token and try again.")
     
-    # Write to file (each item on a new line)
-    with open("Github_REST_API_Results.txt", "w") as f:
-        for item in output_results:
-            f.write(item + "\n")
+    # Write the log lines to a text file as well (each item on a new line)
+    journal.write_text("Github_REST_API_Results.txt")
+    journal.close()
 
     print("List written to file Github_REST_API_Results.txt")
\ No newline at end of file
@@ -0,0 +1,387 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from github_api_test import generate_monthly_periods, generate_yearly_periods, build_query, count_cell, GITHUB_TOKEN
+from search_cache import is_closed_period
+import pandas as pd
+import threading
+import requests
+import random
+import time
+
+API_URL = "https://api.github.com"
+
+
+class RateLimitBucket:
+    """
+    Token bucket for the Search API, driven by the X-RateLimit-* response headers.
+
+    tokens = calls we may still make in the current window. Each call takes a token
+    before it is sent; every response corrects the count from X-RateLimit-Remaining
+    (minus calls still in flight) and X-RateLimit-Reset. When the bucket is empty
+    callers wait for the reset time instead of sending a request that would fail.
+
+    Args:
+        limit: Calls per window before any header has been seen (search API = 30/min)
+        window: Window length in seconds, used until a reset header is seen
+        reserve: Tokens to leave unused in each window (headroom for other scripts)
+    """
+
+    def __init__(self, limit=30, window=60, reserve=0):
+        self.limit = limit
+        self.window = window
+        self.reserve = reserve
+        self.tokens = limit
+        self.reset_at = time.time() + window
+        self.in_flight = 0
+        self.header_reset = None
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        """Block until a call may be sent (takes one token)"""
+        with self.condition:
+            while True:
+                now = time.time()
+                if now >= self.reset_at:
+                    # Window has rolled over ... assume a full bucket until a header says otherwise
+                    self.tokens = self.limit
+                    self.reset_at = now + self.window
+                if self.tokens > self.reserve:
+                    self.tokens -= 1
+                    self.in_flight += 1
+                    return
+                self.condition.wait(timeout=max(self.reset_at - now, 0.05))
+
+    def release(self):
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def update(self, headers):
+        """
+        Correct the bucket from the X-RateLimit-* headers of a response.
+        Call before release(), while this call is still counted as in flight
+        """
+        try:
+            limit = int(headers['X-RateLimit-Limit'])
+            remaining = int(headers['X-RateLimit-Remaining'])
+            reset = float(headers['X-RateLimit-Reset'])
+        except (KeyError, ValueError):
+            return
+        with self.condition:
+            self.limit = limit
+            # Other calls in flight have taken a token but may not be counted by the server yet
+            available = max(remaining - (self.in_flight - 1), 0)
+            if self.header_reset is None or reset > self.header_reset + 1:
+                # First response of a new window
+                self.header_reset = reset
+                self.reset_at = reset
+                self.tokens = available
+            else:
+                # Same window ... responses can arrive out of order, so keep the lower count
+                self.tokens = min(self.tokens, available)
+            self.condition.notify_all()
+
+    def exhaust(self, reset=None):
+        """Primary limit hit ... no more calls until the reset time"""
+        with self.condition:
+            self.tokens = 0
+            if reset is not None:
+                self.reset_at = float(reset)
+            self.condition.notify_all()
+
+
+class SearchClient:
+    """Minimal Search API client (requests) that also returns the response headers"""
+
+    def __init__(self, token=None, base_url=API_URL, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers['Accept'] = 'application/vnd.github+json'
+        if token:
+            self.session.headers['Authorization'] = f"Bearer {token}"
+
+    def search_count(self, query):
+        """Returns the requests.Response of a 1 item search (total_count is in the JSON)"""
+        return self.session.get(
+            f"{self.base_url}/search/repositories",
+            params={'q': query, 'per_page': 1},
+            timeout=self.timeout
+        )
+
+
+class Progress:
+    """Live progress for a scheduler run (thread safe)"""
+
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.retries = 0
+        self.start_time = time.time()
+        self.lock = threading.Lock()
+
+    def snapshot(self):
+        with self.lock:
+            elapsed = time.time() - self.start_time
+            finished = self.done + self.failed
+            rate = finished / elapsed * 60 if elapsed > 0 else 0.0
+            remaining = self.total - finished
+            eta = remaining / (rate / 60) if rate > 0 else float('inf')
+            return {'done': self.done, 'failed': self.failed, 'retries': self.retries,
+                    'total': self.total, 'elapsed': elapsed,
+                    'calls_per_min': rate, 'eta_seconds': eta}
+
+    def line(self):
+        s = self.snapshot()
+        eta = f"{s['eta_seconds']:.0f}s" if s['eta_seconds'] != float('inf') else '?'
+        return (f"[{s['done'] + s['failed']}/{s['total']}] ok={s['done']} failed={s['failed']} "
+                f"retries={s['retries']} {s['calls_per_min']:.1f} calls/min eta {eta}")
+
+
+class SearchScheduler:
+    """
+    Runs many Search API count queries on a thread pool, as fast as the rate limit allows
+
+    * a RateLimitBucket keeps the search quota used without going over it
+    * secondary rate limits (403/429 + Retry-After, or 'secondary rate limit'
+      in the message) back off exponentially with full jitter
+    * progress is printed every progress_every results and passed to on_progress
+
+    Args:
+        client: SearchClient (point base_url at mock_github_api.py for testing)
+        workers: Number of threads
+        bucket: RateLimitBucket (default 30 calls / 60s)
+        max_retries: Attempts per query before it is recorded as failed
+        backoff_base / backoff_cap: Seconds for the exponential backoff
+        on_progress: Optional callback(Progress) after each query finishes
+        progress_every: Print a progress line every N queries (0 = never)
+    """
+
+    def __init__(self, client, workers=4, bucket=None, max_retries=6,
+                 backoff_base=1.0, backoff_cap=60.0, on_progress=None, progress_every=10):
+        self.client = client
+        self.workers = workers
+        self.bucket = bucket or RateLimitBucket()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.on_progress = on_progress
+        self.progress_every = progress_every
+        # Replaced by run() ... fetch_count can also be called on its own (adaptive planner)
+        self.progress = Progress(0)
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            # Server told us how long ... add a little jitter so threads do not retry together
+            return float(retry_after) + random.uniform(0, self.backoff_base)
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def _is_secondary_limit(resp):
+        if resp.status_code == 429 or 'Retry-After' in resp.headers:
+            return True
+        try:
+            message = resp.json().get('message', '')
+        except ValueError:
+            message = ''
+        return 'secondary rate limit' in message.lower()
+
+    def fetch_count(self, query):
+        """
+        Run one count query with rate limiting and retries
+
+        Returns:
+            (total_count or None, incomplete_results, error message or None)
+        """
+        error = None
+        for attempt in range(self.max_retries):
+            self.bucket.acquire()
+            try:
+                resp = self.client.search_count(query)
+            except requests.RequestException as e:
+                self.bucket.release()
+                error = f"Request failed: {e}"
+                time.sleep(self._backoff(attempt))
+                self._count_retry()
+                continue
+            self.bucket.update(resp.headers)
+            self.bucket.release()
+
+            if resp.status_code == 200:
+                body = resp.json()
+                return body['total_count'], bool(body.get('incomplete_results')), None
+            if resp.status_code in (403, 429) and self._is_secondary_limit(resp):
+                error = "Secondary rate limit"
+                time.sleep(self._backoff(attempt, resp.headers.get('Retry-After')))
+            elif resp.status_code in (403, 429) and resp.headers.get('X-RateLimit-Remaining') == '0':
+                error = "Rate limit exceeded"
+                self.bucket.exhaust(resp.headers.get('X-RateLimit-Reset'))
+            elif resp.status_code >= 500:
+                error = f"Server error {resp.status_code}"
+                time.sleep(self._backoff(attempt))
+            else:
+                return None, False, f"HTTP {resp.status_code}: {resp.text[:200]}"
+            self._count_retry()
+        return None, False, error
+
+    def _count_retry(self):
+        with self.progress.lock:
+            self.progress.retries += 1
+
+    def run(self, cells):
+        """
+        Args:
+            cells: list of dicts, each with a 'query' key (other keys are passed through)
+
+        Yields:
+            each cell dict with 'repo_count', 'incomplete' and 'error' added, in completion order
+        """
+        self.progress = Progress(len(cells))
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.fetch_count, cell['query']): cell for cell in cells}
+            for future in as_completed(futures):
+                count, incomplete, error = future.result()
+                cell = dict(futures[future], repo_count=count, incomplete=incomplete, error=error)
+                with self.progress.lock:
+                    if count is None:
+                        self.progress.failed += 1
+                    else:
+                        self.progress.done += 1
+                finished = self.progress.done + self.progress.failed
+                if self.progress_every and (finished % self.progress_every == 0 or finished == len(cells)):
+                    print(self.progress.line())
+                if self.on_progress is not None:
+                    self.on_progress(self.progress)
+                yield cell
+
+
+def collect_language_data_concurrent(languages, start_year, end_year, frequency='monthly',
+                                     workers=4, token=GITHUB_TOKEN, base_url=API_URL,
+                                     scheduler=None, cache=None, journal=None, split_above=None):
+    """
+    Concurrent version of collect_language_data ... same output columns
+    (collect_language_data runs this when workers is set)
+
+    Args:
+        languages, start_year, end_year, frequency: as collect_language_data
+        workers: Number of threads sharing the rate limit
+        token: GitHub token (default GITHUB_TOKEN environment variable)
+        base_url: API location (e.g. the mock_github_api.py server)
+        scheduler: Optional pre-built SearchScheduler
+        cache: Optional SearchResultCache ... only missing, expired or failed cells are searched
+        journal: Optional JobLog ... closed cells already in it are not searched, and every
+                 finished cell is written to it as it comes back
+        split_above: frequency='adaptive' only, as plan_language_periods
+
+    Returns:
+        DataFrame with language, period, start_date, end_date, repo_count
+        (failed cells are left out and reported)
+    """
+    scheduler = scheduler or SearchScheduler(SearchClient(token, base_url), workers=workers)
+    # Status lines go to the journal when there is one (as github_api_test.log does)
+    log = journal.log if journal is not None else print
+    if frequency == 'adaptive':
+        return _collect_adaptive_concurrent(scheduler, languages, start_year, end_year, workers,
+                                            cache, journal, split_above, log)
+
+    if frequency == 'monthly':
+        periods = generate_monthly_periods(start_year, end_year)
+    else:  # yearly
+        periods = generate_yearly_periods(start_year, end_year)
+
+    cells = [
+        {'language': language, 'period': period_name, 'start_date': start_date,
+         'end_date': end_date, 'query': build_query(language, start_date, end_date)}
+        for language in languages
+        for period_name, start_date, end_date in periods
+    ]
+    results = []
+    if journal is not None:
+        # Same rule as count_cell: journal entries never expire, so only closed periods are reused
+        done = [(cell, journal.get(cell['language'], cell['start_date'], cell['end_date']))
+                if is_closed_period(cell['end_date']) else (cell, None) for cell in cells]
+        results = [dict(cell, repo_count=record['repo_count'], error=None) for cell, record in done if record]
+        cells = [cell for cell, record in done if not record]
+        log(f"{len(results)} cells from the journal")
+    if cache is not None:
+        cached, cells = cache.split_cells(cells)
+        results += cached
+        log(f"{len(cached)} cells from the search cache")
+        if journal is not None:
+            for cell in cached:
+                journal.record_cell(cell['language'], cell['period'], cell['start_date'],
+                                    cell['end_date'], cell['repo_count'])
+    log(f"Collecting {len(cells)} cells ({len(languages)} languages x {len(periods)} periods) "
+        f"with {workers} workers")
+
+    failed = []
+    for cell in scheduler.run(cells) if cells else []:
+        if cell['repo_count'] is None:
+            failed.append(cell)
+            if cache is not None:
+                cache.put_failure(cell['query'], cell['language'], cell['start_date'],
+                                  cell['end_date'], cell['error'])
+            continue
+        results.append(cell)
+        if cell['incomplete']:
+            # May be short ... kept in the output, but not cached or journalled
+            log(f"  {cell['language']} {cell['period']}: {cell['repo_count']:,} repos (incomplete results, may be short)")
+            continue
+        if cache is not None:
+            cache.put(cell['query'], cell['language'], cell['start_date'],
+                      cell['end_date'], cell['repo_count'])
+        if journal is not None:
+            journal.record_cell(cell['language'], cell['period'], cell['start_date'],
+                                cell['end_date'], cell['repo_count'])
+    if failed:
+        log(f"{len(failed)} cells failed, e.g. {failed[0]['period']} {failed[0]['language']}: {failed[0]['error']}")
+
+    columns = ['language', 'period', 'start_date', 'end_date', 'repo_count']
+    df = pd.DataFrame(results, columns=columns + ['query', 'error'])[columns]
+    # Same order as the serial collector
+    order = {language: i for i, language in enumerate(languages)}
+    df = df.sort_values(['language', 'start_date'], key=lambda s: s.map(order) if s.name == 'language' else s)
+    return df.reset_index(drop=True)
+
+
+def _collect_adaptive_concurrent(scheduler, languages, start_year, end_year, workers, cache, journal, split_above,
+                                 log=print):
+    """
+    Adaptive periods with the scheduler: one planner per language on its own thread,
+    all sharing the scheduler's rate limit bucket (so up to min(workers, languages) calls at once)
+    """
+    from period_planner import PeriodPlan, plan_language_periods
+
+    def search(query):
+        count, incomplete, error = scheduler.fetch_count(query)
+        if error is not None:
+            log(f"    {query}: {error}")
+        return count, incomplete
+
+    def count_fn(language, start_date, end_date):
+        count, incomplete, source = count_cell(None, language, f"{start_date}..{end_date}", start_date, end_date,
+                                               cache, journal, search=search)
+        return count, incomplete
+
+    log(f"\nCollecting data for {len(languages)} languages with adaptive periods ({workers} workers)...")
+    with ThreadPoolExecutor(max_workers=max(min(workers, len(languages)), 1)) as pool:
+        plans = list(pool.map(lambda language: plan_language_periods([language], start_year, end_year,
+                                                                     count_fn, split_above=split_above),
+                              languages))
+    plan = PeriodPlan(languages, start_year, end_year)
+    for language_plan in plans:
+        plan.extend(language_plan)
+    log(plan.report())
+    return plan.to_df()
+
+
+if __name__ == "__main__":
+    # Run against the local mock API (fast 3 second windows so the limiter is exercised)
+    from mock_github_api import start_mock_server
+    server, state, base_url = start_mock_server(limit=30, window=3, max_concurrent=6)
+    df = collect_language_data_concurrent(['Python', 'JavaScript', 'Go'], 2020, 2021,
+                                          workers=8, token=None, base_url=base_url)
+    print(df.head())
+    print(f"{len(df)} rows, mock server saw {state.requests} requests, "
+          f"{state.primary_rejections} primary / {state.secondary_rejections} secondary rejections")
+    server.shutdown()
@@ -0,0 +1,111 @@
+'''
+Append-only JSON lines journal for long collection runs
+
+Every line is one record, written and fsync'd as soon as it happens:
+
+    {"kind": "log",  "time": "...", "message": "Processing Python..."}
+    {"kind": "cell", "time": "...", "language": "Python", "period": "2020-01",
+     "start_date": "2020-01-01", "end_date": "2020-01-31", "repo_count": 12345}
+
+A crash loses at most the line being written. Opening the same journal again
+reads back the finished cells, so a rerun can skip them (resume).
+'''
+from datetime import datetime, timezone
+import threading
+import json
+import os
+
+
+class JobLog:
+    """
+    Journal of finished (language, period) cells and log lines.
+    Cells are looked up by (language, start_date, end_date), so adaptive windows work too
+
+    Args:
+        path: JSONL file (created if missing, appended to if it exists)
+        echo: Also print log lines
+
+    Example:
+        journal = JobLog('github_collection_journal.jsonl')
+        df = collect_language_data(languages, 2020, 2024, 'monthly', journal=journal)
+    """
+
+    def __init__(self, path='github_collection_journal.jsonl', echo=False):
+        self.path = path
+        self.echo = echo
+        self.cells = {}
+        self.log_lines = 0
+        # Cells can be recorded from several threads (collect_language_data with workers)
+        self.lock = threading.Lock()
+        self._load()
+        self.fp = open(path, 'a', encoding='utf8')
+        if self.fp.tell() > 0 and not self._ends_with_newline():
+            # Last line was cut off by a crash ... start the next record on a new line
+            self.fp.write("\n")
+
+    def _load(self):
+        """Read back finished cells. A partly written last line (crash) is ignored"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf8') as fp:
+            for line in fp:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get('kind') == 'cell':
+                    self.cells[(record['language'], record['start_date'], record['end_date'])] = record
+                elif record.get('kind') == 'log':
+                    self.log_lines += 1
+        if self.cells:
+            print(f"Resuming from {self.path}: {len(self.cells)} cells already collected")
+
+    def _ends_with_newline(self):
+        with open(self.path, 'rb') as fp:
+            fp.seek(-1, os.SEEK_END)
+            return fp.read(1) == b"\n"
+
+    def _write(self, record):
+        record = dict(record, time=datetime.now(timezone.utc).isoformat(timespec='seconds'))
+        with self.lock:
+            self.fp.write(json.dumps(record, default=str) + "\n")
+            self.fp.flush()
+            os.fsync(self.fp.fileno())
+
+    def log(self, message):
+        message = str(message)
+        self._write({'kind': 'log', 'message': message})
+        self.log_lines += 1
+        if self.echo:
+            print(message)
+
+    def record_cell(self, language, period, start_date, end_date, repo_count, **extra):
+        record = {'kind': 'cell', 'language': language, 'period': period,
+                  'start_date': start_date, 'end_date': end_date, 'repo_count': repo_count}
+        record.update(extra)
+        self._write(record)
+        self.cells[(language, start_date, end_date)] = record
+
+    def get(self, language, start_date, end_date):
+        """Finished cell record, or None"""
+        return self.cells.get((language, start_date, end_date))
+
+    def close(self):
+        self.fp.close()
+
+    def messages(self):
+        """All log messages in the journal, in order"""
+        with open(self.path, encoding='utf8') as fp:
+            for line in fp:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get('kind') == 'log':
+                    yield record['message']
+
+    def write_text(self, filename):
+        """Export the log messages as plain text (one per line)"""
+        with open(filename, 'w') as f:
+            for message in self.messages():
+                f.write(message + "\n")
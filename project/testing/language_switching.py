@@ -0,0 +1,301 @@
+import pandas as pd
+import numpy as np
+import os
+
+KAGGLE_FILE = os.path.join('..', 'data', 'A Large-Scale Dataset of Popular OSS Projects', 'DatasetDataKaggle.csv')
+UNKNOWN = -1
+
+
+def utc_nanoseconds(created_at):
+    """A created_at column (strings or datetimes, any time zone) as int64 UTC nanoseconds"""
+    dates = pd.to_datetime(created_at, utc=True).dt.tz_convert(None)
+    return dates.to_numpy(dtype='datetime64[ns]').astype('int64')
+
+
+def quarter_code(nanoseconds):
+    """year * 4 + (quarter - 1) for UTC nanosecond times (e.g. 2017 Q3 -> 8070)"""
+    months = np.asarray(nanoseconds, dtype='int64').astype('datetime64[ns]').astype('datetime64[M]').astype('int64')
+    return (months // 12 + 1970) * 4 + (months % 12) // 3
+
+
+def quarter_name(code):
+    return f"{code // 4}-Q{code % 4 + 1}"
+
+
+class RepoLanguageMap:
+    """
+    repo_name -> language code, from hash lookups
+
+    Full names ('owner/repo') are looked up first. The Kaggle dataset's
+    'repo/username' column sometimes only has the repo part, so bare names are
+    kept too and used when no full name matches ... but only when that bare name
+    belongs to a single language.
+
+    Example:
+        repo_langs = RepoLanguageMap.from_kaggle()
+        codes = repo_langs.lookup(events['repo_name'])     # -1 = no language known
+    """
+
+    def __init__(self):
+        self.languages = []
+        self.lang_codes = {}        # lower case name -> code
+        self.full = {}              # 'owner/repo' (lower case) -> code
+        self.bare = {}              # 'repo' (lower case) -> code, UNKNOWN if ambiguous
+
+    def language_code(self, language):
+        key = str(language).strip().lower()
+        if key not in self.lang_codes:
+            self.lang_codes[key] = len(self.languages)
+            self.languages.append(str(language).strip())
+        return self.lang_codes[key]
+
+    def add(self, repo, language):
+        if pd.isna(repo) or pd.isna(language):
+            return
+        code = self.language_code(language)
+        name = str(repo).strip().lower()
+        if '/' in name:
+            self.full[name] = code
+            name = name.split('/', 1)[1]
+        if self.bare.get(name, code) != code:
+            code = UNKNOWN
+        self.bare[name] = code
+
+    @classmethod
+    def from_frame(cls, df, repo_col='full_name', language_col='language'):
+        """From any repo metadata table (e.g. cached GitHub API results with full_name, language)"""
+        repo_langs = cls()
+        for repo, language in zip(df[repo_col], df[language_col]):
+            repo_langs.add(repo, language)
+        return repo_langs
+
+    @classmethod
+    def from_kaggle(cls, path=KAGGLE_FILE):
+        df = pd.read_csv(path, usecols=['repo/username', 'Primary Language'])
+        return cls.from_frame(df, 'repo/username', 'Primary Language')
+
+    def lookup_one(self, repo):
+        name = str(repo).lower()
+        code = self.full.get(name)
+        if code is None:
+            code = self.bare.get(name.split('/', 1)[-1], UNKNOWN)
+        return code
+
+    def lookup(self, repo_names):
+        """Language codes for a column of repo names (one dict lookup per distinct name)"""
+        codes, uniques = pd.factorize(pd.Series(repo_names).astype(object))
+        mapped = np.array([self.lookup_one(repo) for repo in uniques] + [UNKNOWN], dtype='int32')
+        return mapped[codes]       # factorize gives -1 for missing names -> the last entry (UNKNOWN)
+
+    def __len__(self):
+        return len(self.full) + len(self.bare)
+
+
+class LanguageSwitching:
+    """
+    Streaming (from language -> to language) counts per quarter from GH Archive events
+
+    Each actor gets an integer slot from a sorted int64 array of actor keys
+    (binary search, no Python objects per actor), and the per-actor state is two
+    arrays (last language, last event time) indexed by that slot ... about 28
+    bytes per actor (key, slot, language, time), however many events are read. A transition is counted when
+    an actor's next event (in time order) is on a repo in a different language;
+    it is put in the quarter of that next event.
+
+    Counts are kept sparse: one int64 key per (quarter, from, to) cell seen
+    (quarter << 32 | from << 16 | to), in a sorted array merged with each chunk's counts.
+
+    Args:
+        repo_langs: RepoLanguageMap
+        actor_col: Column identifying developers ('actor_id', or 'actor_login' whose
+                   values are hashed to 64 bit keys)
+        include_same: Also count from == to (staying with a language)
+
+    Example:
+        switching = LanguageSwitching(RepoLanguageMap.from_kaggle())
+        for chunk in stream_filtered_events('2017-08-19', '2017-08-20', event_types=['PushEvent']):
+            switching.add(chunk)
+        switching.transitions().head(20)
+        switching.matrix('2017-Q3')
+    """
+
+    def __init__(self, repo_langs, actor_col='actor_id', include_same=False):
+        self.repo_langs = repo_langs
+        self.actor_col = actor_col
+        self.include_same = include_same
+        self.actor_keys = np.empty(0, dtype='int64')     # sorted actor keys
+        self.actor_slots = np.empty(0, dtype='int64')    # state slot of each key
+        self.last_lang = np.full(1024, UNKNOWN, dtype='int32')
+        self.last_time = np.zeros(1024, dtype='int64')
+        self.keys = np.empty(0, dtype='int64')
+        self.counts = np.empty(0, dtype='int64')
+        self.stats = {'events': 0, 'no_language': 0, 'out_of_order': 0}
+
+    # ---------------- state ----------------
+    @staticmethod
+    def _actor_keys(actors):
+        """int64 key per actor (ids as they are, anything else hashed) and a has-actor mask"""
+        actors = pd.Series(actors)
+        present = actors.notna().to_numpy()
+        if pd.api.types.is_integer_dtype(actors.dtype) or pd.api.types.is_float_dtype(actors.dtype):
+            keys = actors.fillna(0).to_numpy(dtype='int64')
+        else:
+            keys = pd.util.hash_array(actors.astype(str).to_numpy(dtype=object)).view('int64')
+        return keys, present
+
+    def _actor_codes(self, actors):
+        keys, present = self._actor_keys(actors)
+        uniques, inverse = np.unique(keys[present], return_inverse=True)
+        pos = np.searchsorted(self.actor_keys, uniques)
+        found = pos < len(self.actor_keys)
+        found[found] = self.actor_keys[pos[found]] == uniques[found]
+        slots = np.empty(len(uniques), dtype='int64')
+        slots[found] = self.actor_slots[pos[found]]
+        new = ~found
+        if new.any():
+            # New actors get the next slots ... inserted in key order, so the keys stay sorted
+            slots[new] = np.arange(len(self.actor_keys), len(self.actor_keys) + int(new.sum()))
+            self.actor_keys = np.insert(self.actor_keys, pos[new], uniques[new])
+            self.actor_slots = np.insert(self.actor_slots, pos[new], slots[new])
+        if len(self.actor_keys) > len(self.last_lang):
+            size = max(len(self.actor_keys), 2 * len(self.last_lang))
+            extra = size - len(self.last_lang)
+            self.last_lang = np.concatenate([self.last_lang, np.full(extra, UNKNOWN, dtype='int32')])
+            self.last_time = np.concatenate([self.last_time, np.zeros(extra, dtype='int64')])
+        codes = np.zeros(len(keys), dtype='int64')
+        codes[present] = slots[inverse.ravel()]
+        return codes, present
+
+    @staticmethod
+    def _key(quarter, src, dst):
+        return (quarter << 32) | (src << 16) | dst
+
+    @staticmethod
+    def _split_key(keys):
+        return keys >> 32, (keys >> 16) & 0xFFFF, keys & 0xFFFF
+
+    # ---------------- streaming ----------------
+    def add(self, events):
+        """
+        Add a chunk of events (actor_col, repo_name, created_at). Chunks should be
+        added in time order; an event older than the actor's last counted event
+        is skipped (counted in stats['out_of_order'])
+
+        Returns:
+            Number of transitions counted from this chunk
+        """
+        self.stats['events'] += len(events)
+        if events.empty:
+            return 0
+        langs = self.repo_langs.lookup(events['repo_name'])
+        known = langs != UNKNOWN
+        self.stats['no_language'] += int((~known).sum())
+        actors, has_actor = self._actor_codes(events[self.actor_col])
+        keep = known & has_actor
+        if not keep.any():
+            return 0
+
+        times = utc_nanoseconds(events['created_at'])[keep]
+        actors, langs = actors[keep], langs[keep]
+        order = np.lexsort((times, actors))
+        actors, langs, times = actors[order], langs[order], times[order]
+
+        late = times < self.last_time[actors]
+        self.stats['out_of_order'] += int(late.sum())
+        actors, langs, times = actors[~late], langs[~late], times[~late]
+        if len(actors) == 0:
+            return 0
+
+        # Previous language: the row before in the same actor, or the saved state for the first row
+        first = np.r_[True, actors[1:] != actors[:-1]]
+        previous = np.empty_like(langs)
+        previous[1:] = langs[:-1]
+        previous[first] = self.last_lang[actors[first]]
+
+        last = np.r_[actors[1:] != actors[:-1], True]
+        self.last_lang[actors[last]] = langs[last]
+        self.last_time[actors[last]] = times[last]
+
+        counted = previous != UNKNOWN
+        if not self.include_same:
+            counted &= previous != langs
+        if not counted.any():
+            return 0
+        quarters = quarter_code(times[counted])
+        self._merge(self._key(quarters, previous[counted].astype('int64'), langs[counted].astype('int64')))
+        return int(counted.sum())
+
+    def add_stream(self, chunks):
+        """Add every chunk of an iterable (e.g. stream_filtered_events / EventStore reads)"""
+        for chunk in chunks:
+            self.add(chunk)
+        return self
+
+    def _merge(self, new_keys):
+        keys, inverse = np.unique(np.concatenate([self.keys, new_keys]), return_inverse=True)
+        counts = np.bincount(inverse, weights=np.concatenate([self.counts, np.ones(len(new_keys), dtype='int64')]))
+        self.keys, self.counts = keys, counts.astype('int64')
+
+    # ---------------- results ----------------
+    def transitions(self, quarter=None):
+        """Long table: quarter, from_language, to_language, count (largest first)"""
+        quarters, src, dst = self._split_key(self.keys)
+        names = np.array(self.repo_langs.languages, dtype=object)
+        df = pd.DataFrame({
+            'quarter': [quarter_name(q) for q in quarters],
+            'from_language': names[src],
+            'to_language': names[dst],
+            'count': self.counts,
+        })
+        if quarter is not None:
+            df = df[df['quarter'] == quarter]
+        return df.sort_values('count', ascending=False, ignore_index=True)
+
+    def matrix(self, quarter=None):
+        """from x to DataFrame (one quarter, or all quarters added up), languages seen only"""
+        df = self.transitions(quarter)
+        return df.pivot_table(index='from_language', columns='to_language', values='count',
+                              aggfunc='sum', fill_value=0)
+
+    def net_flow(self, quarter=None):
+        """Per language: developers switching to it minus switching away from it"""
+        df = self.transitions(quarter)
+        into = df.groupby('to_language')['count'].sum()
+        away = df.groupby('from_language')['count'].sum()
+        return into.sub(away, fill_value=0).astype('int64').sort_values(ascending=False)
+
+    def summary(self):
+        return (f"{self.stats['events']:,} events, {len(self.actor_keys):,} actors, "
+                f"{int(self.counts.sum()):,} transitions in {len(self.keys):,} cells "
+                f"({self.stats['no_language']:,} events with no known language, "
+                f"{self.stats['out_of_order']:,} out of order)")
+
+
+if __name__ == "__main__":
+    # Synthetic event stream: 1M actors, 5M events in time ordered chunks
+    import time
+    rng = np.random.default_rng(0)
+    languages = [f"lang{i}" for i in range(50)]
+    repos = pd.DataFrame({'full_name': [f"owner{i}/repo{i}" for i in range(20_000)],
+                          'language': rng.choice(languages, 20_000)})
+    repo_langs = RepoLanguageMap.from_frame(repos)
+    switching = LanguageSwitching(repo_langs)
+
+    n_events, chunk_size = 5_000_000, 500_000
+    start_time = pd.Timestamp('2017-01-01', tz='UTC').value
+    seconds = np.sort(rng.integers(0, 2 * 365 * 86400, n_events))
+    start = time.perf_counter()
+    for lo in range(0, n_events, chunk_size):
+        hi = lo + chunk_size
+        chunk = pd.DataFrame({
+            'actor_id': rng.integers(0, 1_000_000, hi - lo),
+            'repo_name': repos['full_name'].to_numpy()[rng.integers(0, len(repos), hi - lo)],
+            'created_at': pd.to_datetime(start_time + seconds[lo:hi] * 10**9, utc=True),
+        })
+        switching.add(chunk)
+    elapsed = time.perf_counter() - start
+    print(f"{elapsed:.1f}s ... {switching.summary()}")
+    state = (switching.actor_keys.nbytes + switching.actor_slots.nbytes +
+             switching.last_lang.nbytes + switching.last_time.nbytes)
+    print(f"Per actor state: {state / 1e6:.1f} MB")
+    print(switching.transitions().head())
@@ -0,0 +1,178 @@
+'''
+Local mock of the GitHub Search API (/search/repositories and /rate_limit)
+Used to test the scheduler / collectors without a token or the real rate limit.
+
+* Returns a repeatable total_count for each query (not capped ... the real search only
+  stops paging at 1,000 items), optionally with incomplete_results set at random
+* Sends X-RateLimit-Limit / Remaining / Reset / Used / Resource headers
+* Rejects requests over the limit with 403 (primary rate limit)
+* Can simulate secondary rate limits (403 + Retry-After) for too many
+  concurrent requests, or at random
+
+Run standalone:   python mock_github_api.py 8000
+'''
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from datetime import datetime
+import threading
+import hashlib
+import random
+import json
+import time
+import sys
+
+
+class MockSearchState:
+    """Shared counters for the mock server (fixed rate-limit windows like GitHub)"""
+
+    def __init__(self, limit=30, window=60, max_concurrent=None, secondary_rate=0.0,
+                 incomplete_rate=0.0, seed=0, repos_per_day=None):
+        self.limit = limit
+        self.window = window
+        self.max_concurrent = max_concurrent
+        self.secondary_rate = secondary_rate
+        self.incomplete_rate = incomplete_rate
+        self.repos_per_day = repos_per_day
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.window_start = time.time()
+        self.used = 0
+        self.active = 0
+        self.requests = 0
+        self.primary_rejections = 0
+        self.secondary_rejections = 0
+        self.queries = []
+
+    def reset_time(self):
+        return int(self.window_start + self.window) + 1
+
+    def _roll_window(self):
+        if time.time() >= self.window_start + self.window:
+            self.window_start = time.time()
+            self.used = 0
+
+    @staticmethod
+    def _query_days(query):
+        """Length in days of the created:start..end window of a query (None if not found)"""
+        try:
+            start, end = query.split('created:')[1].split()[0].split('..')
+        except (IndexError, ValueError):
+            return None
+        if 'T' in start:
+            parse = lambda text: datetime.fromisoformat(text.replace('Z', '+00:00'))
+            return ((parse(end) - parse(start)).total_seconds() + 1) / 86400
+        start, end = datetime.strptime(start, '%Y-%m-%d'), datetime.strptime(end, '%Y-%m-%d')
+        return (end - start).days + 1
+
+    def count_for(self, query):
+        """
+        Deterministic repo count for a query string. With repos_per_day
+        ({language: rate}) the count grows with the length of the created: window
+        """
+        digest = hashlib.md5(query.encode('utf8')).hexdigest()
+        if self.repos_per_day is not None:
+            language = query.split('language:')[1].split()[0] if 'language:' in query else ''
+            days = self._query_days(query)
+            if days is not None:
+                noise = 0.9 + 0.2 * int(digest[:4], 16) / 0xFFFF
+                return int(self.repos_per_day.get(language, 1) * days * noise)
+        return int(digest[:6], 16) % 5000
+
+
+class MockGitHubHandler(BaseHTTPRequestHandler):
+    state = None   # set by start_mock_server
+
+    def log_message(self, format, *args):
+        pass   # keep test output quiet
+
+    def _send(self, status, body, extra_headers=None):
+        state = self.state
+        data = json.dumps(body).encode('utf8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('X-RateLimit-Limit', str(state.limit))
+        self.send_header('X-RateLimit-Remaining', str(max(state.limit - state.used, 0)))
+        self.send_header('X-RateLimit-Reset', str(state.reset_time()))
+        self.send_header('X-RateLimit-Used', str(state.used))
+        self.send_header('X-RateLimit-Resource', 'search')
+        for key, value in (extra_headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        state = self.state
+        url = urlparse(self.path)
+
+        if url.path == '/rate_limit':
+            with state.lock:
+                state._roll_window()
+                search = {'limit': state.limit, 'remaining': max(state.limit - state.used, 0),
+                          'reset': state.reset_time(), 'used': state.used}
+                self._send(200, {'resources': {'search': search}})
+            return
+
+        if url.path != '/search/repositories':
+            self._send(404, {'message': 'Not Found'})
+            return
+
+        query = parse_qs(url.query).get('q', [''])[0]
+        with state.lock:
+            state._roll_window()
+            state.requests += 1
+            secondary = (
+                (state.max_concurrent is not None and state.active >= state.max_concurrent) or
+                (state.secondary_rate and state.random.random() < state.secondary_rate)
+            )
+            if secondary:
+                state.secondary_rejections += 1
+                self._send(403, {'message': 'You have exceeded a secondary rate limit. '
+                                            'Please wait a few minutes before you try again.'},
+                           {'Retry-After': '1'})
+                return
+            if state.used >= state.limit:
+                state.primary_rejections += 1
+                self._send(403, {'message': 'API rate limit exceeded'})
+                return
+            state.used += 1
+            state.active += 1
+
+        try:
+            time.sleep(0.01)   # a little server latency
+            total = state.count_for(query)
+            with state.lock:
+                # A search that timed out on GitHub's side reports incomplete_results
+                incomplete = bool(state.incomplete_rate) and state.random.random() < state.incomplete_rate
+                state.queries.append(query)
+                self._send(200, {'total_count': total, 'incomplete_results': incomplete, 'items': []})
+        finally:
+            with state.lock:
+                state.active -= 1
+
+
+def start_mock_server(port=0, **state_args):
+    """
+    Start the mock API on a background thread
+
+    Returns:
+        (server, state, base_url) ... call server.shutdown() when finished
+    """
+    state = MockSearchState(**state_args)
+    handler = type('Handler', (MockGitHubHandler,), {'state': state})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    return server, state, base_url
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+    server, state, base_url = start_mock_server(port, limit=30, window=60)
+    print(f"Mock GitHub API on {base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
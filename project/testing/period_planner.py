@@ -0,0 +1,232 @@
+'''
+Adaptive period planner for the Search API repo counts
+
+The fixed plans (generate_monthly_periods / generate_yearly_periods) send one call
+per language per window. total_count is not capped by the search (only paging
+through the items stops at 1,000), so one call per year already gives an exact
+count for every language, however busy.
+
+The planner starts with yearly windows and only splits a window (year -> months,
+then halves of days / hours) when:
+*  the search said incomplete_results (it timed out, so the count may be short), or
+*  the caller wants more detail where there is activity (split_above)
+
+Example:
+    plan = plan_language_periods(['Python', 'Haskell'], 2020, 2024, count_fn)
+    print(plan.report())
+    df = plan.to_df()
+'''
+from datetime import datetime, timedelta
+import pandas as pd
+
+LEVELS = ['year', 'month', 'days', 'hours']
+
+
+def _month_end(year, month):
+    next_month = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return next_month - timedelta(days=1)
+
+
+def year_window(year):
+    return (str(year), f"{year}-01-01", f"{year}-12-31", 'year')
+
+
+def _days_window(first, last):
+    """Window of whole days (created:YYYY-MM-DD..YYYY-MM-DD)"""
+    start_date, end_date = first.strftime("%Y-%m-%d"), last.strftime("%Y-%m-%d")
+    period = start_date if first == last else f"{start_date}..{end_date}"
+    return (period, start_date, end_date, 'days')
+
+
+def _hours_window(first, last):
+    """Window of whole hours (the search accepts ISO date-times in created:start..end)"""
+    start_date = first.strftime("%Y-%m-%dT%H:00:00Z")
+    end_date = last.strftime("%Y-%m-%dT%H:59:59Z")
+    period = first.strftime("%Y-%m-%dT%H") + ('' if first == last else last.strftime("..%H"))
+    return (period, start_date, end_date, 'hours')
+
+
+def split_window(period, start_date, end_date, level):
+    """
+    Split a window into smaller ones: a year into its months, anything
+    shorter in two halves (days, then hours within a single day)
+
+    Returns:
+        list of (period, start_date, end_date, level), [] for one hour (can not split further)
+    """
+    if level == 'year':
+        year = int(period)
+        return [(f"{year}-{month:02d}", f"{year}-{month:02d}-01",
+                 _month_end(year, month).strftime("%Y-%m-%d"), 'month')
+                for month in range(1, 13)]
+    if level in ('month', 'days'):
+        first = datetime.strptime(start_date, "%Y-%m-%d")
+        last = datetime.strptime(end_date, "%Y-%m-%d")
+        if first == last:
+            return [_hours_window(first, first + timedelta(hours=11)),
+                    _hours_window(first + timedelta(hours=12), first + timedelta(hours=23))]
+        middle = first + timedelta(days=(last - first).days // 2)
+        return [_days_window(first, middle), _days_window(middle + timedelta(days=1), last)]
+    first = datetime.strptime(start_date, "%Y-%m-%dT%H:00:00Z")
+    last = datetime.strptime(end_date, "%Y-%m-%dT%H:59:59Z")
+    if first == last:
+        return []
+    middle = first + timedelta(hours=int((last - first).total_seconds() // 3600) // 2)
+    return [_hours_window(first, middle), _hours_window(middle + timedelta(hours=1), last)]
+
+
+class PeriodPlan:
+    """Result of an adaptive run: exact rows per window, plus call counts"""
+
+    def __init__(self, languages, start_year, end_year):
+        self.languages = list(languages)
+        self.start_year = start_year
+        self.end_year = end_year
+        self.rows = []
+        self.failed = []
+        self.calls = 0
+        self.calls_by_language = {language: 0 for language in self.languages}
+        self.incomplete = 0
+
+    def extend(self, other):
+        """Add the rows and calls of another plan (e.g. one per language, run on separate threads)"""
+        self.rows.extend(other.rows)
+        self.failed.extend(other.failed)
+        self.calls += other.calls
+        for language, calls in other.calls_by_language.items():
+            self.calls_by_language[language] = self.calls_by_language.get(language, 0) + calls
+        self.incomplete += other.incomplete
+
+    def monthly_calls(self):
+        """Calls the fixed monthly plan needs for the same languages and years"""
+        return len(self.languages) * 12 * (self.end_year - self.start_year + 1)
+
+    def yearly_calls(self):
+        """Calls the fixed yearly plan needs for the same languages and years"""
+        return len(self.languages) * (self.end_year - self.start_year + 1)
+
+    def fixed_plan(self):
+        """
+        The fixed plan that gives rows at the same resolution as this one:
+        ('yearly', calls) if every row is a year, ('monthly', calls) if every row
+        is a month or finer, None for a mix (no fixed plan to compare with)
+        """
+        levels = {row['level'] for row in self.rows}
+        if levels == {'year'}:
+            return 'yearly', self.yearly_calls()
+        if levels and 'year' not in levels:
+            return 'monthly', self.monthly_calls()
+        return None
+
+    def calls_saved(self):
+        """Calls saved against the fixed plan at the same resolution (None if there is none)"""
+        fixed = self.fixed_plan()
+        return None if fixed is None else fixed[1] - self.calls
+
+    def report(self):
+        fixed = self.fixed_plan()
+        if fixed is None:
+            lines = [f"Adaptive plan: {self.calls:,} calls (yearly rows, with months or finer where split ... "
+                     f"no fixed plan has the same resolution)"]
+        else:
+            lines = [f"Adaptive plan: {self.calls:,} calls, fixed {fixed[0]} plan: {fixed[1]:,} calls "
+                     f"({self.calls_saved():+,} saved)"]
+        if self.incomplete:
+            lines.append(f"   {self.incomplete} windows came back with incomplete_results and were split")
+        for language in self.languages:
+            levels = pd.Series([row['level'] for row in self.rows if row['language'] == language], dtype=object)
+            detail = ', '.join(f"{n} {level} windows" for level, n in levels.value_counts().reindex(LEVELS).dropna().astype(int).items())
+            lines.append(f"   {language}: {self.calls_by_language[language]} calls ({detail})")
+        if self.failed:
+            lines.append(f"   {len(self.failed)} windows failed")
+        return "\n".join(lines)
+
+    def to_df(self):
+        """
+        Same columns as collect_language_data, plus the window level and an
+        incomplete flag (still incomplete at one hour, so the count may be short)
+        """
+        columns = ['language', 'period', 'start_date', 'end_date', 'repo_count', 'level', 'incomplete']
+        return pd.DataFrame(self.rows, columns=columns)
+
+
+def plan_language_periods(languages, start_year, end_year, count_fn, split_above=None):
+    """
+    Count repos per language with as few calls as possible
+
+    Each year is counted with one call. A window is only split (year into months,
+    a month bisected into days, then hours) when its result was incomplete, or its
+    count is over split_above. Once a language's year was over split_above, the
+    next year starts at months straight away (saves the call that would be split again).
+
+    Args:
+        languages: List of languages
+        start_year, end_year: Years to cover (inclusive)
+        count_fn: function(language, start_date, end_date) -> count, (count, incomplete_results)
+                  or None (failed)
+        split_above: Split windows with more repos than this for finer detail
+                     (None = only split incomplete results, one call per year otherwise)
+
+    Returns:
+        PeriodPlan
+    """
+    plan = PeriodPlan(languages, start_year, end_year)
+    for language in languages:
+        busy = False
+        for year in range(start_year, end_year + 1):
+            window = year_window(year)
+            stack = list(reversed(split_window(*window))) if busy else [window]
+            while stack:
+                period, start_date, end_date, level = stack.pop()
+                result = count_fn(language, start_date, end_date)
+                plan.calls += 1
+                plan.calls_by_language[language] += 1
+                count, incomplete = result if isinstance(result, tuple) else (result, False)
+                if count is None:
+                    plan.failed.append((language, period, start_date, end_date))
+                    continue
+
+                detail = split_above is not None and count > split_above
+                children = split_window(period, start_date, end_date, level) if incomplete or detail else []
+                if level == 'year':
+                    # Only activity carries over to the next year (an incomplete result is one-off)
+                    busy = detail
+                if incomplete:
+                    plan.incomplete += 1
+                if children:
+                    # Depth first, so rows come out in date order
+                    stack.extend(reversed(children))
+                else:
+                    plan.rows.append({
+                        'language': language, 'period': period, 'start_date': start_date,
+                        'end_date': end_date, 'repo_count': count, 'level': level,
+                        'incomplete': bool(incomplete),
+                    })
+    return plan
+
+
+if __name__ == "__main__":
+    # Compare against the fixed monthly plan using the mock API
+    from mock_github_api import start_mock_server
+    from github_search_scheduler import SearchClient
+    from github_api_test import build_query
+
+    # Repos created per day ... some searches come back incomplete and are split
+    rates = {'JavaScript': 45, 'Python': 25, 'Go': 8, 'Haskell': 2, 'Elm': 0.5, 'Zig': 0.2}
+    server, state, base_url = start_mock_server(limit=100000, window=60, repos_per_day=rates,
+                                                incomplete_rate=0.05)
+    client = SearchClient(None, base_url)
+
+    def count_fn(language, start_date, end_date):
+        resp = client.search_count(build_query(language, start_date, end_date))
+        if resp.status_code != 200:
+            return None
+        body = resp.json()
+        return body['total_count'], body['incomplete_results']
+
+    plan = plan_language_periods(list(rates), 2020, 2024, count_fn)
+    print(plan.report())
+    print(plan.to_df().head(10))
+    # Monthly detail only where a language has more than 5,000 repos a year
+    print(plan_language_periods(list(rates), 2020, 2024, count_fn, split_above=5000).report())
+    server.shutdown()
@@ -0,0 +1,127 @@
+from datetime import datetime, timezone
+import threading
+import sqlite3
+import time
+
+DEFAULT_OPEN_TTL = 6 * 3600   # 6 hours for periods that are still open
+
+
+def is_closed_period(end_date, now=None):
+    """
+    True if a search period is over (its counts can no longer change)
+    end_date: 'YYYY-MM-DD' (whole day included) or an ISO date-time
+    """
+    now = now or datetime.now(timezone.utc)
+    if 'T' in end_date:
+        end = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
+        if end.tzinfo is None:
+            end = end.replace(tzinfo=timezone.utc)
+        return end < now
+    return datetime.strptime(end_date, '%Y-%m-%d').date() < now.date()
+
+
+class SearchResultCache:
+    """
+    Persistent SQLite store of Search API repo counts, keyed by the query string
+
+    * closed periods (end date in the past) are cached forever
+    * open periods (still running) expire after open_ttl seconds
+    * failed calls are recorded with their error, so a rerun retries only those
+      (plus anything missing or expired) ... see failed_cells()
+
+    Example:
+        cache = SearchResultCache('search_cache.sqlite')
+        df = collect_language_data(languages, 2020, 2024, 'monthly', cache=cache)
+    """
+
+    def __init__(self, path='search_cache.sqlite', open_ttl=DEFAULT_OPEN_TTL):
+        self.path = path
+        self.open_ttl = open_ttl
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS search_results (
+                query       TEXT PRIMARY KEY,
+                language    TEXT,
+                start_date  TEXT,
+                end_date    TEXT,
+                repo_count  INTEGER,
+                status      TEXT,       -- 'ok' or 'failed'
+                error       TEXT,
+                attempts    INTEGER DEFAULT 0,
+                fetched_at  REAL,
+                expires_at  REAL        -- NULL = never (closed period)
+            )''')
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def get(self, query, now=None):
+        """Cached repo count for a query, or None if missing, expired or failed"""
+        now = now or time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT repo_count FROM search_results WHERE query = ? AND status = 'ok' "
+                "AND (expires_at IS NULL OR expires_at > ?)", (query, now)).fetchone()
+        return None if row is None else row[0]
+
+    def put(self, query, language, start_date, end_date, repo_count):
+        now = time.time()
+        expires_at = None if is_closed_period(end_date) else now + self.open_ttl
+        with self.lock:
+            self.conn.execute('''
+                INSERT INTO search_results
+                    (query, language, start_date, end_date, repo_count, status, error, attempts, fetched_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, 'ok', NULL, 1, ?, ?)
+                ON CONFLICT(query) DO UPDATE SET
+                    repo_count = excluded.repo_count, status = 'ok', error = NULL,
+                    attempts = attempts + 1, fetched_at = excluded.fetched_at,
+                    expires_at = excluded.expires_at''',
+                (query, language, start_date, end_date, repo_count, now, expires_at))
+            self.conn.commit()
+
+    def put_failure(self, query, language, start_date, end_date, error):
+        """Record a failed call (keeps any earlier good count out of get() until retried)"""
+        with self.lock:
+            self.conn.execute('''
+                INSERT INTO search_results
+                    (query, language, start_date, end_date, repo_count, status, error, attempts, fetched_at, expires_at)
+                VALUES (?, ?, ?, ?, NULL, 'failed', ?, 1, ?, NULL)
+                ON CONFLICT(query) DO UPDATE SET
+                    status = 'failed', error = excluded.error,
+                    attempts = attempts + 1, fetched_at = excluded.fetched_at''',
+                (query, language, start_date, end_date, str(error), time.time()))
+            self.conn.commit()
+
+    def failed_cells(self):
+        """List of failed calls (dicts) ... these are retried on the next run"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT query, language, start_date, end_date, error, attempts FROM search_results "
+                "WHERE status = 'failed' ORDER BY language, start_date").fetchall()
+        keys = ['query', 'language', 'start_date', 'end_date', 'error', 'attempts']
+        return [dict(zip(keys, row)) for row in rows]
+
+    def split_cells(self, cells):
+        """
+        Split cells (dicts with a 'query' key) into (cached, to_fetch).
+        Cached cells get their 'repo_count' filled in
+        """
+        cached, to_fetch = [], []
+        for cell in cells:
+            count = self.get(cell['query'])
+            if count is None:
+                to_fetch.append(cell)
+            else:
+                cached.append(dict(cell, repo_count=count, error=None))
+        return cached, to_fetch
+
+    def summary(self):
+        with self.lock:
+            rows = dict(self.conn.execute(
+                "SELECT status, COUNT(*) FROM search_results GROUP BY status").fetchall())
+            expiring = self.conn.execute(
+                "SELECT COUNT(*) FROM search_results WHERE expires_at IS NOT NULL").fetchone()[0]
+        return (f"{rows.get('ok', 0)} cached counts ({expiring} open periods with a TTL), "
+                f"{rows.get('failed', 0)} failed")
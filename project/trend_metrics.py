@@ -0,0 +1,172 @@
+'''
+Trend metrics for every language column at once (Project.ipynb)
+
+The notebook fitted one sklearn LinearRegression per language (repos_pivot.apply)
+and looked up the first / last value of each column for the CAGR. Here the least
+squares fit, R², CAGR and average rank are worked out for all columns together
+with NumPy sums over a NaN mask.
+
+Like the notebook, each column is fitted against x = 0, 1, 2 ... over its
+non-missing values only (a gap does not count as a step).
+
+Example:
+    trends = trend_table(repos_pivot)                    # yearly CAGR from the quarterly pivot
+    trends = trend_table(repos_pivot, repos_pivot_year)  # or from a yearly pivot
+    all_metrics = trend_table_many({'repos': repos_pivot, 'prs': prs_pivot})
+'''
+import pandas as pd
+import numpy as np
+
+
+def ols_trends(pivot):
+    """
+    Least squares line per column (x = position among the column's non-missing values)
+
+    Args:
+        pivot: DataFrame, one column per language, rows in time order
+
+    Returns:
+        DataFrame indexed by column with slope, intercept, r2, n_points
+        (NaN where a column has fewer than 2 values)
+    """
+    y = pivot.to_numpy(dtype='float64')
+    mask = ~np.isnan(y)
+    x = np.where(mask, np.cumsum(mask, axis=0) - 1, 0).astype('float64')
+    y0 = np.where(mask, y, 0.0)
+    n = mask.sum(axis=0).astype('float64')
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_x = x.sum(axis=0) / n
+        mean_y = y0.sum(axis=0) / n
+        dx = np.where(mask, x - mean_x, 0.0)
+        dy = np.where(mask, y0 - mean_y, 0.0)
+        sxx = (dx * dx).sum(axis=0)
+        sxy = (dx * dy).sum(axis=0)
+        syy = (dy * dy).sum(axis=0)
+        slope = sxy / sxx
+        intercept = mean_y - slope * mean_x
+        ss_res = np.where(mask, (y0 - (intercept + slope * x)) ** 2, 0.0).sum(axis=0)
+        # A flat series is fitted exactly (sklearn's score gives 1.0 there too)
+        r2 = np.where(syy > 0, 1 - ss_res / syy, 1.0)
+
+    too_short = n < 2
+    slope[too_short] = intercept[too_short] = r2[too_short] = np.nan
+    return pd.DataFrame({'slope': slope, 'intercept': intercept, 'r2': r2,
+                         'n_points': n.astype(int)}, index=pivot.columns)
+
+
+def cagr(pivot_year):
+    """
+    Compound annual growth rate per column from its first and last non-missing years
+
+    Args:
+        pivot_year: DataFrame indexed by year (numbers), one column per language
+
+    Returns:
+        Series indexed by column (NaN for < 2 values, or a start / end value <= 0)
+    """
+    values = pivot_year.to_numpy(dtype='float64')
+    years = np.asarray(pivot_year.index, dtype='float64')
+    mask = ~np.isnan(values)
+    has_two = mask.sum(axis=0) >= 2
+    cols = np.arange(values.shape[1])
+    first = np.argmax(mask, axis=0)
+    last = len(mask) - 1 - np.argmax(mask[::-1], axis=0)
+    start_val = values[first, cols]
+    end_val = values[last, cols]
+    n_years = years[last] - years[first]
+
+    ok = has_two & (n_years > 0) & (start_val > 0) & (end_val > 0)
+    result = np.full(values.shape[1], np.nan)
+    result[ok] = (end_val[ok] / start_val[ok]) ** (1 / n_years[ok]) - 1
+    return pd.Series(result, index=pivot_year.columns)
+
+
+def average_rank(pivot):
+    """Mean per-period rank of each column (1 = most, ties share the best rank, NaN skipped)"""
+    return pivot.rank(axis=1, method='min', ascending=False).mean()
+
+
+def yearly_totals(pivot):
+    """Sum a date-indexed pivot to one row per year (a year with no values stays NaN)"""
+    return pivot.groupby(pd.DatetimeIndex(pivot.index).year).sum(min_count=1)
+
+
+def trend_table(pivot, pivot_year=None):
+    """
+    All trend metrics for each column in one tidy DataFrame
+
+    Args:
+        pivot: Quarterly (or any regular) pivot, one column per language
+        pivot_year: Yearly pivot for the CAGR (default: the pivot summed per year)
+
+    Returns:
+        DataFrame with language, slope, intercept, r2, n_points, cagr, avg_rank,
+        sorted by slope (largest first)
+    """
+    if pivot_year is None:
+        pivot_year = yearly_totals(pivot)
+    table = ols_trends(pivot)
+    table['cagr'] = cagr(pivot_year).reindex(table.index)
+    table['avg_rank'] = average_rank(pivot)
+    table.index.name = 'language'
+    return table.reset_index().sort_values('slope', ascending=False, ignore_index=True)
+
+
+def trend_table_many(pivots):
+    """
+    trend_table for several metrics (e.g. {'repos': repos_pivot, 'prs': prs_pivot})
+
+    Returns:
+        one long DataFrame with a metric column
+    """
+    frames = [trend_table(pivot).assign(metric=name) for name, pivot in pivots.items()]
+    table = pd.concat(frames, ignore_index=True)
+    return table[['metric'] + [c for c in table.columns if c != 'metric']]
+
+
+if __name__ == "__main__":
+    # Compare with the notebook's sklearn / per-column versions on random data with gaps
+    import time
+    from sklearn.linear_model import LinearRegression
+
+    def slope_per_year(s):
+        s = s.dropna()
+        if len(s) < 2:
+            return np.nan
+        y = s.values
+        x = np.arange(len(y)).reshape(-1, 1)
+        return LinearRegression().fit(x, y).coef_[0]
+
+    def cagr_from_series(s):
+        s = s.dropna()
+        if len(s) < 2:
+            return np.nan
+        start_year, end_year = s.index.min(), s.index.max()
+        start_val, end_val = s.loc[start_year], s.loc[end_year]
+        n_years = end_year - start_year
+        if n_years <= 0 or start_val <= 0 or end_val <= 0:
+            return np.nan
+        return (end_val / start_val) ** (1 / n_years) - 1
+
+    rng = np.random.default_rng(0)
+    quarters = pd.date_range('2008-01-01', periods=48, freq='QS')
+    pivot = pd.DataFrame(rng.poisson(20, (48, 500)).astype(float), index=quarters,
+                         columns=[f"lang{i}" for i in range(500)])
+    pivot = pivot.mask(rng.random(pivot.shape) < 0.2)
+    pivot.iloc[:, 0] = np.nan
+    pivot.iloc[:47, 1] = np.nan
+
+    start = time.perf_counter()
+    table = trend_table(pivot).set_index('language')
+    fast = time.perf_counter() - start
+
+    start = time.perf_counter()
+    slopes = pivot.apply(slope_per_year, axis=0)
+    cagrs = yearly_totals(pivot).apply(cagr_from_series, axis=0)
+    slow = time.perf_counter() - start
+
+    np.testing.assert_allclose(table['slope'], slopes.reindex(table.index), rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(table['cagr'], cagrs.reindex(table.index), rtol=1e-9, atol=1e-12)
+    print(f"500 languages x 48 quarters: {fast:.3f}s vs {slow:.3f}s per column with sklearn "
+          f"({slow / fast:.0f}x faster), results match")